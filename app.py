@@ -1,25 +1,25 @@
 import streamlit as st
 import pandas as pd
 import json
-import plotly.express as px
-import plotly.graph_objects as go
 from pathlib import Path
 import sys
 import os
 import time
+import uuid
 from datetime import datetime
 
 # Add the src directory to the path so we can import dataexp
 sys.path.append(str(Path(__file__).parent / "src"))
 
-from dataexp.crew import Dataexp
-from dataexp.tools.data_tool import (
-    get_column_names, 
-    get_dataframe_info, 
-    execute_sql_on_csv,
-    save_dataframe,
-    load_dataframe
-)
+from dataexp.jobs import jobs, SUCCEEDED, CANCELLED
+from dataexp.lazy import lazy_import
+from dataexp.templates import answer_from_template
+from dataexp.tools.datasets import dataset_fingerprint, load_dataset
+from dataexp.tools.frame_cache import cache_namespace, frame_cache
+from dataexp.tools import instrumentation
+
+# Plotly and crewai are slow to import; load them when first needed
+px = lazy_import("plotly.express")
 
 # Page configuration
 st.set_page_config(
@@ -207,20 +207,38 @@ def initialize_session_state():
     """Initialize session state variables"""
     if 'messages' not in st.session_state:
         st.session_state.messages = []
-    if 'crew' not in st.session_state:
-        st.session_state.crew = None
     if 'data_file' not in st.session_state:
         st.session_state.data_file = str(Path("src/dataexp/data/titanic.csv"))
+    if 'pending_job' not in st.session_state:
+        st.session_state.pending_job = None
+    if 'session_id' not in st.session_state:
+        # Namespace for this session's entries in the shared DataFrame cache
+        st.session_state.session_id = uuid.uuid4().hex
+
+@st.cache_resource(max_entries=4, show_spinner="Loading dataset...")
+def load_cached_dataset(data_file, fingerprint):
+    """Load a dataset once per file version, shared by all sessions and reruns (read-only)"""
+    return load_dataset(data_file)
+
+@st.cache_data(max_entries=16)
+def get_dataset_overview(data_file, fingerprint):
+    """Sidebar metrics and preview rows for one version of a dataset"""
+    df = load_cached_dataset(data_file, fingerprint)
+    survivors = int((df['Survived'] == 1).sum())
+    return {
+        "rows": len(df),
+        "survivors": survivors,
+        "preview": df.head(),
+    }
 
 def get_crew():
-    """Get or create CrewAI crew instance"""
-    if st.session_state.crew is None:
-        try:
-            st.session_state.crew = Dataexp()
-        except Exception as e:
-            st.error(f"Error initializing CrewAI: {str(e)}")
-            return None
-    return st.session_state.crew
+    """Get the CrewAI crew shared by all sessions, built once per process"""
+    try:
+        from dataexp.crew import Dataexp
+        return Dataexp.shared()
+    except Exception as e:
+        st.error(f"Error initializing CrewAI: {str(e)}")
+        return None
 
 def add_message(role, content, timestamp=None, agent=None):
     """Add a message to the chat history"""
@@ -283,52 +301,83 @@ def display_chat_history():
             </div>
             """, unsafe_allow_html=True)
 
+def run_crew_job(crew, inputs, job):
+    """Run the crew for one question inside a background job"""
+    result = crew.kickoff(inputs=inputs, progress_callback=job.report)
+    
+    # Process the result
+    if hasattr(result, 'raw'):
+        return result.raw
+    return str(result)
+
 def process_user_question(question):
-    """Process user question with CrewAI agents"""
+    """Answer a known question from its template, or submit it to the CrewAI agents as a background job"""
+    templated = answer_from_template(question, st.session_state.data_file)
+    if templated is not None:
+        add_message("assistant", templated["answer"], agent="Question Templates")
+        return None
+    
     crew = get_crew()
     if crew is None:
-        return "Sorry, I'm having trouble connecting to the AI agents. Please try again."
+        add_message("assistant", "Sorry, I'm having trouble connecting to the AI agents. Please try again.")
+        return None
     
-    try:
-        # Show thinking indicator
-        thinking_placeholder = st.empty()
-        thinking_placeholder.markdown("""
-        <div class="thinking-indicator">
-            🤔 AI agents are thinking... This may take a moment.
-        </div>
-        """, unsafe_allow_html=True)
-        
-        # Create progress bar
-        progress_bar = st.progress(0)
-        for i in range(100):
-            time.sleep(0.02)
-            progress_bar.progress(i + 1)
-        
-        # Run the crew with the user's question
-        inputs = {
-            'user_input': question,
-            'data_file': st.session_state.data_file
-        }
-        
-        result = crew.crew().kickoff(inputs=inputs)
-        
-        # Clear thinking indicator and progress bar
-        thinking_placeholder.empty()
-        progress_bar.empty()
-        
-        # Process the result
-        if hasattr(result, 'raw'):
-            response = result.raw
-        else:
-            response = str(result)
-        
-        return response
-        
-    except Exception as e:
-        thinking_placeholder.empty()
-        if 'progress_bar' in locals():
-            progress_bar.empty()
-        return f"I encountered an error while processing your question: {str(e)}"
+    # Run the crew with the user's question
+    inputs = {
+        'user_request': question,
+        'filename': st.session_state.data_file
+    }
+    
+    # The job inherits this session's cache namespace
+    with cache_namespace(st.session_state.session_id):
+        job_id = jobs.submit(run_crew_job, crew, inputs, owner=st.session_state.session_id)
+    st.session_state.pending_job = {"id": job_id, "question": question}
+    return job_id
+
+def finish_pending_job(job):
+    """Move the result of a finished job into the chat history"""
+    pending = st.session_state.pending_job
+    st.session_state.pending_job = None
+    if job is None:
+        add_message("assistant", "The request expired before it finished. Please ask again.")
+    elif job.status == SUCCEEDED:
+        add_message("assistant", job.result, agent="Data Analysis Team")
+        show_response_chart(job.result, pending["question"])
+    elif job.status == CANCELLED:
+        add_message("assistant", "Request cancelled.")
+    else:
+        add_message("assistant", f"I encountered an error while processing your question: {job.error}")
+
+def display_pending_job():
+    """Show the progress of this session's running question and collect its result"""
+    pending = st.session_state.get("pending_job")
+    if not pending:
+        return
+    
+    job = jobs.get(pending["id"])
+    if job is None or job.done:
+        finish_pending_job(job)
+        st.rerun()
+    
+    st.markdown("""
+    <div class="thinking-indicator">
+        🤔 AI agents are thinking... This may take a moment.
+    </div>
+    """, unsafe_allow_html=True)
+    # Progress follows the crew's agent steps and finished tasks
+    st.progress(min(int(job.progress * 100), 100), text=job.message)
+    if st.button("✖️ Cancel", key="cancel_job"):
+        jobs.cancel(job.id)
+        st.rerun()
+    
+    if not hasattr(st, "fragment"):
+        # Older Streamlit: poll by rerunning the script
+        time.sleep(1)
+        st.rerun()
+
+# Poll without rerunning the whole page where Streamlit supports fragments
+if hasattr(st, "fragment"):
+    display_pending_job = st.fragment(run_every=1.0)(display_pending_job)
 
 def display_quick_questions():
     """Display quick question buttons in sidebar"""
@@ -353,6 +402,64 @@ def display_quick_questions():
     
     return None
 
+def display_debug_panel():
+    """Display per-tool-call timings and sizes in a sidebar expander"""
+    with st.expander("🛠️ Debug: Tool Calls"):
+        tracing = st.checkbox(
+            "Trace memory (tracemalloc, slower)",
+            value=instrumentation.memory_tracing_enabled(),
+            key="debug_trace_memory",
+        )
+        if tracing != instrumentation.memory_tracing_enabled():
+            instrumentation.set_memory_tracing(tracing)
+        
+        summary = instrumentation.summarize_calls()
+        if not summary:
+            st.caption("No tool calls recorded yet.")
+            return
+        
+        st.markdown("**Per tool**")
+        st.dataframe(
+            pd.DataFrame([{k: v for k, v in row.items() if k != "phases_s"} for row in summary]),
+            use_container_width=True,
+            hide_index=True,
+        )
+        
+        tools = ["All"] + [row["tool"] for row in summary]
+        selected_tool = st.selectbox("Recent calls", tools, key="debug_tool_filter")
+        calls = instrumentation.recent_calls(None if selected_tool == "All" else selected_tool, limit=50)
+        rows = []
+        for call in calls:
+            row = {k: v for k, v in call.items() if k != "phases"}
+            row.update({f"{name}_s": seconds for name, seconds in call["phases"].items()})
+            rows.append(row)
+        st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+        
+        if st.button("Clear call log", key="debug_clear_calls"):
+            instrumentation.clear_calls()
+            st.rerun()
+
+def show_response_chart(response, question):
+    """Try to extract and visualize data if the response contains structured data"""
+    try:
+        # Look for JSON data in the response
+        if "{" in response and "}" in response:
+            # Try to extract JSON data for visualization
+            import re
+            json_match = re.search(r'\{.*\}', response, re.DOTALL)
+            if json_match:
+                json_str = json_match.group()
+                try:
+                    data = json.loads(json_str)
+                    if isinstance(data, list) and len(data) > 0:
+                        fig = create_visualization_from_data(data, question)
+                        if fig:
+                            st.plotly_chart(fig, use_container_width=True)
+                except:
+                    pass
+    except:
+        pass
+
 def create_visualization_from_data(data, question):
     """Create visualizations based on data and question context"""
     try:
@@ -458,19 +565,27 @@ def main():
         st.info("Please ensure the titanic.csv file is located in src/dataexp/data/")
         return
     
+    # Loaded once per file version and reused across reruns and sessions
+    overview = None
+    overview_error = None
+    try:
+        fingerprint = dataset_fingerprint(st.session_state.data_file).digest
+        overview = get_dataset_overview(st.session_state.data_file, fingerprint)
+    except Exception as e:
+        overview_error = str(e)
+    
     # Sidebar with quick questions and dataset info
     with st.sidebar:
         st.markdown("## 🚢 Titanic Dataset Explorer")
         
         # Dataset info
         st.markdown("### 📊 Dataset Information")
-        try:
-            df = pd.read_csv(st.session_state.data_file)
-            st.metric("Total Passengers", len(df))
-            st.metric("Survivors", len(df[df['Survived'] == 1]))
-            st.metric("Survival Rate", f"{len(df[df['Survived'] == 1])/len(df)*100:.1f}%")
-        except Exception as e:
-            st.error(f"Error loading dataset: {str(e)}")
+        if overview is not None:
+            st.metric("Total Passengers", overview["rows"])
+            st.metric("Survivors", overview["survivors"])
+            st.metric("Survival Rate", f"{overview['survivors']/overview['rows']*100:.1f}%")
+        else:
+            st.error(f"Error loading dataset: {overview_error}")
         
         st.markdown("---")
         
@@ -482,7 +597,16 @@ def main():
         # Clear chat button
         if st.button("🗑️ Clear Chat", help="Clear all chat history"):
             st.session_state.messages = []
+            if st.session_state.pending_job:
+                jobs.cancel(st.session_state.pending_job["id"])
+                st.session_state.pending_job = None
+            frame_cache.clear(st.session_state.session_id)
             st.rerun()
+        
+        st.markdown("---")
+        
+        # Tool call instrumentation
+        display_debug_panel()
     
     # Main chat interface
     col1, col2 = st.columns([3, 1])
@@ -504,48 +628,27 @@ def main():
                 key="user_input"
             )
         
-        # Process question
-        if st.button("🚀 Send", key="send_button") and user_input:
+        # Process question (one running question per session)
+        busy = bool(st.session_state.get("pending_job"))
+        if st.button("🚀 Send", key="send_button", disabled=busy) and user_input:
             # Add user message
             add_message("user", user_input)
             
-            # Process with AI agents
-            response = process_user_question(user_input)
-            
-            # Add AI response
-            add_message("assistant", response, agent="Data Analysis Team")
-            
-            # Try to extract and visualize data if the response contains structured data
-            try:
-                # Look for JSON data in the response
-                if "{" in response and "}" in response:
-                    # Try to extract JSON data for visualization
-                    import re
-                    json_match = re.search(r'\{.*\}', response, re.DOTALL)
-                    if json_match:
-                        json_str = json_match.group()
-                        try:
-                            data = json.loads(json_str)
-                            if isinstance(data, list) and len(data) > 0:
-                                fig = create_visualization_from_data(data, user_input)
-                                if fig:
-                                    st.plotly_chart(fig, use_container_width=True)
-                        except:
-                            pass
-            except:
-                pass
+            # Process with AI agents in the background
+            process_user_question(user_input)
             
             # Rerun to update the interface
             st.rerun()
+        
+        display_pending_job()
     
     with col2:
         # Data preview
         st.markdown("### 📋 Data Preview")
-        try:
-            df = pd.read_csv(st.session_state.data_file)
-            st.dataframe(df.head(), use_container_width=True, height=300)
-        except Exception as e:
-            st.error(f"Error loading data preview: {str(e)}")
+        if overview is not None:
+            st.dataframe(overview["preview"], use_container_width=True, height=300)
+        else:
+            st.error(f"Error loading data preview: {overview_error}")
 
 if __name__ == "__main__":
     main()
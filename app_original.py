@@ -1,8 +1,6 @@
 import streamlit as st
 import pandas as pd
 import json
-import plotly.express as px
-import plotly.graph_objects as go
 from pathlib import Path
 import sys
 import os
@@ -11,6 +9,8 @@ import os
 sys.path.append(str(Path(__file__).parent / "src"))
 
 from dataexp.crew import Dataexp
+from dataexp.lazy import lazy_import
+from dataexp.templates import answer_from_template
 from dataexp.tools.data_tool import (
     get_column_names, 
     get_dataframe_info, 
@@ -18,6 +18,11 @@ from dataexp.tools.data_tool import (
     save_dataframe,
     load_dataframe
 )
+from dataexp.tools.profile import get_profile
+from dataexp.tools.results import get_result
+
+# Plotly is slow to import; load it when the first chart is drawn
+px = lazy_import("plotly.express")
 
 # Page configuration
 st.set_page_config(
@@ -219,12 +224,8 @@ def show_dataset_info(data_file):
     """Display dataset information in a clean format"""
     with st.spinner("Loading dataset information..."):
         try:
-            info_result = get_dataframe_info.run(data_file)
-            info_data = json.loads(info_result)
-            
-            if "error" in info_data:
-                st.error(f"Error: {info_data['error']}")
-                return
+            # Stored profile, built once per version of the file
+            info_data = get_profile(data_file)
             
             # Display in clean containers
             st.markdown('<div class="analysis-container">', unsafe_allow_html=True)
@@ -241,12 +242,24 @@ def show_dataset_info(data_file):
             
             # Column information
             st.markdown("### Column Information")
-            columns_df = pd.DataFrame(info_data["columns"])
+            columns_df = pd.DataFrame([
+                {
+                    "name": name,
+                    "dtype": stats["dtype"],
+                    "missing": stats["nulls"],
+                    "distinct": stats["distinct"],
+                    "min": stats.get("min"),
+                    "median": stats.get("quantiles", {}).get("0.5"),
+                    "max": stats.get("max"),
+                    "top value": stats["top_values"][0]["value"] if stats.get("top_values") else None,
+                }
+                for name, stats in info_data["column_stats"].items()
+            ])
             st.dataframe(columns_df, use_container_width=True, hide_index=True)
             
             # Sample data
             st.markdown("### Sample Data")
-            sample_df = pd.DataFrame(info_data["sample_data"])
+            sample_df = pd.DataFrame(info_data["head"][:5])
             st.dataframe(sample_df, use_container_width=True, hide_index=True)
             
             st.markdown('</div>', unsafe_allow_html=True)
@@ -272,8 +285,8 @@ def show_quick_stats(data_file):
             for i, (label, query) in enumerate(queries):
                 result = execute_sql_on_csv.run(data_file, query)
                 data = json.loads(result)
-                if "error" not in data and len(data) > 0:
-                    value = list(data[0].values())[0]
+                if "error" not in data and data["row_count"] > 0:
+                    value = list(data["rows"][0].values())[0]
                     with cols[i]:
                         st.metric(label, value)
             
@@ -292,7 +305,7 @@ def show_data_summary(data_file):
             data = json.loads(result)
             
             if "error" not in data:
-                df = pd.DataFrame(data)
+                df = pd.DataFrame(data["rows"])
                 df['Survived'] = df['Survived'].map({0: 'Did not survive', 1: 'Survived'})
                 
                 st.markdown('<div class="analysis-container">', unsafe_allow_html=True)
@@ -309,11 +322,11 @@ def show_data_summary(data_file):
                 with col2:
                     st.markdown("### Passenger Classes")
                     class_query = "SELECT Pclass, COUNT(*) as count FROM df GROUP BY Pclass ORDER BY Pclass"
-                    class_result = execute_sql_on_csv(data_file, class_query)
+                    class_result = execute_sql_on_csv.run(data_file, class_query)
                     class_data = json.loads(class_result)
                     
                     if "error" not in class_data:
-                        class_df = pd.DataFrame(class_data)
+                        class_df = pd.DataFrame(class_data["rows"])
                         class_df['Pclass'] = 'Class ' + class_df['Pclass'].astype(str)
                         fig = px.bar(class_df, x='Pclass', y='count', color='Pclass')
                         fig.update_layout(showlegend=False, height=300)
@@ -328,12 +341,7 @@ def show_data_quality(data_file):
     """Show data quality information"""
     with st.spinner("Checking data quality..."):
         try:
-            info_result = get_dataframe_info.run(data_file)
-            info_data = json.loads(info_result)
-            
-            if "error" in info_data:
-                st.error(f"Error: {info_data['error']}")
-                return
+            info_data = get_profile(data_file)
             
             st.markdown('<div class="analysis-container">', unsafe_allow_html=True)
             
@@ -426,12 +434,23 @@ def sql_analysis_section(data_file):
             st.warning("Please enter a SQL query.")
             return
         
-        execute_sql_query.run(data_file, sql_query)
+        execute_sql_query(data_file, sql_query)
     
     st.markdown('</div>', unsafe_allow_html=True)
 
 def analyze_with_ai(data_file, user_query):
     """Execute AI analysis"""
+    # Known questions are answered directly from their SQL template
+    templated = answer_from_template(user_query, data_file)
+    if templated is not None:
+        st.markdown('<div class="result-container">', unsafe_allow_html=True)
+        st.markdown("### 🎯 Analysis Results")
+        st.markdown(templated["answer"])
+        st.markdown('</div>', unsafe_allow_html=True)
+        with st.expander("🔍 SQL used"):
+            st.code(templated["sql"], language="sql")
+        return
+    
     with st.spinner("🤖 AI agents are analyzing your request..."):
         try:
             inputs = {
@@ -439,7 +458,7 @@ def analyze_with_ai(data_file, user_query):
                 'user_request': user_query,
             }
             
-            result = Dataexp().crew().kickoff(inputs=inputs)
+            result = Dataexp.shared().kickoff(inputs=inputs)
             
             # Display results
             st.markdown('<div class="result-container">', unsafe_allow_html=True)
@@ -465,8 +484,10 @@ def execute_sql_query(data_file, sql_query):
                 st.error(f"❌ SQL Error: {result_data['error']}")
                 return
             
-            # Display results
-            df = pd.DataFrame(result_data)
+            # Display results (the full result stays server-side behind its handle)
+            df = get_result(result_data["handle"])
+            if df is None:
+                df = pd.DataFrame(result_data["rows"])
             
             st.markdown('<div class="result-container">', unsafe_allow_html=True)
             st.success(f"✅ Query executed successfully! ({len(df)} rows returned)")
@@ -474,7 +495,7 @@ def execute_sql_query(data_file, sql_query):
             
             # Save results option
             if st.button("💾 Save Results"):
-                save_query_results(result, sql_query)
+                save_query_results(result_data["handle"], sql_query)
             
             # Auto-generate visualization if suitable
             if len(df.columns) >= 1:
@@ -485,11 +506,11 @@ def execute_sql_query(data_file, sql_query):
         except Exception as e:
             st.error(f"❌ Query execution failed: {str(e)}")
 
-def save_query_results(result, sql_query):
+def save_query_results(handle, sql_query):
     """Save query results to file"""
     try:
         filename = f"query_result_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}"
-        save_result = save_dataframe(result, filename, "csv")
+        save_result = save_dataframe.run(handle, filename, "csv")
         save_data = json.loads(save_result)
         
         if "error" not in save_data:
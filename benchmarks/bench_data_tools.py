@@ -0,0 +1,291 @@
+#!/usr/bin/env python
+"""
+Benchmarks for the tools in dataexp.tools.data_tool.
+
+Generates synthetic datasets with the Titanic schema, times every tool on
+them and records the peak RSS of each case. Every case runs in a fresh
+subprocess with its own cache directory, so "first" timings are cold and
+peak RSS is not polluted by earlier cases. Results are written as JSON so
+runs from different commits can be compared:
+
+    python benchmarks/bench_data_tools.py --sizes 10k,1m
+    python benchmarks/bench_data_tools.py --compare old.json new.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+SIZES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+
+QUERY = (
+    "SELECT Pclass, Sex, COUNT(*) AS passengers, AVG(Age) AS avg_age, "
+    "SUM(Survived) AS survivors FROM df GROUP BY Pclass, Sex ORDER BY Pclass, Sex"
+)
+WIDE_QUERY = "SELECT * FROM df WHERE Fare > 50"
+# Rows per fetch_result_page call when walking a whole result
+WALK_PAGE_ROWS = 1000
+
+CASES = (
+    "parse",
+    "get_column_names",
+    "get_dataframe_info",
+    "execute_sql",
+    "execute_sql_cached",
+    "serialize",
+    "save_csv",
+    "save_parquet",
+    "load",
+    "cache",
+)
+
+
+def generate_dataset(path: Path, rows: int, chunk_rows: int = 1_000_000, seed: int = 7) -> None:
+    """Write a CSV with the Titanic columns and roughly Titanic-like values."""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    tmp_path = path.with_suffix(".tmp")
+    written = 0
+    with open(tmp_path, "w", newline="") as f:
+        while written < rows:
+            n = min(chunk_rows, rows - written)
+            ids = np.arange(written + 1, written + n + 1)
+            age = rng.normal(29.7, 14.5, n).clip(0.42, 80).round(1)
+            age[rng.random(n) < 0.2] = np.nan
+            cabin_numbers = rng.integers(1, 150, n).astype(str)
+            cabin = np.char.add(rng.choice(list("ABCDEFG"), n), cabin_numbers).astype(object)
+            cabin[rng.random(n) < 0.77] = None
+            chunk = pd.DataFrame({
+                "PassengerId": ids,
+                "Survived": (rng.random(n) < 0.38).astype(int),
+                "Pclass": rng.choice([1, 2, 3], n, p=[0.24, 0.21, 0.55]),
+                "Name": np.char.add("Passenger, Mr. ", ids.astype(str)),
+                "Sex": rng.choice(["male", "female"], n, p=[0.65, 0.35]),
+                "Age": age,
+                "SibSp": rng.poisson(0.5, n),
+                "Parch": rng.poisson(0.4, n),
+                "Ticket": rng.integers(100000, 999999, n).astype(str),
+                "Fare": rng.gamma(1.3, 25, n).round(4),
+                "Cabin": cabin,
+                "Embarked": rng.choice(["S", "C", "Q"], n, p=[0.72, 0.19, 0.09]),
+            })
+            chunk.to_csv(f, index=False, header=written == 0)
+            written += n
+    os.replace(tmp_path, path)
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None if unavailable."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _timed(fn, repeat: int) -> dict:
+    timings = []
+    output = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = fn()
+        timings.append(time.perf_counter() - start)
+    record = {
+        "first_s": timings[0],
+        "warm_median_s": statistics.median(timings[1:]) if len(timings) > 1 else None,
+    }
+    if isinstance(output, str):
+        record["output_bytes"] = len(output.encode("utf-8"))
+    return record
+
+
+def _uncached(fn):
+    """Wrap a tool call so every call runs the query instead of hitting a cache."""
+    from dataexp.tools.results import results
+    from dataexp.tools.sql_engine import result_cache
+
+    def call():
+        result_cache.clear()
+        results.clear()
+        return fn()
+    return call
+
+
+def run_case(case: str, dataset: str, repeat: int, workdir: str) -> dict:
+    """Run one benchmark case in the current process and return its record."""
+    from dataexp.tools import data_tool
+    from dataexp.tools.datasets import load_dataset
+
+    out_dir = Path(workdir)
+    os.chdir(out_dir)
+
+    if case == "parse":
+        record = _timed(lambda: load_dataset(dataset), repeat)
+    elif case == "get_column_names":
+        record = _timed(lambda: data_tool.get_column_names.func(dataset), repeat)
+    elif case == "get_dataframe_info":
+        record = _timed(lambda: data_tool.get_dataframe_info.func(dataset, 5), repeat)
+    elif case == "execute_sql":
+        record = _timed(_uncached(lambda: data_tool.execute_sql_on_csv.func(dataset, QUERY)), repeat)
+    elif case == "execute_sql_cached":
+        data_tool.execute_sql_on_csv.func(dataset, QUERY)
+        record = _timed(lambda: data_tool.execute_sql_on_csv.func(dataset, QUERY), repeat)
+    elif case == "serialize":
+        # Every page of a wide result, as an agent paging through all of it would
+        summary = json.loads(data_tool.execute_sql_on_csv.func(dataset, WIDE_QUERY))
+        cursors = range(0, max(summary["row_count"], 1), WALK_PAGE_ROWS)
+        walked = {}
+
+        def walk():
+            walked["bytes"] = sum(
+                len(data_tool.fetch_result_page.func(summary["handle"], cursor, WALK_PAGE_ROWS).encode("utf-8"))
+                for cursor in cursors
+            )
+        record = _timed(walk, repeat)
+        record.update({"result_rows": summary["row_count"], "pages": len(cursors),
+                       "output_bytes": walked["bytes"]})
+    else:
+        handle = json.loads(data_tool.execute_sql_on_csv.func(dataset, WIDE_QUERY))["handle"]
+        if case == "save_csv":
+            record = _timed(lambda: data_tool.save_dataframe.func(handle, "bench", "csv"), repeat)
+        elif case == "save_parquet":
+            record = _timed(lambda: data_tool.save_dataframe.func(handle, "bench", "parquet"), repeat)
+        elif case == "load":
+            data_tool.save_dataframe.func(handle, "bench", "parquet")
+            saved = str(out_dir / "output" / "bench.parquet")
+            record = _timed(lambda: data_tool.load_dataframe.func(saved), repeat)
+        elif case == "cache":
+            def cache_roundtrip():
+                data_tool.cache_dataframe.func(handle, "bench")
+                return data_tool.get_cached_dataframe.func("bench")
+            record = _timed(cache_roundtrip, repeat)
+        else:
+            raise ValueError(f"Unknown case: {case}")
+
+    record["peak_rss_mb"] = peak_rss_mb()
+    return record
+
+
+def _run_case_subprocess(case: str, dataset: Path, repeat: int) -> dict:
+    with tempfile.TemporaryDirectory(prefix="dataexp-bench-") as workdir:
+        env = dict(os.environ, DATAEXP_CACHE_DIR=str(Path(workdir) / "cache"))
+        completed = subprocess.run(
+            [sys.executable, __file__, "--run-case", case, str(dataset.resolve()), str(repeat), workdir],
+            capture_output=True, text=True, env=env,
+        )
+    if completed.returncode != 0:
+        return {"error": completed.stderr.strip().splitlines()[-1:]}
+    # Tools may print to stdout; the record is the last line
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run_suite(sizes, cases, repeat: int, data_dir: Path) -> dict:
+    data_dir.mkdir(parents=True, exist_ok=True)
+    records = []
+    for size_name in sizes:
+        rows = SIZES[size_name]
+        dataset = data_dir / f"titanic_{size_name}.csv"
+        if not dataset.exists():
+            print(f"Generating {dataset} ({rows:,} rows)...", file=sys.stderr)
+            generate_dataset(dataset, rows)
+        for case in cases:
+            print(f"[{size_name}] {case}...", file=sys.stderr)
+            record = _run_case_subprocess(case, dataset, repeat)
+            record.update({"size": size_name, "rows": rows, "case": case})
+            records.append(record)
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "repeat": repeat,
+            "env": {k: v for k, v in os.environ.items() if k.startswith("DATAEXP_")},
+        },
+        "results": records,
+    }
+
+
+def compare(baseline_path: str, candidate_path: str) -> None:
+    """Print the change of every case between two result files."""
+    baseline = json.loads(Path(baseline_path).read_text())
+    candidate = json.loads(Path(candidate_path).read_text())
+    base = {(r["size"], r["case"]): r for r in baseline["results"]}
+    print(f"{'size':<6}{'case':<22}{'first':>12}{'warm':>12}{'rss':>12}")
+    for record in candidate["results"]:
+        old = base.get((record["size"], record["case"]))
+        if old is None:
+            continue
+        cells = []
+        for field in ("first_s", "warm_median_s", "peak_rss_mb"):
+            if old.get(field) and record.get(field) is not None:
+                cells.append(f"{record[field] / old[field]:>11.2f}x")
+            else:
+                cells.append(f"{'-':>12}")
+        print(f"{record['size']:<6}{record['case']:<22}{''.join(cells)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="10k,1m", help="Comma-separated sizes: 10k, 1m, 10m")
+    parser.add_argument("--cases", default=",".join(CASES), help="Comma-separated cases to run")
+    parser.add_argument("--repeat", type=int, default=3, help="Calls per case (first is cold)")
+    parser.add_argument("--data-dir", default=str(ROOT / "benchmarks" / "data"),
+                        help="Where generated datasets are kept between runs")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CANDIDATE"),
+                        help="Compare two result files instead of running")
+    parser.add_argument("--run-case", nargs=4, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_case:
+        case, dataset, repeat, workdir = args.run_case
+        print(json.dumps(run_case(case, dataset, int(repeat), workdir)))
+        return
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    sizes = [s.strip().lower() for s in args.sizes.split(",") if s.strip()]
+    unknown = [s for s in sizes if s not in SIZES]
+    if unknown:
+        parser.error(f"Unknown sizes: {', '.join(unknown)}")
+    cases = [c.strip() for c in args.cases.split(",") if c.strip()]
+
+    report = run_suite(sizes, cases, args.repeat, Path(args.data_dir))
+    output = Path(args.output) if args.output else (
+        ROOT / "benchmarks" / "results"
+        / f"{datetime.now():%Y%m%d-%H%M%S}-{report['meta']['commit'] or 'nogit'}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -24,32 +24,33 @@ def demonstrate_dataframe_storage():
     # 1. Execute SQL and get results
     print("1. Execute SQL Query:")
     sql_query = "SELECT Pclass, AVG(Age) as avg_age FROM df WHERE Age IS NOT NULL GROUP BY Pclass ORDER BY Pclass"
-    result = execute_sql_on_csv(str(data_file), sql_query)
+    result = execute_sql_on_csv.run(str(data_file), sql_query)
     print(f"Query Result: {result[:200]}...\n")
+    handle = json.loads(result)["handle"]
     
     # 2. Save DataFrame to file (CSV)
     print("2. Save DataFrame to CSV:")
-    save_result = save_dataframe(result, "titanic_avg_age_by_class", "csv")
+    save_result = save_dataframe.run(handle, "titanic_avg_age_by_class", "csv")
     print(f"Save Result: {save_result}\n")
     
     # 3. Save DataFrame to JSON
     print("3. Save DataFrame to JSON:")
-    save_result = save_dataframe(result, "titanic_avg_age_by_class", "json")
+    save_result = save_dataframe.run(handle, "titanic_avg_age_by_class", "json")
     print(f"Save Result: {save_result}\n")
     
     # 4. Cache DataFrame in memory
     print("4. Cache DataFrame in memory:")
-    cache_result = cache_dataframe(result, "avg_age_by_class")
+    cache_result = cache_dataframe.run(handle, "avg_age_by_class")
     print(f"Cache Result: {cache_result}\n")
     
     # 5. Retrieve cached DataFrame
     print("5. Retrieve cached DataFrame:")
-    cached_data = get_cached_dataframe("avg_age_by_class")
+    cached_data = get_cached_dataframe.run("avg_age_by_class")
     print(f"Cached Data: {cached_data[:200]}...\n")
     
     # 6. Load DataFrame from saved file
     print("6. Load DataFrame from saved file:")
-    loaded_data = load_dataframe("output/titanic_avg_age_by_class.csv")
+    loaded_data = load_dataframe.run("output/titanic_avg_age_by_class.csv")
     print(f"Loaded Data: {loaded_data[:200]}...\n")
     
     print("=== Summary ===")
@@ -1,19 +1,83 @@
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 from crewai.agents.agent_builder.base_agent import BaseAgent
-from crewai.knowledge.source.pdf_knowledge_source import PDFKnowledgeSource
 from typing import List
-import os
+import contextlib
+import threading
+from .knowledge import TITANIC_META_PDF, load_knowledge
+from .llm_cache import cached_llm
+from .sql_memo import ENABLED as SQL_MEMO_ENABLED, sql_memo, successful_sql
+from .tools.results import capture_sources
 from .tools.data_tool import (
     get_column_names, 
     execute_sql_on_csv, 
+    fetch_result_page,
     get_dataframe_info,
     save_dataframe,
+    get_write_status,
     load_dataframe,
     cache_dataframe,
     get_cached_dataframe
 )
 
+class _CrewPool:
+    """
+    Reusable crews for repeated kickoffs.
+
+    The first borrow builds the crew; later borrows reuse an idle one. When
+    every crew is busy, a copy with its own agents and tasks is made. Copies
+    share the original's knowledge instead of re-embedding the sources.
+    Concurrent kickoffs therefore never share agent or task state.
+    """
+
+    def __init__(self, build):
+        self._build = build
+        self._template = None
+        self._idle = []
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def borrow(self):
+        with self._lock:
+            if self._idle:
+                crew = self._idle.pop()
+            elif self._template is None:
+                crew = self._template = self._build()
+            else:
+                crew = None
+        if crew is None:
+            crew = self._clone(self._template)
+        try:
+            yield crew
+        finally:
+            with self._lock:
+                self._idle.append(crew)
+
+    @staticmethod
+    def _clone(template: Crew) -> Crew:
+        agents = [agent.copy() for agent in template.agents]
+        task_mapping = {}
+        tasks = []
+        for task in template.tasks:
+            cloned_task = task.copy(agents, task_mapping)
+            task_mapping[task.key] = cloned_task
+            tasks.append(cloned_task)
+        crew = Crew(
+            agents=agents,
+            tasks=tasks,
+            process=template.process,
+            verbose=template.verbose,
+            cache=template.cache,
+        )
+        # Assigned after construction so the sources are not embedded again
+        crew.knowledge_sources = template.knowledge_sources
+        crew.knowledge = template.knowledge
+        return crew
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
 # If you want to run a snippet of code before or after the crew starts,
 # you can use the @before_kickoff and @after_kickoff decorators
 # https://docs.crewai.com/concepts/crews#example-crew-class-with-decorators
@@ -36,7 +100,9 @@ class Dataexp():
         return Agent(
             config=self.agents_config['data_engineer'], # type: ignore[index]
             verbose=True,
-            tools=[get_column_names, get_dataframe_info]
+            llm=cached_llm(), # Repeated prompts are answered from disk when DATAEXP_LLM_CACHE=1
+            tools=[get_column_names, get_dataframe_info],
+            cache=False, # Tools cache results per dataset version themselves
         )
     
     @agent
@@ -44,7 +110,9 @@ class Dataexp():
         return Agent(
             config=self.agents_config['sql_developer'], # type: ignore[index]
             verbose=True,
-            tools=[get_column_names, get_dataframe_info]
+            llm=cached_llm(),
+            tools=[get_column_names, get_dataframe_info],
+            cache=False,
         )
 
     @agent
@@ -52,7 +120,9 @@ class Dataexp():
         return Agent(
             config=self.agents_config['sql_executor'], # type: ignore[index]
             verbose=True,
-            tools=[execute_sql_on_csv, save_dataframe, load_dataframe, cache_dataframe, get_cached_dataframe]
+            llm=cached_llm(),
+            tools=[execute_sql_on_csv, fetch_result_page, save_dataframe, get_write_status, load_dataframe, cache_dataframe, get_cached_dataframe],
+            cache=False,
         )
     
     # To learn more about structured task outputs,
@@ -69,6 +139,12 @@ class Dataexp():
         return Task(
             config=self.tasks_config['run_sql_queries_task'], # type: ignore[index]
         )
+
+    # Not decorated with @task: it only runs in memo_crew, never in the full crew
+    def run_memoized_sql_task(self) -> Task:
+        return Task(
+            config=self.tasks_config['run_memoized_sql_task'], # type: ignore[index]
+        )
     
     @crew
     def crew(self) -> Crew:
@@ -76,23 +152,122 @@ class Dataexp():
         # To learn how to add knowledge sources to your crew, check out the documentation:
         # https://docs.crewai.com/concepts/knowledge#what-is-knowledge
         
-        # Create knowledge sources
-        knowledge_sources = []
-        
-        # Add PDF knowledge source for Titanic metadata
-        titanic_meta_path = f'..\\..\\knowledge\\TitanicMETA.pdf'
-        if os.path.exists(titanic_meta_path):
-            titanic_meta_knowledge = PDFKnowledgeSource(
-                file_path=titanic_meta_path,
-                metadata={"source": "titanic_metadata", "type": "dataset_documentation"}
-            )
-            knowledge_sources.append(titanic_meta_knowledge)
+        # Knowledge about the Titanic dataset, embedded once per document
+        # version and embedder and loaded on the first query
+        knowledge = load_knowledge(
+            [TITANIC_META_PDF],
+            metadata={"source": "titanic_metadata", "type": "dataset_documentation"},
+        )
 
         return Crew(
             agents=self.agents, # Automatically created by the @agent decorator
             tasks=self.tasks, # Automatically created by the @task decorator
             process=Process.sequential,
             verbose=True,
-            knowledge_sources=knowledge_sources,
+            knowledge=knowledge,
+            # crewai's tool cache would outlive file changes in pooled crews and
+            # hide tool calls from the memo; the tools cache by fingerprint instead
+            cache=False,
             # process=Process.hierarchical, # In case you wanna use that instead https://docs.crewai.com/how-to/Hierarchical/
         )
+
+    def memo_crew(self) -> Crew:
+        """Creates a crew that only executes a remembered SQL query"""
+        return Crew(
+            agents=[self.sql_executor()],
+            tasks=[self.run_memoized_sql_task()],
+            process=Process.sequential,
+            verbose=True,
+            cache=False,
+        )
+
+    @classmethod
+    def shared(cls) -> "Dataexp":
+        """Return the process-wide Dataexp, built on first use"""
+        global _shared
+        with _shared_lock:
+            if _shared is None:
+                _shared = cls()
+            return _shared
+
+    def _pool(self, name: str) -> _CrewPool:
+        with _shared_lock:
+            pools = self.__dict__.setdefault('_crew_pools', {})
+            if name not in pools:
+                if name == 'crew':
+                    pools[name] = _CrewPool(self.crew)
+                else:
+                    # memo_crew shares the sql_executor agent with the full crew; use its own copy
+                    pools[name] = _CrewPool(lambda: _CrewPool._clone(self.memo_crew()))
+            return pools[name]
+
+    def kickoff(self, inputs: dict, progress_callback=None):
+        """
+        Answer a user request, reusing the SQL of earlier identical questions.
+
+        When the question was answered before against the same dataset with
+        the same schema, the remembered SQL is executed directly and the sql_developer
+        agent is skipped. Otherwise the full crew runs and the SQL that
+        executed successfully is remembered. Crews are built once and reused
+        across calls; concurrent calls run on separate copies.
+
+        Args:
+            inputs: Crew inputs with 'user_request' and 'filename'
+            progress_callback: Optional callable receiving (fraction, message)
+                after every agent step and finished task
+
+        Returns:
+            The CrewOutput of the crew that ran
+        """
+        question = inputs.get('user_request')
+        filename = inputs.get('filename')
+        if not (SQL_MEMO_ENABLED and question and filename):
+            return self._run('crew', inputs, progress_callback)
+
+        sql_query = sql_memo.lookup(question, filename)
+        if sql_query is not None:
+            with capture_sources() as sources:
+                result = self._run('memo', {**inputs, 'sql_query': sql_query}, progress_callback)
+            if successful_sql(sources, filename) is not None:
+                return result
+            # The remembered SQL did not run; forget it and use the full crew
+            sql_memo.forget(question, filename)
+
+        with capture_sources() as sources:
+            result = self._run('crew', inputs, progress_callback)
+        sql_query = successful_sql(sources, filename)
+        if sql_query is not None:
+            sql_memo.remember(question, filename, sql_query)
+        return result
+
+    def _run(self, crew_name: str, inputs: dict, progress_callback=None):
+        with self._pool(crew_name).borrow() as crew:
+            return self._kickoff_crew(crew, inputs, progress_callback)
+
+    @staticmethod
+    def _kickoff_crew(crew: Crew, inputs: dict, progress_callback=None):
+        step_callback = task_callback = None
+        if progress_callback is not None:
+            total = len(crew.tasks)
+            state = {"tasks": 0, "steps": 0}
+
+            def step_callback(step):
+                # Each step closes half of the remaining gap within the current task
+                state["steps"] += 1
+                fraction = (state["tasks"] + 1 - 0.5 ** state["steps"]) / total
+                tool = getattr(step, "tool", None)
+                message = f"Using {tool}" if tool else "Thinking"
+                progress_callback(fraction, f"Task {state['tasks'] + 1}/{total}: {message}")
+
+            def task_callback(output):
+                state["tasks"] += 1
+                state["steps"] = 0
+                progress_callback(state["tasks"] / total, f"Finished task {state['tasks']}/{total}")
+
+        # Crew only fills in callbacks that are unset, and the memoized agents
+        # and tasks outlive this run, so set them explicitly every time
+        for agent in crew.agents:
+            agent.step_callback = step_callback
+        for task in crew.tasks:
+            task.callback = task_callback
+        return crew.kickoff(inputs=inputs)
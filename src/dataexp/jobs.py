@@ -0,0 +1,227 @@
+"""
+Background execution of crew runs.
+
+The Streamlit app submits each question as a job and polls its status, so
+the script run that submitted it returns immediately and the session stays
+responsive. Jobs run on a shared thread pool; a job whose owner stops
+polling is cancelled.
+"""
+import contextvars
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job once it has been cancelled."""
+
+
+class Job:
+    """State of one submitted job, updated by the worker and read by pollers."""
+
+    def __init__(self, owner=None):
+        self.id = f"job_{uuid.uuid4().hex[:12]}"
+        self.owner = owner
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = "Queued"
+        self.result = None
+        self.error = None
+        self.created = time.monotonic()
+        self.started = None
+        self.finished = None
+        self.last_polled = self.created
+        self.future = None
+        self._cancel_requested = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel_requested.is_set()
+
+    def report(self, fraction: float, message: str = None) -> None:
+        """
+        Record progress; also the point where a cancelled job stops.
+
+        Pass it as a progress callback to the work the job runs.
+
+        Raises:
+            JobCancelled: If the job has been cancelled
+        """
+        if self.cancel_requested:
+            raise JobCancelled(self.id)
+        self.progress = max(self.progress, min(float(fraction), 1.0))
+        if message:
+            self.message = message
+
+    def snapshot(self) -> dict:
+        """Status fields of the job as a plain dict."""
+        now = time.monotonic()
+        return {
+            "id": self.id,
+            "status": self.status,
+            "progress": self.progress,
+            "message": self.message,
+            "error": self.error,
+            "elapsed_s": (self.finished or now) - (self.started or now),
+        }
+
+
+class JobManager:
+    """
+    Runs callables on a thread pool and tracks them by job ID.
+
+    Finished jobs are kept for result_ttl seconds. A job that is not polled
+    for abandon_after seconds is cancelled: queued jobs never start, and
+    running jobs stop at their next progress report.
+    """
+
+    def __init__(self, max_workers: int = 4, result_ttl: float = 3600, abandon_after: float = 120):
+        self.max_workers = max_workers
+        self.result_ttl = result_ttl
+        self.abandon_after = abandon_after
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dataexp-job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, owner=None, **kwargs) -> str:
+        """
+        Run fn(*args, job=job, **kwargs) in the background.
+
+        The caller's context variables (e.g. the cache namespace) are carried
+        into the worker thread.
+
+        Args:
+            fn: Callable to run; it receives the Job as the 'job' keyword
+            owner: Optional owner ID, e.g. the Streamlit session ID
+            *args, **kwargs: Arguments passed to fn
+
+        Returns:
+            Job ID for polling
+        """
+        self.reap()
+        job = Job(owner)
+        context = contextvars.copy_context()
+        with self._lock:
+            self._jobs[job.id] = job
+        job.future = self._executor.submit(context.run, self._execute, job, fn, args, kwargs)
+        return job.id
+
+    def get(self, job_id: str):
+        """Return a job by ID, or None if unknown or expired. Counts as a poll."""
+        # Polls from live sessions also sweep up jobs nobody polls any more
+        self.reap()
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None:
+            job.last_polled = time.monotonic()
+        return job
+
+    def status(self, job_id: str):
+        """Return the status snapshot of a job, or None if unknown or expired."""
+        job = self.get(job_id)
+        return job.snapshot() if job is not None else None
+
+    def result(self, job_id: str):
+        """
+        Return the result of a finished job.
+
+        Raises:
+            KeyError: If the job is unknown or expired
+            RuntimeError: If the job has not finished successfully
+        """
+        job = self.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        if job.status != SUCCEEDED:
+            raise RuntimeError(f"Job {job_id} is {job.status}")
+        return job.result
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a job. Returns True if it was still queued or running.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None or job.done:
+            return False
+        job._cancel_requested.set()
+        if job.future is not None and job.future.cancel():
+            self._finish(job, CANCELLED, message="Cancelled")
+        return True
+
+    def cancel_owner(self, owner) -> int:
+        """Cancel every unfinished job of an owner; returns how many."""
+        with self._lock:
+            job_ids = [job.id for job in self._jobs.values() if job.owner == owner]
+        return sum(self.cancel(job_id) for job_id in job_ids)
+
+    def reap(self) -> None:
+        """Cancel abandoned jobs and drop expired finished ones."""
+        now = time.monotonic()
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            if job.done:
+                if self.result_ttl and now - job.finished > self.result_ttl:
+                    with self._lock:
+                        self._jobs.pop(job.id, None)
+            elif self.abandon_after and now - job.last_polled > self.abandon_after:
+                logger.info("Cancelling abandoned job %s", job.id)
+                self.cancel(job.id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+        return {"max_workers": self.max_workers, "jobs": counts}
+
+    def _execute(self, job, fn, args, kwargs) -> None:
+        if job.cancel_requested:
+            self._finish(job, CANCELLED, message="Cancelled")
+            return
+        job.status = RUNNING
+        job.started = time.monotonic()
+        job.message = "Running"
+        try:
+            result = fn(*args, job=job, **kwargs)
+        except JobCancelled:
+            self._finish(job, CANCELLED, message="Cancelled")
+        except Exception as e:
+            logger.exception("Job %s failed", job.id)
+            self._finish(job, FAILED, error=str(e), message="Failed")
+        else:
+            job.progress = 1.0
+            self._finish(job, SUCCEEDED, result=result, message="Done")
+
+    @staticmethod
+    def _finish(job, status, result=None, error=None, message=None) -> None:
+        job.result = result
+        job.error = error
+        if message:
+            job.message = message
+        job.finished = time.monotonic()
+        job.status = status
+
+
+jobs = JobManager(
+    max_workers=int(os.environ.get("DATAEXP_JOB_WORKERS", "4")),
+    result_ttl=float(os.environ.get("DATAEXP_JOB_RESULT_TTL", "3600")),
+    abandon_after=float(os.environ.get("DATAEXP_JOB_ABANDON_AFTER", "120")),
+)
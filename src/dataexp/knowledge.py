@@ -0,0 +1,181 @@
+"""
+Knowledge sources for the Dataexp crew, embedded once per document version.
+
+crewai re-parses, re-chunks and re-embeds knowledge sources every time a
+crew is built. Here each document set gets its own vector collection named
+after the documents' content hash and the embedder, and a marker file records
+that the collection is complete. Builds only hash the files; the PDF is
+parsed and embedded on the first query, and only if no complete collection
+exists for that content and embedder. Parsed chunks are kept on disk too, so
+switching embedders does not parse the documents again.
+"""
+import hashlib
+import json
+import logging
+import threading
+from pathlib import Path
+
+from crewai.knowledge.knowledge import Knowledge
+from crewai.knowledge.source.pdf_knowledge_source import PDFKnowledgeSource
+from pydantic import PrivateAttr
+
+from .tools.atomic import write_json_atomic
+from .tools.datasets import CACHE_DIR
+from .tools.sidecar import file_sha256
+
+logger = logging.getLogger(__name__)
+
+# Project-level knowledge directory, independent of the working directory
+KNOWLEDGE_DIR = Path(__file__).resolve().parents[2] / "knowledge"
+TITANIC_META_PDF = KNOWLEDGE_DIR / "TitanicMETA.pdf"
+
+KNOWLEDGE_CACHE_DIR = CACHE_DIR / "knowledge"
+
+
+def _write_json(path: Path, payload) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_json_atomic(path, payload)
+
+
+class CachedPDFKnowledgeSource(PDFKnowledgeSource):
+    """
+    PDFKnowledgeSource that parses lazily and reuses chunks from disk.
+
+    Construction only validates the paths. The PDF is parsed on the first
+    add(), and the chunks are stored under the content hash and chunking
+    settings for later processes.
+    """
+
+    def model_post_init(self, _):
+        self.safe_file_paths = self._process_file_paths()
+        self.validate_content()
+
+    def content_hash(self) -> str:
+        """Hash of the file contents and chunking settings."""
+        digest = hashlib.sha256()
+        for path in self.safe_file_paths:
+            digest.update(file_sha256(path).encode("ascii"))
+        digest.update(f"{self.chunk_size}:{self.chunk_overlap}".encode("ascii"))
+        return digest.hexdigest()
+
+    def add(self) -> None:
+        self.chunks = self._load_chunks()
+        self._save_documents()
+
+    def _load_chunks(self) -> list:
+        chunks_path = KNOWLEDGE_CACHE_DIR / f"chunks-{self.content_hash()}.json"
+        if chunks_path.exists():
+            try:
+                return json.loads(chunks_path.read_text())
+            except (OSError, ValueError):
+                pass
+        self.content = self.load_content()
+        chunks = []
+        for text in self.content.values():
+            chunks.extend(self._chunk_text(text))
+        try:
+            _write_json(chunks_path, chunks)
+        except OSError as e:
+            logger.warning("Could not store knowledge chunks: %s", e)
+        return chunks
+
+
+class LazyKnowledge(Knowledge):
+    """
+    Knowledge whose sources are embedded on first use, at most once per
+    content hash and embedder.
+    """
+
+    _ready: bool = PrivateAttr(default=False)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def __init__(self, collection_name: str, sources: list, embedder=None, storage=None, **data):
+        super().__init__(collection_name=collection_name, sources=sources,
+                         embedder=embedder, storage=storage, **data)
+        # Knowledge only hands the name to its storage; the marker needs it too
+        self.collection_name = collection_name
+
+    def query(self, query, results_limit: int = 5, score_threshold: float = 0.6):
+        self.ensure_embedded()
+        return super().query(query, results_limit=results_limit, score_threshold=score_threshold)
+
+    def add_sources(self):
+        self.ensure_embedded()
+
+    def ensure_embedded(self) -> None:
+        """Embed the sources unless a complete collection already exists."""
+        if self._ready:
+            return
+        with self._lock:
+            if self._ready:
+                return
+            marker_path = KNOWLEDGE_CACHE_DIR / f"{self.collection_name}.json"
+            marker = None
+            if marker_path.exists():
+                try:
+                    marker = json.loads(marker_path.read_text())
+                except (OSError, ValueError):
+                    marker = None
+            # A marker without a usable chunk count is treated as an incomplete collection
+            chunks = marker.get("chunks") if isinstance(marker, dict) else None
+            if (not isinstance(chunks, int) or isinstance(chunks, bool)
+                    or not self._collection_complete(chunks)):
+                self.storage.reset()
+                chunks = 0
+                for source in self.sources:
+                    source.storage = self.storage
+                    source.add()
+                    chunks += len(source.chunks)
+                try:
+                    _write_json(marker_path, {"chunks": chunks})
+                except OSError as e:
+                    logger.warning("Could not store knowledge marker: %s", e)
+            self._ready = True
+
+    def _collection_complete(self, chunks: int) -> bool:
+        # The vector store may have been reset since the marker was written
+        try:
+            client = self.storage._get_client()
+            collection = client.get_or_create_collection(
+                collection_name=f"knowledge_{self.collection_name}"
+            )
+            return collection.count() >= chunks
+        except Exception as e:
+            # A collection that cannot be checked is rebuilt rather than trusted
+            logger.warning("Could not check knowledge collection %s, re-indexing: %s",
+                           self.collection_name, e)
+            return False
+
+
+def _embedder_key(embedder) -> str:
+    if embedder is None:
+        return "default"
+    return json.dumps(embedder, sort_keys=True, default=repr)
+
+
+def load_knowledge(paths, metadata: dict = None, embedder=None):
+    """
+    Build the crew knowledge for a set of PDF files.
+
+    Args:
+        paths: PDF paths; missing files are skipped
+        metadata: Metadata attached to the sources
+        embedder: crewai embedder config (default: crewai's default embedder)
+
+    Returns:
+        LazyKnowledge for the existing files, or None if there are none
+    """
+    paths = [Path(p) for p in paths if Path(p).exists()]
+    if not paths:
+        return None
+    # Path objects are used as given; crewai prefixes strings with knowledge/
+    sources = [CachedPDFKnowledgeSource(file_paths=paths, metadata=metadata or {})]
+    key = hashlib.sha256()
+    for source in sources:
+        key.update(source.content_hash().encode("ascii"))
+    key.update(_embedder_key(embedder).encode("utf-8"))
+    return LazyKnowledge(
+        collection_name=f"dataexp_{key.hexdigest()[:16]}",
+        sources=sources,
+        embedder=embedder,
+    )
@@ -0,0 +1,103 @@
+"""
+Deferred imports and import-time profiling.
+
+crewai, plotly and friends take seconds to import. Entry points and the apps
+bind them with lazy_import() so the module is only imported on first
+attribute access, and commands that never touch it never pay for it.
+profile_imports() reports where the startup time of a set of modules goes,
+using the interpreter's -X importtime output.
+"""
+import importlib
+import subprocess
+import sys
+import threading
+
+
+class LazyModule:
+    """Stand-in for a module that imports it on first attribute access."""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_import(name: str):
+    """
+    Bind a module without importing it yet.
+
+    Args:
+        name: Dotted module name, e.g. "plotly.express"
+
+    Returns:
+        The module itself if it is already imported, otherwise a LazyModule
+    """
+    module = sys.modules.get(name)
+    return module if module is not None else LazyModule(name)
+
+
+def profile_imports(modules: list, top: int = 25) -> dict:
+    """
+    Measure the import time of modules in a fresh interpreter.
+
+    Args:
+        modules: Dotted module names imported in order
+        top: Number of slowest top-level packages and modules to report
+
+    Returns:
+        Dict with 'total_s', 'packages' (seconds spent in each top-level
+        package's own modules) and 'modules' (the slowest modules by
+        cumulative time, including what they import)
+    """
+    code = "; ".join(f"import {name}" for name in modules) or "pass"
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr else "import failed")
+
+    entries = []
+    for line in completed.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|", 2)
+        entries.append((name.strip(), int(own), int(cumulative)))
+
+    # Self times do not overlap, so per package they add up to the total
+    packages = {}
+    for name, own, _ in entries:
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + own
+    total = sum(packages.values())
+    slowest = sorted(entries, key=lambda entry: entry[2], reverse=True)[:top]
+    return {
+        "total_s": round(total / 1e6, 3),
+        "packages": {
+            name: round(us / 1e6, 3)
+            for name, us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+        },
+        "modules": [{"module": name, "cumulative_s": round(us / 1e6, 3)} for name, _, us in slowest],
+    }
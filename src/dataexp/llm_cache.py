@@ -0,0 +1,228 @@
+"""
+Persistent LLM response cache for the Dataexp crew.
+
+Enabled with DATAEXP_LLM_CACHE=1. The crew's agents then talk to a CachedLLM
+that looks every request up in a local SQLite file before calling the real
+model. Requests are keyed by model, sampling settings and the full message
+list; tool results reach the model as messages, so a cached answer is only
+reused when the tools returned the same content as well. Result handles are
+derived from the result content, so a repeated query quotes the same handle.
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from crewai.llms.base_llm import BaseLLM
+from crewai.utilities.llm_utils import create_llm
+
+from .tools.datasets import CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get("DATAEXP_LLM_CACHE", "0") == "1"
+
+
+class LLMResponseCache:
+    """
+    SQLite-backed store of LLM responses with TTL and size eviction.
+
+    Entries older than ttl_seconds are ignored and purged; once the stored
+    responses exceed max_bytes, the least recently used ones are deleted.
+    """
+
+    def __init__(self, path, ttl_seconds: float = 7 * 24 * 3600, max_bytes: int = 256 * 1024 * 1024):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._connection = None
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "writes": 0}
+
+    @staticmethod
+    def make_key(model: str, messages, **params) -> str:
+        """
+        Build the cache key of a request.
+
+        Args:
+            model: Model identifier
+            messages: Prompt string or list of message dicts
+            **params: Further request settings that affect the response
+
+        Returns:
+            Hex digest identifying the request
+        """
+        payload = json.dumps(
+            {"model": model, "messages": messages, "params": params},
+            sort_keys=True, default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        """Return the cached response for a key, or None."""
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT response, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (self.ttl_seconds and now - row[1] > self.ttl_seconds):
+                self._counters["misses"] += 1
+                return None
+            connection.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            connection.commit()
+            self._counters["hits"] += 1
+            return row[0]
+
+    def put(self, key: str, model: str, response: str) -> None:
+        """Store a response and enforce the TTL and size limits."""
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, size, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, size, now, now),
+            )
+            self._counters["writes"] += 1
+            if self.ttl_seconds:
+                connection.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl_seconds,))
+            self._evict(connection)
+            connection.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            connection = self._connect()
+            connection.execute("DELETE FROM responses")
+            connection.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            connection = self._connect()
+            entries, total = connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            return {**self._counters, "entries": entries, "bytes": total, "max_bytes": self.max_bytes}
+
+    def _evict(self, connection) -> None:
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in connection.execute(
+            "SELECT key, size FROM responses ORDER BY last_used"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, model TEXT, response TEXT, size INTEGER, "
+                "created REAL, last_used REAL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+
+class CachedLLM(BaseLLM):
+    """
+    LLM wrapper answering repeated requests from an LLMResponseCache.
+
+    Works with any crewai LLM or BaseLLM implementation, including local stub
+    models. Only plain text responses are cached; calls that the inner LLM
+    resolves into native function calls always go through.
+    """
+
+    def __init__(self, llm, cache: LLMResponseCache):
+        self._inner = llm
+        self._cache = cache
+        super().__init__(
+            model=getattr(llm, "model", str(llm)),
+            temperature=getattr(llm, "temperature", None),
+            stop=getattr(llm, "stop", None),
+        )
+
+    # crewai appends its stop words to llm.stop; keep them on the inner LLM
+    @property
+    def stop(self):
+        return self._inner.stop
+
+    @stop.setter
+    def stop(self, value):
+        self._inner.stop = value
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None):
+        key = self._cache.make_key(
+            self.model,
+            messages,
+            temperature=getattr(self._inner, "temperature", None),
+            stop=sorted(self.stop or []),
+            tools=tools,
+        )
+        cached = self._cache.get(key)
+        if cached is not None:
+            logger.debug("LLM cache hit for %s", self.model)
+            return cached
+
+        response = self._inner.call(
+            messages,
+            tools=tools,
+            callbacks=callbacks,
+            available_functions=available_functions,
+            from_task=from_task,
+            from_agent=from_agent,
+        )
+        if isinstance(response, str) and response.strip():
+            self._cache.put(key, self.model, response)
+        return response
+
+    def supports_stop_words(self) -> bool:
+        return self._inner.supports_stop_words()
+
+    def get_context_window_size(self) -> int:
+        return self._inner.get_context_window_size()
+
+    def __getattr__(self, name):
+        # Only called for attributes not found on the wrapper
+        if name == "_inner":
+            raise AttributeError(name)
+        return getattr(self._inner, name)
+
+
+response_cache = LLMResponseCache(
+    path=os.environ.get("DATAEXP_LLM_CACHE_PATH", str(CACHE_DIR / "llm_responses.sqlite")),
+    ttl_seconds=float(os.environ.get("DATAEXP_LLM_CACHE_TTL", str(7 * 24 * 3600))),
+    max_bytes=int(os.environ.get("DATAEXP_LLM_CACHE_BYTES", str(256 * 1024 * 1024))),
+)
+
+
+def cached_llm(llm=None):
+    """
+    Return the LLM an agent should use, wrapped in the response cache if enabled.
+
+    Args:
+        llm: LLM instance or model name (default: crewai's environment-based default)
+
+    Returns:
+        A CachedLLM when DATAEXP_LLM_CACHE=1, otherwise llm unchanged
+    """
+    if not ENABLED:
+        return llm
+    inner = create_llm(llm)
+    if inner is None or isinstance(inner, CachedLLM):
+        return inner or llm
+    return CachedLLM(inner, response_cache)
@@ -1,24 +1,68 @@
 #!/usr/bin/env python
+import argparse
+import json
 import sys
+import threading
+import time
 import warnings
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 from datetime import datetime
 
-from dataexp.crew import Dataexp
-
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
 # This main file is intended to be a way for you to run your
 # crew locally, so refrain from adding unnecessary logic into this file.
 # Replace with inputs you want to test with, it will automatically
 # interpolate any tasks and agents information
+#
+# crewai takes seconds to import, so each command imports the crew itself and
+# commands that do not need it start immediately.
+
+# Modules each command imports, measured by --profile-startup
+STARTUP_MODULES = {
+    "run": ["dataexp.crew"],
+    "train": ["dataexp.crew"],
+    "replay": ["dataexp.crew"],
+    "test": ["dataexp.crew"],
+    # The crew is imported later, by the first question no template answers
+    "batch": ["dataexp.templates", "dataexp.tools.datasets", "dataexp.tools.schema"],
+    "run_streamlit": [],
+}
+
+
+def _profile_startup(command) -> bool:
+    """
+    Handle --profile-startup: report the import time of a command and return True.
+
+    Without the flag this returns False and the command runs normally.
+    """
+    if "--profile-startup" not in sys.argv:
+        return False
+    sys.argv.remove("--profile-startup")
+    from dataexp.lazy import profile_imports
+
+    report = profile_imports(["dataexp.main"] + STARTUP_MODULES[command])
+    print(f"Startup imports for '{command}': {report['total_s']:.3f}s")
+    print("\nBy top-level package (own modules only):")
+    for package, seconds in report["packages"].items():
+        print(f"  {seconds:8.3f}s  {package}")
+    print("\nSlowest modules (cumulative):")
+    for entry in report["modules"]:
+        print(f"  {entry['cumulative_s']:8.3f}s  {entry['module']}")
+    return True
+
 
 def run():
     """
     Run the crew.
     """
+    if _profile_startup("run"):
+        return
+    from dataexp.crew import Dataexp
+
     # Use OS-generic path handling
     data_file = Path(__file__).parent / 'data' / 'titanic.csv'
     
@@ -35,7 +79,7 @@ def run():
     }
     
     try:
-        Dataexp().crew().kickoff(inputs=inputs)
+        Dataexp().kickoff(inputs=inputs)
     except Exception as e:
         raise Exception(f"An error occurred while running the crew: {e}")
 
@@ -44,6 +88,10 @@ def train():
     """
     Train the crew for a given number of iterations.
     """
+    if _profile_startup("train"):
+        return
+    from dataexp.crew import Dataexp
+
     # Use OS-generic path handling
     data_file = Path(__file__).parent / 'data' / 'titanic.csv'
     
@@ -61,6 +109,10 @@ def replay():
     """
     Replay the crew execution from a specific task.
     """
+    if _profile_startup("replay"):
+        return
+    from dataexp.crew import Dataexp
+
     try:
         Dataexp().crew().replay(task_id=sys.argv[1])
 
@@ -71,6 +123,10 @@ def test():
     """
     Test the crew execution and returns the results.
     """
+    if _profile_startup("test"):
+        return
+    from dataexp.crew import Dataexp
+
     # Use OS-generic path handling
     data_file = Path(__file__).parent / 'data' / 'titanic.csv'
     
@@ -85,10 +141,150 @@ def test():
     except Exception as e:
         raise Exception(f"An error occurred while testing the crew: {e}")
 
+class _RateLimiter:
+    """Spaces out calls so that at most `per_minute` start in any minute."""
+
+    def __init__(self, per_minute: float):
+        self.interval = 60.0 / per_minute if per_minute else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        time.sleep(max(start - now, 0.0))
+
+
+def _read_batch_items(path):
+    """Yield (index, item, error) for every non-blank line of a JSONL file."""
+    with open(path, encoding="utf-8") as f:
+        for index, line in enumerate(f):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError as e:
+                yield index, None, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(item, dict) or not item.get("filename") or not item.get("user_request"):
+                yield index, item, "Each item needs 'filename' and 'user_request'"
+                continue
+            yield index, item, None
+
+
+def _batch_record(index, item, **fields) -> dict:
+    """Output record of an item: its index, the item's own fields, then the outcome."""
+    # Lines that are not JSON objects are kept whole under 'item'
+    record = {"index": index, **(item if isinstance(item, dict) else {"item": item})}
+    record.update(fields)
+    return record
+
+
+def _run_batch_item(index, item, rate_limiter):
+    from dataexp.tools.frame_cache import cache_namespace
+
+    from dataexp.templates import answer_from_template
+
+    start = time.perf_counter()
+    # Known questions need no LLM calls, so they skip the rate limit too
+    templated = answer_from_template(item["user_request"], item["filename"])
+    if templated is not None:
+        return {
+            "result": templated["answer"],
+            "template": templated["template"],
+            "elapsed_s": round(time.perf_counter() - start, 3),
+        }
+
+    # crewai is only imported once a question needs the crew
+    from dataexp.crew import Dataexp
+
+    crew = Dataexp.shared()
+    rate_limiter.wait()
+    start = time.perf_counter()
+    inputs = {"filename": item["filename"], "user_request": item["user_request"]}
+    # Cached DataFrames of different items must not overwrite each other
+    with cache_namespace(f"batch-{index}"):
+        result = crew.kickoff(inputs=inputs)
+    return {
+        "result": result.raw if hasattr(result, "raw") else str(result),
+        "elapsed_s": round(time.perf_counter() - start, 3),
+    }
+
+
+def batch():
+    """
+    Answer a JSONL file of {filename, user_request} items concurrently.
+
+    Results are appended to the output JSONL file as each item completes.
+    """
+    if _profile_startup("batch"):
+        return
+    from dataexp.tools.datasets import load_dataset
+    from dataexp.tools.schema import get_schema
+
+    parser = argparse.ArgumentParser(prog="batch", description="Answer a JSONL file of questions")
+    parser.add_argument("input", help="JSONL file with one {filename, user_request} object per line")
+    parser.add_argument("-o", "--output", help="JSONL file for the results (default: <input>.results.jsonl)")
+    parser.add_argument("-c", "--concurrency", type=int, default=4, help="Questions run at the same time")
+    parser.add_argument("-r", "--rate", type=float, default=0,
+                        help="Maximum questions started per minute (default: no limit)")
+    args = parser.parse_args(sys.argv[1:])
+
+    input_path = Path(args.input)
+    output_path = Path(args.output) if args.output else input_path.with_suffix(".results.jsonl")
+    items = list(_read_batch_items(input_path))
+
+    # Load every dataset once up front; all items then share the loaded copy
+    dataset_errors = {}
+    for filename in sorted({item["filename"] for _, item, error in items if error is None}):
+        try:
+            get_schema(filename)
+            load_dataset(filename)
+        except Exception as e:
+            dataset_errors[filename] = f"Could not load dataset: {e}"
+
+    rate_limiter = _RateLimiter(args.rate)
+    succeeded = failed = 0
+    with open(output_path, "w", encoding="utf-8") as out, \
+            ThreadPoolExecutor(max_workers=max(args.concurrency, 1)) as executor:
+
+        def write(record):
+            out.write(json.dumps(record, default=str) + "\n")
+            out.flush()
+
+        futures = {}
+        for index, item, error in items:
+            error = error or dataset_errors.get(item["filename"])
+            if error is not None:
+                write(_batch_record(index, item, status="error", error=error))
+                failed += 1
+                continue
+            future = executor.submit(_run_batch_item, index, item, rate_limiter)
+            futures[future] = (index, item)
+
+        for future in as_completed(futures):
+            index, item = futures[future]
+            try:
+                record = _batch_record(index, item, status="ok", **future.result())
+                succeeded += 1
+            except Exception as e:
+                record = _batch_record(index, item, status="error", error=str(e))
+                failed += 1
+            write(record)
+            print(f"[{succeeded + failed}/{len(items)}] item {index}: {record['status']}", file=sys.stderr)
+
+    print(f"{succeeded} succeeded, {failed} failed. Results written to {output_path}", file=sys.stderr)
+
 def run_streamlit():
     """
     Run the Streamlit web interface.
     """
+    if _profile_startup("run_streamlit"):
+        return
     import subprocess
     import sys
     from pathlib import Path
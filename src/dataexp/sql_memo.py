@@ -0,0 +1,197 @@
+"""
+Memo of the SQL that answered previous questions.
+
+Questions are normalized (case, whitespace, trailing punctuation) and keyed
+together with the dataset path and a fingerprint of its schema. When a
+question comes back for the same dataset and the columns are unchanged, the
+crew runs the remembered SQL directly instead of asking the sql_developer
+agent to write it again.
+
+The memo assumes that the SQL answering a question depends only on the
+question and the schema, not on the data: the remembered query runs against
+the current rows, so edited data gives an up-to-date answer, but a query
+whose literals were picked from the old values is reused as it is.
+
+Entries for other schemas or datasets are kept, so alternating between
+datasets (or schema versions) does not wipe the memo. Entries unused for
+max_age_seconds are purged, and beyond max_entries the least recently used
+ones are evicted.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from .tools.datasets import CACHE_DIR
+from .tools.schema import get_schema
+
+ENABLED = os.environ.get("DATAEXP_SQL_MEMO", "1") != "0"
+
+_TRAILING_PUNCTUATION = re.compile(r"[\s?.!]+$")
+
+
+def normalize_question(question: str) -> str:
+    """Lower-case a question and collapse whitespace and trailing punctuation."""
+    question = " ".join(question.lower().split())
+    return _TRAILING_PUNCTUATION.sub("", question)
+
+
+def schema_fingerprint(filename) -> str:
+    """Digest of the column names and dtypes of a dataset."""
+    columns = get_schema(filename)["columns"]
+    payload = json.dumps([[c["name"], c["dtype"]] for c in columns])
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def dataset_identity(filename) -> str:
+    """Absolute path of a dataset, identifying it in the memo."""
+    return str(Path(filename).resolve())
+
+
+class SQLMemo:
+    """
+    SQLite-backed map from (normalized question, dataset, schema fingerprint) to SQL.
+    """
+
+    def __init__(self, path, max_entries: int = 10_000, max_age_seconds: float = 90 * 24 * 3600):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self._connection = None
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def lookup(self, question: str, filename):
+        """
+        Return the remembered SQL for a question, or None.
+
+        Args:
+            question: The user's question
+            filename: Dataset the question is asked against
+
+        Returns:
+            SQL string, or None if the question is unknown for this dataset
+            and schema (or its entry has expired)
+        """
+        key = (normalize_question(question), dataset_identity(filename), schema_fingerprint(filename))
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT sql FROM entries WHERE question = ? AND dataset = ? AND schema = ? "
+                "AND last_used >= ?",
+                (*key, now - self.max_age_seconds),
+            ).fetchone()
+            if row is None:
+                self._counters["misses"] += 1
+                return None
+            connection.execute(
+                "UPDATE entries SET hits = hits + 1, last_used = ? "
+                "WHERE question = ? AND dataset = ? AND schema = ?",
+                (now, *key),
+            )
+            connection.commit()
+            self._counters["hits"] += 1
+            return row[0]
+
+    def remember(self, question: str, filename, sql_query: str) -> None:
+        """
+        Record the SQL that successfully answered a question.
+
+        Args:
+            question: The user's question
+            filename: Dataset the query ran against
+            sql_query: The SQL that ran successfully
+        """
+        key = (normalize_question(question), dataset_identity(filename), schema_fingerprint(filename))
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO entries (question, dataset, schema, sql, hits, created, last_used) "
+                "VALUES (?, ?, ?, ?, 0, ?, ?)",
+                (*key, sql_query, now, now),
+            )
+            self._evict(connection, now)
+            connection.commit()
+
+    def forget(self, question: str, filename=None) -> None:
+        """Drop the entries for a question, for one dataset or for all of them."""
+        key = normalize_question(question)
+        with self._lock:
+            connection = self._connect()
+            if filename is None:
+                connection.execute("DELETE FROM entries WHERE question = ?", (key,))
+            else:
+                connection.execute(
+                    "DELETE FROM entries WHERE question = ? AND dataset = ?",
+                    (key, dataset_identity(filename)),
+                )
+            connection.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            connection = self._connect()
+            connection.execute("DELETE FROM entries")
+            connection.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._connect().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            return {**self._counters, "entries": entries}
+
+    def _evict(self, connection: sqlite3.Connection, now: float) -> None:
+        removed = connection.execute(
+            "DELETE FROM entries WHERE last_used < ?", (now - self.max_age_seconds,)
+        ).rowcount
+        excess = connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0] - self.max_entries
+        if excess > 0:
+            removed += connection.execute(
+                "DELETE FROM entries WHERE rowid IN "
+                "(SELECT rowid FROM entries ORDER BY last_used LIMIT ?)",
+                (excess,),
+            ).rowcount
+        self._counters["evictions"] += removed
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "question TEXT, dataset TEXT, schema TEXT, sql TEXT, hits INTEGER, "
+                "created REAL, last_used REAL, PRIMARY KEY (question, dataset, schema))"
+            )
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+
+sql_memo = SQLMemo(
+    os.environ.get("DATAEXP_SQL_MEMO_PATH", str(CACHE_DIR / "sql_memo.sqlite")),
+    max_entries=int(os.environ.get("DATAEXP_SQL_MEMO_ENTRIES", "10000")),
+    max_age_seconds=float(os.environ.get("DATAEXP_SQL_MEMO_TTL", str(90 * 24 * 3600))),
+)
+
+
+def successful_sql(sources: list, filename):
+    """
+    Pick the SQL to remember from the results stored during a crew run.
+
+    Args:
+        sources: Source dicts collected with results.capture_sources()
+        filename: Dataset the question was asked against
+
+    Returns:
+        The last SQL query that ran against the dataset, or None
+    """
+    target = dataset_identity(filename)
+    for source in reversed(sources):
+        sql_query = source.get("sql_query")
+        if sql_query and dataset_identity(source.get("filename", "")) == target:
+            return sql_query
+    return None
@@ -0,0 +1,181 @@
+"""
+Question templates answered without running the crew.
+
+Known questions, such as the quick questions offered by the apps, are mapped
+in config/question_templates.yaml to parameterized SQL and an answer format.
+A matching question runs its SQL directly through the shared SQL engine and
+is answered in milliseconds; anything that does not match, or whose dataset
+lacks the template's columns, falls back to the crew.
+"""
+import logging
+import os
+import re
+from pathlib import Path
+
+import pandas as pd
+import yaml
+
+from .sql_memo import normalize_question
+from .tools.instrumentation import phase
+from .tools.schema import get_schema
+from .tools.sql_engine import run_query
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get("DATAEXP_TEMPLATES", "1") != "0"
+TEMPLATES_PATH = Path(__file__).resolve().parent / "config" / "question_templates.yaml"
+
+# Rows shown in the answer table of a template
+MAX_TABLE_ROWS = 20
+
+
+class QuestionTemplate:
+    """One known question: its patterns, SQL and answer format."""
+
+    def __init__(self, name: str, patterns: list, sql: str, answer: str,
+                 params: dict = None, columns: list = None, table: bool = False):
+        self.name = name
+        self.patterns = [re.compile(pattern) for pattern in patterns]
+        self.sql = " ".join(sql.split())
+        self.answer = answer
+        self.params = params or {}
+        self.columns = columns or []
+        self.table = table
+
+    def match(self, normalized_question: str):
+        """
+        Match a normalized question against the patterns.
+
+        Returns:
+            Dict of the matched parameter phrases, or None if no pattern matches
+        """
+        for pattern in self.patterns:
+            match = pattern.match(normalized_question)
+            if match:
+                return {name: value for name, value in match.groupdict().items() if value is not None}
+        return None
+
+    def render_sql(self, phrases: dict):
+        """
+        Substitute the columns chosen by the matched phrases into the SQL.
+
+        Only column names from the template's own params mapping are ever
+        substituted, never text from the question.
+
+        Returns:
+            Tuple of (SQL, required columns), or None if a phrase is not mapped
+        """
+        columns = {}
+        for name, choices in self.params.items():
+            column = choices.get(phrases.get(name))
+            if column is None:
+                return None
+            columns[name] = column
+        return self.sql.format(**columns), list(self.columns) + list(columns.values())
+
+    def format_answer(self, df: pd.DataFrame, phrases: dict) -> str:
+        if df.empty:
+            return "No matching rows were found."
+        values = {col: _format_value(value) for col, value in df.iloc[0].items()}
+        text = self.answer.format(**values, **phrases)
+        if self.table:
+            text = f"{text}\n\n{_markdown_table(df.head(MAX_TABLE_ROWS))}"
+            if len(df) > MAX_TABLE_ROWS:
+                text += f"\n\n({len(df) - MAX_TABLE_ROWS} more rows not shown)"
+        return text
+
+
+def _format_value(value):
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return "n/a"
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _markdown_table(df: pd.DataFrame) -> str:
+    lines = [
+        "| " + " | ".join(str(col) for col in df.columns) + " |",
+        "|" + "---|" * len(df.columns),
+    ]
+    for row in df.itertuples(index=False):
+        lines.append("| " + " | ".join(str(_format_value(value)) for value in row) + " |")
+    return "\n".join(lines)
+
+
+def load_templates(path=TEMPLATES_PATH) -> list:
+    """
+    Load the question templates from a YAML file.
+
+    Args:
+        path: YAML file mapping template names to their definitions
+
+    Returns:
+        List of QuestionTemplate, in file order
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        definitions = yaml.safe_load(f) or {}
+    return [QuestionTemplate(name, **definition) for name, definition in definitions.items()]
+
+
+templates = load_templates()
+
+
+def match_template(question: str):
+    """
+    Find the template for a question.
+
+    Returns:
+        Tuple of (QuestionTemplate, matched phrases), or None
+    """
+    normalized = normalize_question(question)
+    for template in templates:
+        phrases = template.match(normalized)
+        if phrases is not None:
+            return template, phrases
+    return None
+
+
+def answer_from_template(question: str, filename):
+    """
+    Answer a question from its template, without invoking any agent.
+
+    Args:
+        question: The user's question
+        filename: Path to the CSV file the question is asked against
+
+    Returns:
+        Dict with 'template', 'sql', 'answer' and 'result' (the DataFrame),
+        or None if the question should go to the crew
+    """
+    if not ENABLED:
+        return None
+    matched = match_template(question)
+    if matched is None:
+        return None
+    template, phrases = matched
+    rendered = template.render_sql(phrases)
+    if rendered is None:
+        return None
+    sql_query, required = rendered
+
+    try:
+        available = {column["name"] for column in get_schema(filename)["columns"]}
+        if not set(required) <= available:
+            return None
+        with phase("template"):
+            df = run_query(filename, sql_query)
+            answer = template.format_answer(df, phrases)
+    except Exception as e:
+        # The crew can still answer it
+        logger.warning("Template %s failed for %s: %s", template.name, filename, e)
+        return None
+
+    return {
+        "template": template.name,
+        "sql": sql_query,
+        "answer": answer,
+        "result": df,
+    }
@@ -1,19 +1,19 @@
-from .data_tool import (
-    get_column_names, 
-    execute_sql_on_csv, 
-    get_dataframe_info,
-    save_dataframe,
-    load_dataframe,
-    cache_dataframe,
-    get_cached_dataframe
-)
-
 __all__ = [
     "get_column_names", 
     "execute_sql_on_csv", 
+    "fetch_result_page",
     "get_dataframe_info",
     "save_dataframe",
+    "get_write_status",
     "load_dataframe", 
     "cache_dataframe",
     "get_cached_dataframe"
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    # The tools need crewai; importing the data layer modules should not
+    if name in __all__:
+        from . import data_tool
+        return getattr(data_tool, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,42 @@
+import contextlib
+import json
+import os
+import uuid
+from pathlib import Path
+
+
+def temp_path_for(path) -> Path:
+    """
+    Scratch path next to a file, unique per call across threads and processes.
+
+    The name is hidden and does not keep the target extension, so globbing
+    for the final files skips it.
+    """
+    path = Path(path)
+    return path.with_name(f".{path.name}.{os.getpid()}.{uuid.uuid4().hex}.tmp")
+
+
+@contextlib.contextmanager
+def atomic_path(path):
+    """
+    Write a file atomically: yield a scratch path that replaces path on success.
+
+    Readers see either the old file or the complete new one. The scratch file
+    is removed if the block raises.
+
+    Args:
+        path: Final location of the file
+    """
+    path = Path(path)
+    tmp_path = temp_path_for(path)
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def write_json_atomic(path, payload) -> None:
+    """Serialize payload as JSON to path atomically."""
+    with atomic_path(path) as tmp_path:
+        tmp_path.write_text(json.dumps(payload))
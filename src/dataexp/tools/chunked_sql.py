@@ -0,0 +1,468 @@
+"""
+Out-of-core execution of SQL queries over CSV files.
+
+The file is read in chunks of rows. Each chunk is loaded into a scratch SQLite
+table and a partial query computes the filter and per-group partial
+aggregates for that chunk only. Partials are merged with pandas and a final
+query over the merged groups evaluates HAVING, ORDER BY, LIMIT and any
+expressions wrapped around the aggregates. Peak memory is bounded by the
+chunk size plus the number of groups, not by the size of the file.
+
+Only queries that decompose this way are supported: a single SELECT over the
+table 'df' with COUNT/SUM/AVG/MIN/MAX aggregates (optionally with GROUP BY),
+or a plain filtered projection without ORDER BY.
+"""
+import re
+import sqlite3
+
+import pandas as pd
+
+from .datasets import dataset_fingerprint, registry
+from .query_cache import SQL_KEYWORDS, normalize_sql, tokenize_sql
+from .sidecar import columnar_available
+
+TABLE_NAME = "df"
+
+DEFAULT_CHUNK_ROWS = 200_000
+
+_AGGREGATES = {"COUNT", "SUM", "AVG", "MIN", "MAX"}
+_CLAUSE_WORDS = {"SELECT", "FROM", "WHERE", "HAVING", "LIMIT"}
+_PAIRED_CLAUSE_WORDS = {"GROUP", "ORDER"}
+_UNSUPPORTED_WORDS = {"JOIN", "UNION", "EXCEPT", "INTERSECT", "WITH", "OVER", "WINDOW"}
+_LIMIT_RE = re.compile(r"^(\d+)(?:\s+OFFSET\s+(\d+))?$", re.IGNORECASE)
+
+
+class UnsupportedQueryError(ValueError):
+    """Raised when a query cannot be evaluated chunk by chunk."""
+
+
+def _join(tokens) -> str:
+    return "".join(token for _, token in tokens).strip()
+
+
+def _next_significant(tokens, start):
+    for index in range(start, len(tokens)):
+        if tokens[index][0] != "space":
+            return index
+    return None
+
+
+def _matching_paren(tokens, open_index):
+    depth = 0
+    for index in range(open_index, len(tokens)):
+        kind, token = tokens[index]
+        if kind == "other" and token == "(":
+            depth += 1
+        elif kind == "other" and token == ")":
+            depth -= 1
+            if depth == 0:
+                return index
+    raise UnsupportedQueryError("Unbalanced parentheses in query")
+
+
+def _split_top_level(tokens, separator=","):
+    parts, current, depth = [], [], 0
+    for kind, token in tokens:
+        if kind == "other" and token == "(":
+            depth += 1
+        elif kind == "other" and token == ")":
+            depth -= 1
+        if depth == 0 and kind == "other" and token == separator:
+            parts.append(current)
+            current = []
+            continue
+        current.append((kind, token))
+    parts.append(current)
+    return parts
+
+
+def _unquote(kind, token) -> str:
+    if kind == "quoted":
+        return token[1:-1]
+    return token
+
+
+def _quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _split_clauses(tokens) -> dict:
+    clauses = {}
+    current = None
+    depth = 0
+    index = 0
+    while index < len(tokens):
+        kind, token = tokens[index]
+        upper = token.upper() if kind == "word" else None
+        if kind == "other" and token == "(":
+            depth += 1
+        elif kind == "other" and token == ")":
+            depth -= 1
+
+        if upper in _UNSUPPORTED_WORDS:
+            raise UnsupportedQueryError(f"{upper} is not supported in chunked mode")
+        if upper == "SELECT" and depth > 0:
+            raise UnsupportedQueryError("Subqueries are not supported in chunked mode")
+
+        if depth == 0 and (upper in _CLAUSE_WORDS or upper in _PAIRED_CLAUSE_WORDS):
+            name = upper
+            if upper in _PAIRED_CLAUSE_WORDS:
+                by_index = _next_significant(tokens, index + 1)
+                if by_index is None or tokens[by_index][1].upper() != "BY":
+                    raise UnsupportedQueryError(f"Expected BY after {upper}")
+                name = f"{upper} BY"
+                index = by_index
+            if name in clauses:
+                raise UnsupportedQueryError(f"Repeated {name} clause")
+            clauses[name] = []
+            current = name
+        elif current is None:
+            if kind != "space":
+                raise UnsupportedQueryError("Query must start with SELECT")
+        else:
+            clauses[current].append((kind, token))
+        index += 1
+    return clauses
+
+
+class ChunkedQueryPlan:
+    """
+    A query decomposed into a per-chunk partial query and a final query.
+
+    Attributes:
+        partial_sql: SQL run against every chunk
+        final_sql: SQL run against the merged partials (aggregate mode only)
+        aggregates: List of (function, column_name) pairs, in partial order
+        group_columns: Names of the group key columns in the partials
+        projection: True for filter/projection queries without aggregates
+        limit: Number of rows needed from the projection, or None
+        offset: Rows to skip from the projection
+        usecols: Columns to read from the file, or None for all of them
+    """
+
+    def __init__(self, sql_query: str, columns):
+        self.columns = list(columns)
+        self._column_lookup = {column.lower(): column for column in self.columns}
+        self.aggregates = []
+        self.group_columns = []
+        self.projection = False
+        self.limit = None
+        self.offset = 0
+        self.final_sql = None
+
+        sql = sql_query.strip()
+        while sql.endswith(";"):
+            sql = sql[:-1].rstrip()
+        tokens = list(tokenize_sql(sql))
+        clauses = _split_clauses(tokens)
+
+        if "SELECT" not in clauses or "FROM" not in clauses:
+            raise UnsupportedQueryError("Query must be a SELECT ... FROM df statement")
+        from_tokens = [t for t in clauses["FROM"] if t[0] != "space"]
+        if len(from_tokens) != 1 or _unquote(*from_tokens[0]).lower() != TABLE_NAME:
+            raise UnsupportedQueryError("Chunked mode only queries the table 'df'")
+
+        select_tokens = clauses["SELECT"]
+        first = _next_significant(select_tokens, 0)
+        if first is not None and select_tokens[first][1].upper() in ("DISTINCT", "ALL"):
+            raise UnsupportedQueryError("SELECT DISTINCT is not supported in chunked mode")
+
+        where = _join(clauses.get("WHERE", []))
+        self.usecols = self._needed_columns(tokens)
+
+        agg_names = {}
+        items = [self._parse_item(item, agg_names) for item in _split_top_level(select_tokens)]
+        having = self._replace_aggregates(clauses.get("HAVING", []), agg_names)
+        order_by = self._replace_aggregates(clauses.get("ORDER BY", []), agg_names)
+
+        if not agg_names and "GROUP BY" not in clauses and "HAVING" not in clauses:
+            self._plan_projection(select_tokens, where, clauses)
+            return
+
+        group_terms = [_join(term) for term in _split_top_level(clauses.get("GROUP BY", []))]
+        group_terms = [term for term in group_terms if term]
+        for term in group_terms:
+            if term.isdigit():
+                raise UnsupportedQueryError("Positional GROUP BY is not supported in chunked mode")
+        group_lookup = {normalize_sql(term): f"_g{i}" for i, term in enumerate(group_terms)}
+        self.group_columns = list(group_lookup.values())
+        aliases = {alias.lower() for _, alias in items if alias}
+
+        final_items = []
+        for expr_tokens, alias in items:
+            if alias is None:
+                raise UnsupportedQueryError("SELECT * cannot be combined with aggregates")
+            expr = self._replace_groups(expr_tokens, group_lookup, set())
+            final_items.append(f"{expr} AS {_quote_identifier(alias)}")
+
+        partial_items = [f"{term} AS {group_lookup[normalize_sql(term)]}" for term in group_terms]
+        for (function, inner), name in agg_names.items():
+            self.aggregates.append((function, name))
+            if function == "AVG":
+                partial_items.append(f"SUM({inner}) AS {name}_sum")
+                partial_items.append(f"COUNT({inner}) AS {name}_count")
+            else:
+                partial_items.append(f"{function}({inner}) AS {name}")
+
+        self.partial_sql = f"SELECT {', '.join(partial_items)} FROM {TABLE_NAME}"
+        if where:
+            self.partial_sql += f" WHERE {where}"
+        if group_terms:
+            self.partial_sql += f" GROUP BY {', '.join(group_terms)}"
+
+        self.final_sql = f"SELECT {', '.join(final_items)} FROM {TABLE_NAME}"
+        if having:
+            self.final_sql += f" WHERE {self._replace_groups(having, group_lookup, aliases)}"
+        if order_by:
+            self.final_sql += f" ORDER BY {self._replace_groups(order_by, group_lookup, aliases)}"
+        if "LIMIT" in clauses:
+            self.final_sql += f" LIMIT {_join(clauses['LIMIT'])}"
+
+    def _needed_columns(self, tokens):
+        names = set()
+        for kind, token in tokens:
+            if kind in ("word", "quoted"):
+                column = self._column_lookup.get(_unquote(kind, token).lower())
+                if column is not None:
+                    names.add(column)
+        used = [column for column in self.columns if column in names]
+        return used or self.columns[:1]
+
+    def _parse_item(self, tokens, agg_names):
+        # Split off a trailing "AS alias" or implicit "expr alias"
+        alias = None
+        significant = [i for i, (kind, _) in enumerate(tokens) if kind != "space"]
+        if len(significant) >= 2:
+            last_kind, last = tokens[significant[-1]]
+            before_kind, before = tokens[significant[-2]]
+            if before_kind == "word" and before.upper() == "AS":
+                alias = _unquote(last_kind, last)
+                tokens = tokens[:significant[-2]]
+            elif (last_kind == "quoted" or (last_kind == "word" and last.upper() not in SQL_KEYWORDS)) and (
+                before == ")" or before_kind == "quoted"
+                or (before_kind == "word" and before.upper() not in SQL_KEYWORDS)
+            ):
+                alias = _unquote(last_kind, last)
+                tokens = tokens[:significant[-1]]
+        if alias is None:
+            # SQLite names unaliased result columns after their expression text
+            name_tokens = [t for t in tokens if t[0] != "space"]
+            if len(name_tokens) == 1:
+                alias = _unquote(*name_tokens[0])
+            else:
+                alias = _join(tokens)
+        if _join(tokens) == "*":
+            return tokens, None
+        return self._replace_aggregates(tokens, agg_names), alias
+
+    def _replace_aggregates(self, tokens, agg_names):
+        result = []
+        index = 0
+        while index < len(tokens):
+            kind, token = tokens[index]
+            if kind == "word" and token.upper() in _AGGREGATES:
+                open_index = _next_significant(tokens, index + 1)
+                if open_index is not None and tokens[open_index] == ("other", "("):
+                    close_index = _matching_paren(tokens, open_index)
+                    inner = tokens[open_index + 1:close_index]
+                    self._check_aggregate_argument(inner)
+                    key = (token.upper(), normalize_sql(_join(inner)))
+                    name = agg_names.setdefault(key, f"_a{len(agg_names)}")
+                    result.append(("word", name))
+                    index = close_index + 1
+                    continue
+            result.append((kind, token))
+            index += 1
+        return result
+
+    @staticmethod
+    def _check_aggregate_argument(inner):
+        first = _next_significant(inner, 0)
+        if first is None:
+            raise UnsupportedQueryError("Aggregate without an argument")
+        if inner[first][1].upper() == "DISTINCT":
+            raise UnsupportedQueryError("DISTINCT aggregates are not decomposable")
+        if len(_split_top_level(inner)) > 1:
+            raise UnsupportedQueryError("Multi-argument MIN/MAX is not supported in chunked mode")
+        for position, (kind, token) in enumerate(inner):
+            if kind == "word" and token.upper() in _AGGREGATES:
+                following = _next_significant(inner, position + 1)
+                if following is not None and inner[following] == ("other", "("):
+                    raise UnsupportedQueryError("Nested aggregates are not supported")
+
+    def _replace_groups(self, tokens, group_lookup, aliases) -> str:
+        whole = group_lookup.get(normalize_sql(_join(tokens)))
+        if whole is not None:
+            return whole
+        parts = []
+        for kind, token in tokens:
+            if kind in ("word", "quoted"):
+                name = _unquote(kind, token)
+                replacement = group_lookup.get(normalize_sql(token))
+                if replacement is None and kind == "quoted":
+                    replacement = group_lookup.get(name)
+                if replacement is not None:
+                    parts.append(replacement)
+                    continue
+                if name.lower() in self._column_lookup and name.lower() not in aliases:
+                    raise UnsupportedQueryError(
+                        f"Column '{name}' must be grouped or aggregated in chunked mode"
+                    )
+            parts.append(token)
+        return "".join(parts).strip()
+
+    def _plan_projection(self, select_tokens, where, clauses):
+        if "ORDER BY" in clauses:
+            raise UnsupportedQueryError("ORDER BY without aggregates is not supported in chunked mode")
+        self.projection = True
+        if any(kind == "other" and token == "*" for kind, token in select_tokens):
+            self.usecols = None
+        if "LIMIT" in clauses:
+            match = _LIMIT_RE.match(_join(clauses["LIMIT"]))
+            if match is None:
+                raise UnsupportedQueryError("Only LIMIT n [OFFSET m] is supported in chunked mode")
+            self.limit = int(match.group(1))
+            self.offset = int(match.group(2) or 0)
+        self.partial_sql = f"SELECT {_join(select_tokens)} FROM {TABLE_NAME}"
+        if where:
+            self.partial_sql += f" WHERE {where}"
+
+    def merge(self, partials) -> pd.DataFrame:
+        """Combine per-chunk partial aggregates into one row per group."""
+        partials = pd.concat(partials, ignore_index=True)
+        sum_columns, count_columns, min_columns, max_columns = [], [], [], []
+        for function, name in self.aggregates:
+            if function == "AVG":
+                sum_columns.append(f"{name}_sum")
+                count_columns.append(f"{name}_count")
+            elif function == "SUM":
+                sum_columns.append(name)
+            elif function == "COUNT":
+                count_columns.append(name)
+            elif function == "MIN":
+                min_columns.append(name)
+            else:
+                max_columns.append(name)
+
+        if self.group_columns:
+            grouped = partials.groupby(self.group_columns, dropna=False, sort=False)
+            merged = pd.concat(
+                [
+                    grouped[sum_columns].sum(min_count=1),
+                    grouped[count_columns].sum(),
+                    grouped[min_columns].min(),
+                    grouped[max_columns].max(),
+                ],
+                axis=1,
+            ).reset_index()
+        else:
+            row = {}
+            row.update({c: partials[c].sum(min_count=1) for c in sum_columns})
+            row.update({c: partials[c].sum() for c in count_columns})
+            row.update({c: partials[c].min() for c in min_columns})
+            row.update({c: partials[c].max() for c in max_columns})
+            merged = pd.DataFrame([row])
+
+        for function, name in self.aggregates:
+            if function == "AVG":
+                counts = merged.pop(f"{name}_count")
+                totals = merged.pop(f"{name}_sum")
+                merged[name] = (totals / counts.where(counts > 0)).astype("float64")
+        return merged
+
+
+def plan_chunked_query(filename, sql_query: str) -> ChunkedQueryPlan:
+    """
+    Check that a query can run chunk by chunk and build its plan.
+
+    Args:
+        filename: Path to the CSV file
+        sql_query: SQL statement using 'df' as the table name
+
+    Returns:
+        ChunkedQueryPlan for the query
+
+    Raises:
+        UnsupportedQueryError: If the query is not decomposable
+    """
+    header = pd.read_csv(filename, nrows=0)
+    return ChunkedQueryPlan(sql_query, header.columns)
+
+
+def iter_chunks(filename, chunk_rows: int, usecols=None):
+    """
+    Yield a file as DataFrames of at most chunk_rows rows.
+
+    Reads record batches from the file's Parquet sidecar when a valid one
+    exists, and falls back to chunked CSV parsing otherwise.
+
+    Args:
+        filename: Path to the CSV file
+        chunk_rows: Maximum number of rows per chunk
+        usecols: Columns to read (default: all)
+    """
+    sidecar = None
+    if registry.sidecars is not None and columnar_available():
+        sidecar = registry.sidecars.lookup(dataset_fingerprint(filename))
+    if sidecar is not None:
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(sidecar)
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=usecols):
+            yield batch.to_pandas()
+        return
+    yield from pd.read_csv(filename, chunksize=chunk_rows, usecols=usecols)
+
+
+def run_chunked_query(filename, sql_query: str, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                      plan: ChunkedQueryPlan = None) -> pd.DataFrame:
+    """
+    Execute a SQL query over a CSV file without loading the whole file.
+
+    Args:
+        filename: Path to the CSV file
+        sql_query: SQL statement using 'df' as the table name
+        chunk_rows: Number of rows read and queried at a time
+        plan: Plan from plan_chunked_query, built here if not given
+
+    Returns:
+        DataFrame with the query results
+
+    Raises:
+        UnsupportedQueryError: If the query is not decomposable
+    """
+    if plan is None:
+        plan = plan_chunked_query(filename, sql_query)
+
+    connection = sqlite3.connect(":memory:")
+    try:
+        partials = []
+        collected = 0
+        needed = None if plan.limit is None else plan.limit + plan.offset
+        for chunk in iter_chunks(filename, chunk_rows, plan.usecols):
+            chunk.to_sql(TABLE_NAME, connection, index=False, if_exists="replace")
+            partial = pd.read_sql_query(plan.partial_sql, connection)
+            partials.append(partial)
+            collected += len(partial)
+            if needed is not None and collected >= needed:
+                break
+
+        if plan.projection:
+            if not partials:
+                return pd.DataFrame()
+            result = pd.concat(partials, ignore_index=True)
+            if needed is not None:
+                result = result.iloc[plan.offset:needed].reset_index(drop=True)
+            return result
+
+        if not partials:
+            # Header-only file: evaluate the partial query on an empty table
+            empty = pd.read_csv(filename, nrows=0, usecols=plan.usecols)
+            empty.to_sql(TABLE_NAME, connection, index=False, if_exists="replace")
+            partials.append(pd.read_sql_query(plan.partial_sql, connection))
+
+        merged = plan.merge(partials)
+        merged.to_sql(TABLE_NAME, connection, index=False, if_exists="replace")
+        return pd.read_sql_query(plan.final_sql, connection)
+    finally:
+        connection.close()
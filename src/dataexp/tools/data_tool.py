@@ -1,10 +1,21 @@
 import pandas as pd
-import numpy as np
 import json
+from contextlib import closing
 from crewai.tools import tool
-from pandasql import sqldf
+
+from .chunked_sql import iter_chunks
+from .datasets import dataset_fingerprint
+from .frame_cache import frame_cache
+from .instrumentation import instrumented, phase, record_rows
+from .loader import read_frame
+from .profile import get_profile
+from .results import describe_result, fetch_page, get_result, is_result_handle, results
+from .schema import get_schema
+from .sql_engine import iter_query, run_keyed_query
+from .writer import ROW_GROUP_ROWS, output_path, submit_write, write_frames, write_status
 
 @tool("Extract the column names from a CSV file")
+@instrumented("get_column_names")
 def get_column_names(filename: str) -> str:
     """
     Extract the column names from a CSV file.
@@ -16,45 +27,49 @@ def get_column_names(filename: str) -> str:
         String representation of the column names in JSON format.
     """
     try:
-        df = pd.read_csv(filename)
+        # Column names and data types come from the header and a bounded
+        # sample of rows, so the cost does not grow with the file size
+        with phase("schema"):
+            schema = get_schema(filename)
         
-        # Include column names and their data types
         columns_with_types = {
-            "columns": [
-                {"name": col, "dtype": str(df[col].dtype)} 
-                for col in df.columns
-            ]
+            "columns": schema["columns"]
         }
+        record_rows(len(schema["columns"]))
         return json.dumps(columns_with_types)
     except Exception as e:
         return f"Error creating DataFrame: {str(e)}"
 
 
 @tool("Execute SQL query on CSV file")
+@instrumented("execute_sql_on_csv")
 def execute_sql_on_csv(filename: str, sql_query: str) -> str:
     """
-    Read a CSV file into a pandas DataFrame and execute a SQL query on it.
+    Execute a SQL query on a CSV file, exposed as the table 'df'.
     
     Args:
         filename: The path to the CSV file to read
         sql_query: The SQL statement to execute on the DataFrame
         
     Returns:
-        JSON string representation of the query results
+        JSON string with a result handle, the row count, the column schema,
+        the first rows and a next_cursor for fetch_result_page (null when
+        all rows are included)
     """
     try:
-        # Read CSV file into DataFrame
-        df = pd.read_csv(filename)
-        
-        # Execute SQL query using pandasql
-        # pandasql uses SQLite syntax and can query pandas DataFrames
-        result = sqldf(sql_query, locals())
+        # Execute SQL query against the persistent SQLite copy of the file
+        # (SQLite syntax, loaded once per file version and reused)
+        result, key = run_keyed_query(filename, sql_query)
         
-        # Convert result to JSON
-        if result is not None and not result.empty:
-            return result.to_json(orient='records', date_format='iso')
-        else:
-            return json.dumps({"message": "Query executed successfully but returned no results"})
+        # Keep the full result server-side and return only the first page;
+        # the handle comes from the query-cache key, not from hashing the rows
+        handle = results.put(result, {"filename": filename, "sql_query": sql_query}, key=key)
+        record_rows(len(result))
+        with phase("serialize"):
+            summary = describe_result(result, handle)
+            if result.empty:
+                summary["message"] = "Query executed successfully but returned no results"
+            return json.dumps(summary)
             
     except FileNotFoundError:
         return json.dumps({"error": f"File not found: {filename}"})
@@ -62,10 +77,61 @@ def execute_sql_on_csv(filename: str, sql_query: str) -> str:
         return json.dumps({"error": f"Error executing SQL query: {str(e)}"})
 
 
+@tool("Fetch a page of query results")
+@instrumented("fetch_result_page")
+def fetch_result_page(handle: str, cursor: int = 0, page_size: int = 50) -> str:
+    """
+    Fetch further rows of a result returned by execute_sql_on_csv.
+    
+    Args:
+        handle: The result handle returned by execute_sql_on_csv
+        cursor: Index of the first row to fetch (use next_cursor from the previous call)
+        page_size: Number of rows to fetch (default: 50, max: 1000)
+        
+    Returns:
+        JSON string with the rows of the page and the next_cursor (null on the last page)
+    """
+    try:
+        page = fetch_page(handle, cursor, page_size)
+        record_rows(len(page["rows"]))
+        with phase("serialize"):
+            return json.dumps(page)
+    except KeyError:
+        return json.dumps({"error": f"Result handle not found or expired: {handle}"})
+    except Exception as e:
+        return json.dumps({"error": f"Error fetching result page: {str(e)}"})
+
+
+def _frame_from_data(data: str) -> pd.DataFrame:
+    """
+    Resolve tool input to a DataFrame.
+
+    A result handle ID is looked up in the result store and returns the
+    stored frame itself, without any JSON round trip. JSON input is parsed as
+    before, preferring the stored frame when it carries a live handle.
+    """
+    if is_result_handle(data):
+        df = get_result(data.strip())
+        if df is None:
+            raise KeyError(f"Result handle not found or expired: {data.strip()}")
+        return df
+
+    data_dict = json.loads(data)
+    if isinstance(data_dict, dict) and "rows" in data_dict:
+        stored = get_result(data_dict.get("handle"))
+        if stored is not None:
+            return stored
+        return pd.DataFrame(data_dict["rows"])
+    return pd.DataFrame(data_dict)
+
+
 @tool("Get DataFrame info and sample data")
+@instrumented("get_dataframe_info")
 def get_dataframe_info(filename: str, sample_rows: int = 5) -> str:
     """
-    Get basic information about a CSV file including column info and sample data.
+    Get basic information about a CSV file including column info, per-column
+    statistics (nulls, distinct counts, min/max, quantiles, top values) and
+    sample data.
     
     Args:
         filename: The path to the CSV file to analyze
@@ -75,84 +141,148 @@ def get_dataframe_info(filename: str, sample_rows: int = 5) -> str:
         JSON string with DataFrame info and sample data
     """
     try:
-        df = pd.read_csv(filename)
+        # The profile is built in one chunked pass per file version and stored
+        profile = get_profile(filename)
+        record_rows(profile["shape"][0])
+        
+        if sample_rows <= len(profile["head"]):
+            sample_data = profile["head"][:sample_rows]
+        else:
+            # Same reader as the profile head (sidecar or CSV), so the values match
+            with closing(iter_chunks(filename, sample_rows)) as chunks:
+                sample = next(chunks, None)
+            sample_data = [] if sample is None else json.loads(
+                sample.to_json(orient='records', date_format='iso')
+            )
         
-        # Get basic info
         info = {
-            "shape": df.shape,
-            "columns": [{"name": col, "dtype": str(df[col].dtype)} for col in df.columns],
-            "null_counts": df.isnull().sum().to_dict(),
-            "sample_data": df.head(sample_rows).to_dict(orient='records')
+            "shape": profile["shape"],
+            "columns": profile["columns"],
+            "null_counts": profile["null_counts"],
+            "column_stats": profile["column_stats"],
+            "sample_data": sample_data
         }
         
-        return json.dumps(info, indent=2)
+        with phase("serialize"):
+            return json.dumps(info, indent=2)
         
     except Exception as e:
         return json.dumps({"error": f"Error analyzing DataFrame: {str(e)}"})
 
 @tool("Save DataFrame to file")
-def save_dataframe(data: str, filename: str, format: str = "csv") -> str:
+@instrumented("save_dataframe")
+def save_dataframe(data: str, filename: str, format: str = "csv", compression: str = None,
+                   row_group_rows: int = None, output_dir: str = None, background: bool = False) -> str:
     """
-    Save a DataFrame (from JSON string) to a file in various formats.
+    Save a DataFrame to a file in various formats.
     
     Args:
-        data: JSON string representation of the DataFrame
+        data: Result handle returned by execute_sql_on_csv (preferred, avoids
+              copying the data), a JSON object {"filename": ..., "sql_query": ...}
+              to stream a query result straight to the file, or a JSON string
+              representation of the DataFrame
         filename: The output filename (without extension)
-        format: Output format ('csv', 'json', 'parquet', 'pickle')
+        format: Output format ('csv', 'json', 'parquet', 'feather', 'arrow', 'pickle')
+        compression: Codec for parquet ('zstd', 'snappy', 'gzip', 'lz4', 'none';
+                     default 'zstd') or feather/arrow ('zstd', 'lz4', 'none';
+                     default 'none')
+        row_group_rows: Rows per Parquet row group / Arrow record batch
+        output_dir: Directory to write to (default: output)
+        background: Return immediately and write on the background writer
+                    thread; the file appears once it is complete. Check on
+                    it with get_write_status and the returned write_id
         
     Returns:
         JSON string with save status and file path
     """
     try:
-        import json
-        from pathlib import Path
+        file_path = output_path(filename, format, output_dir)
+        row_group_rows = row_group_rows or ROW_GROUP_ROWS
         
-        # Parse JSON data back to DataFrame
-        data_dict = json.loads(data)
-        df = pd.DataFrame(data_dict)
-        
-        # Create output directory if it doesn't exist
-        output_dir = Path("output")
-        output_dir.mkdir(exist_ok=True)
-        
-        # Save based on format
-        if format.lower() == "csv":
-            file_path = output_dir / f"{filename}.csv"
-            df.to_csv(file_path, index=False)
-        elif format.lower() == "json":
-            file_path = output_dir / f"{filename}.json"
-            df.to_json(file_path, orient='records', indent=2)
-        elif format.lower() == "parquet":
-            file_path = output_dir / f"{filename}.parquet"
-            df.to_parquet(file_path, index=False)
-        elif format.lower() == "pickle":
-            file_path = output_dir / f"{filename}.pkl"
-            df.to_pickle(file_path)
-        else:
-            return json.dumps({"error": f"Unsupported format: {format}"})
+        with phase("resolve_input"):
+            source = _source_from_data(data, row_group_rows)
         
-        return json.dumps({
-            "status": "success",
-            "file_path": str(file_path),
-            "format": format,
-            "rows": len(df),
-            "columns": len(df.columns)
-        })
+        if background:
+            write_id = submit_write(source, file_path, format, compression, row_group_rows)
+            return json.dumps({
+                "status": "queued",
+                "write_id": write_id,
+                "file_path": str(file_path),
+                "format": format
+            })
         
+        summary = write_frames(source, file_path, format, compression, row_group_rows)
+        record_rows(summary["rows"])
+        return json.dumps({"status": "success", **summary})
+        
+    except KeyError as e:
+        return json.dumps({"error": e.args[0]})
+    except ValueError as e:
+        return json.dumps({"error": str(e)})
     except Exception as e:
         return json.dumps({"error": f"Error saving DataFrame: {str(e)}"})
 
 
+@tool("Check a background save")
+@instrumented("get_write_status")
+def get_write_status(write_id: str) -> str:
+    """
+    Check the status of a save_dataframe call made with background=True.
+    
+    Args:
+        write_id: The write_id returned by save_dataframe
+        
+    Returns:
+        JSON string with the status (queued, running, succeeded, failed or
+        cancelled), the error if it failed, and the file path, rows and
+        columns written once it has succeeded
+    """
+    try:
+        status = write_status(write_id)
+        if status is None:
+            return json.dumps({"error": f"Write ID not found or expired: {write_id}"})
+        result = status.pop("result", None)
+        if result is not None:
+            status.update(result)
+        return json.dumps(status)
+    except Exception as e:
+        return json.dumps({"error": f"Error checking write status: {str(e)}"})
+
+
+def _source_from_data(data: str, batch_rows: int):
+    """
+    Resolve save input to a DataFrame, or to a stream of frames for a query.
+    """
+    if not is_result_handle(data):
+        try:
+            spec = json.loads(data)
+        except ValueError:
+            spec = None
+        if isinstance(spec, dict) and spec.get("sql_query") and spec.get("filename"):
+            return iter_query(spec["filename"], spec["sql_query"], batch_rows)
+    return _frame_from_data(data)
+
+
 @tool("Load DataFrame from file")
-def load_dataframe(filename: str) -> str:
+@instrumented("load_dataframe")
+def load_dataframe(filename: str, columns: list = None, start_row: int = 0, end_row: int = None,
+                   filters: list = None, page_size: int = None) -> str:
     """
-    Load a DataFrame from a file and return as JSON string.
+    Load a saved DataFrame file, or just the part of it you need.
     
     Args:
-        filename: The file path to load from
+        filename: The file path to load from (.csv, .json, .parquet, .feather, .arrow, .pkl)
+        columns: Columns to load (default: all)
+        start_row: First row of the file to load (default: 0)
+        end_row: Row of the file to stop before (default: the end)
+        filters: Conditions that rows must all meet, e.g. [["Age", ">", 30], ["Sex", "==", "female"]];
+                 operators are ==, !=, <, <=, >, >=, in, not in
+        page_size: Number of rows to include inline (default: 50, max: 1000)
         
     Returns:
-        JSON string representation of the DataFrame
+        JSON string with a result handle, the row count, the column schema,
+        the first rows and a next_cursor for fetch_result_page, plus the
+        total rows in the file when known
     """
     try:
         from pathlib import Path
@@ -162,61 +292,68 @@ def load_dataframe(filename: str) -> str:
         if not file_path.exists():
             return json.dumps({"error": f"File not found: {filename}"})
         
-        # Load based on file extension
-        if file_path.suffix.lower() == ".csv":
-            df = pd.read_csv(file_path)
-        elif file_path.suffix.lower() == ".json":
-            df = pd.read_json(file_path)
-        elif file_path.suffix.lower() == ".parquet":
-            df = pd.read_parquet(file_path)
-        elif file_path.suffix.lower() == ".pkl":
-            df = pd.read_pickle(file_path)
-        else:
-            return json.dumps({"error": f"Unsupported file format: {file_path.suffix}"})
+        # Taken before reading, so a concurrent rewrite cannot label new rows as old
+        key = ("file", tuple(dataset_fingerprint(file_path)), columns, start_row, end_row, filters)
+        df, total_rows = read_frame(file_path, columns, start_row, end_row, filters)
+        record_rows(len(df))
         
-        return df.to_json(orient='records')
+        # Keep the loaded rows server-side and return only the first page
+        handle = results.put(df, {"file": filename}, key=key)
+        with phase("serialize"):
+            summary = describe_result(df, handle, page_size)
+            summary["total_rows"] = total_rows
+            return json.dumps(summary)
         
     except Exception as e:
         return json.dumps({"error": f"Error loading DataFrame: {str(e)}"})
 
 
 @tool("Create DataFrame cache")
+@instrumented("cache_dataframe")
 def cache_dataframe(data: str, cache_key: str) -> str:
     """
     Cache a DataFrame in memory for later retrieval within the same session.
+    Least recently used entries are evicted (or spilled to disk) when the
+    cache is full, and entries expire after a time-to-live.
     
     Args:
-        data: JSON string representation of the DataFrame
+        data: Result handle returned by execute_sql_on_csv (preferred, avoids
+              copying the data), or a JSON string representation of the DataFrame
         cache_key: Unique key to identify the cached DataFrame
         
     Returns:
-        JSON string with cache status
+        JSON string with cache status ("cached", or "not_cached" when the
+        DataFrame does not fit in the cache)
     """
     try:
-        import json
-        
-        # Initialize cache if it doesn't exist
-        if not hasattr(cache_dataframe, '_cache'):
-            cache_dataframe._cache = {}
-        
-        # Parse and cache the data
-        data_dict = json.loads(data)
-        df = pd.DataFrame(data_dict)
-        cache_dataframe._cache[cache_key] = df
+        # Parse and cache the data in the current session's namespace
+        with phase("resolve_input"):
+            df = _frame_from_data(data)
+        record_rows(len(df))
+        if not frame_cache.put(cache_key, df):
+            return json.dumps({
+                "status": "not_cached",
+                "cache_key": cache_key,
+                "message": "The DataFrame is too large for the cache; keep using its result handle instead",
+                "cached_items": len(frame_cache.keys())
+            })
         
         return json.dumps({
             "status": "cached",
             "cache_key": cache_key,
             "rows": len(df),
             "columns": len(df.columns),
-            "cached_items": len(cache_dataframe._cache)
+            "cached_items": len(frame_cache.keys())
         })
         
+    except KeyError as e:
+        return json.dumps({"error": e.args[0]})
     except Exception as e:
         return json.dumps({"error": f"Error caching DataFrame: {str(e)}"})
 
 
 @tool("Retrieve cached DataFrame")
+@instrumented("get_cached_dataframe")
 def get_cached_dataframe(cache_key: str) -> str:
     """
     Retrieve a cached DataFrame.
@@ -225,21 +362,22 @@ def get_cached_dataframe(cache_key: str) -> str:
         cache_key: The key used to cache the DataFrame
         
     Returns:
-        JSON string representation of the cached DataFrame
+        JSON string with a result handle for the cached DataFrame, its row
+        count, columns and first rows (use fetch_result_page for more)
     """
     try:
-        if not hasattr(cache_dataframe, '_cache'):
-            return json.dumps({"error": "No cache initialized"})
-        
-        if cache_key not in cache_dataframe._cache:
-            available_keys = list(cache_dataframe._cache.keys())
+        df = frame_cache.get(cache_key)
+        if df is None:
+            available_keys = frame_cache.keys()
             return json.dumps({
                 "error": f"Cache key '{cache_key}' not found",
                 "available_keys": available_keys
             })
         
-        df = cache_dataframe._cache[cache_key]
-        return df.to_json(orient='records')
+        handle = results.put(df, {"cache_key": cache_key})
+        record_rows(len(df))
+        with phase("serialize"):
+            return json.dumps(describe_result(df, handle))
         
     except Exception as e:
         return json.dumps({"error": f"Error retrieving cached DataFrame: {str(e)}"})
@@ -0,0 +1,220 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import NamedTuple
+
+import pandas as pd
+
+from .dtypes import DtypeStore, apply_dtypes
+from .instrumentation import phase
+from .sidecar import SidecarStore
+
+# Directory for derived files (sidecars, schema records, ...)
+CACHE_DIR = Path(os.environ.get("DATAEXP_CACHE_DIR", ".dataexp_cache"))
+# Load frames with compact dtypes unless a caller asks otherwise
+COMPACT_DTYPES = os.environ.get("DATAEXP_COMPACT_DTYPES", "0") == "1"
+
+
+class DatasetFingerprint(NamedTuple):
+    """Identifies one version of a file on disk."""
+
+    path: str
+    mtime_ns: int
+    size: int
+
+    @property
+    def digest(self) -> str:
+        """Short stable hex token for use in cache keys and file names."""
+        raw = f"{self.path}|{self.mtime_ns}|{self.size}".encode("utf-8")
+        return hashlib.sha1(raw).hexdigest()[:16]
+
+
+def dataset_fingerprint(filename) -> DatasetFingerprint:
+    """
+    Build the fingerprint of a file from its resolved path, mtime and size.
+
+    Args:
+        filename: Path to the file
+
+    Returns:
+        DatasetFingerprint for the current version of the file
+    """
+    path = Path(filename).resolve()
+    stat = path.stat()
+    return DatasetFingerprint(str(path), stat.st_mtime_ns, stat.st_size)
+
+
+def _options_key(read_options: dict) -> tuple:
+    return tuple(sorted((key, repr(value)) for key, value in read_options.items()))
+
+
+class DatasetRegistry:
+    """
+    Process-wide store of parsed CSV files.
+
+    Frames are keyed by resolved path, selected columns and parse options, and
+    tagged with the fingerprint of the file they were parsed from. A lookup
+    only re-reads the file when its mtime or size has changed. Every caller
+    gets the same frame object, so callers must treat it as read-only.
+
+    With a sidecar store, CSV files read with default options are converted
+    to Parquet on first access and later reads come from the sidecar, loading
+    only the requested columns.
+
+    Frames loaded with compact=True and default options get compact dtypes
+    (categoricals, downcast numbers, Arrow strings). The dtype map of each
+    file version is inferred on first load and kept in the dtype store.
+    """
+
+    def __init__(self, max_entries: int = 8, sidecars: SidecarStore = None, dtypes: DtypeStore = None,
+                 compact: bool = False):
+        self.max_entries = max_entries
+        self.sidecars = sidecars
+        self.dtypes = dtypes
+        self.compact = compact
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks = {}
+
+    def get(self, filename, columns=None, compact: bool = None, **read_options) -> pd.DataFrame:
+        """
+        Return the parsed DataFrame for a file, parsing it only if needed.
+
+        Args:
+            filename: Path to the CSV file
+            columns: Columns to load (default: all)
+            compact: Use compact dtypes (default: the registry setting);
+                ignored when read_options are given
+            **read_options: Extra keyword arguments passed to pd.read_csv
+
+        Returns:
+            The shared DataFrame for the current version of the file
+        """
+        fingerprint = dataset_fingerprint(filename)
+        columns = tuple(columns) if columns else None
+        if compact is None:
+            compact = self.compact
+        compact = bool(compact) and self.dtypes is not None and not read_options
+        key = (fingerprint.path, columns, compact, _options_key(read_options))
+
+        frame = self._lookup(key, fingerprint)
+        if frame is not None:
+            return frame
+
+        # Serialize parsing per key so concurrent callers parse the file once
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+        with load_lock:
+            frame = self._lookup(key, fingerprint)
+            if frame is not None:
+                return frame
+            frame = self._read(fingerprint, columns, compact, read_options)
+            with self._lock:
+                self._frames[key] = (fingerprint, frame)
+                self._frames.move_to_end(key)
+                while len(self._frames) > self.max_entries:
+                    evicted, _ = self._frames.popitem(last=False)
+                    self._load_locks.pop(evicted, None)
+            return frame
+
+    def _read(self, fingerprint, columns, compact, read_options) -> pd.DataFrame:
+        dtype_map = self.dtypes.lookup(fingerprint) if compact else None
+        if self.sidecars is None or read_options:
+            usecols = list(columns) if columns else None
+            if dtype_map:
+                # Known dtypes are applied while parsing, without a default-typed copy
+                read_options = {"dtype": {c: d for c, d in dtype_map.items() if d}}
+            with phase("parse"):
+                frame = pd.read_csv(fingerprint.path, usecols=usecols, **read_options)
+            return self._compact(fingerprint, frame, dtype_map) if compact else frame
+
+        with phase("sidecar_read"):
+            frame = self.sidecars.read(fingerprint, columns)
+        if frame is None:
+            # First access to this version: parse it fully and keep a sidecar
+            with phase("parse"):
+                frame = pd.read_csv(fingerprint.path)
+            with phase("sidecar_write"):
+                self.sidecars.write(fingerprint, frame)
+            if columns:
+                frame = frame[list(columns)]
+        return self._compact(fingerprint, frame, dtype_map) if compact else frame
+
+    def _compact(self, fingerprint, frame, dtype_map) -> pd.DataFrame:
+        if dtype_map is None or any(column not in dtype_map for column in frame.columns):
+            # Every row of these columns is loaded, so the inferred types hold for the file
+            missing = [column for column in frame.columns if column not in (dtype_map or {})]
+            with phase("dtype_infer"):
+                dtype_map = self.dtypes.infer(fingerprint, frame[missing])
+        with phase("dtype_apply"):
+            return apply_dtypes(frame, dtype_map)
+
+    def _lookup(self, key, fingerprint):
+        with self._lock:
+            entry = self._frames.get(key)
+            if entry is None:
+                return None
+            if entry[0] != fingerprint:
+                # The file changed on disk; drop the stale frame
+                del self._frames[key]
+                return None
+            self._frames.move_to_end(key)
+            return entry[1]
+
+    def invalidate(self, filename=None) -> None:
+        """
+        Drop cached frames for one file, or for every file if none is given.
+
+        Args:
+            filename: Path of the file to forget (default: all files)
+        """
+        with self._lock:
+            if filename is None:
+                self._frames.clear()
+                return
+            path = str(Path(filename).resolve())
+            for key in [k for k in self._frames if k[0] == path]:
+                del self._frames[key]
+
+    def stats(self) -> dict:
+        """Describe the frames currently held by the registry."""
+        with self._lock:
+            return {
+                "entries": len(self._frames),
+                "files": sorted({key[0] for key in self._frames}),
+            }
+
+
+def _default_sidecars():
+    if os.environ.get("DATAEXP_SIDECARS", "1") == "0":
+        return None
+    return SidecarStore(
+        CACHE_DIR / "sidecars",
+        validate=os.environ.get("DATAEXP_SIDECAR_VALIDATE", "mtime"),
+    )
+
+
+registry = DatasetRegistry(
+    max_entries=int(os.environ.get("DATAEXP_MAX_DATASETS", "8")),
+    sidecars=_default_sidecars(),
+    dtypes=DtypeStore(CACHE_DIR / "dtypes"),
+    compact=COMPACT_DTYPES,
+)
+
+
+def load_dataset(filename, columns=None, compact: bool = None, **read_options) -> pd.DataFrame:
+    """
+    Load a CSV file through the shared dataset registry.
+
+    Args:
+        filename: Path to the CSV file
+        columns: Columns to load (default: all)
+        compact: Load with compact dtypes (default: DATAEXP_COMPACT_DTYPES)
+        **read_options: Extra keyword arguments passed to pd.read_csv
+
+    Returns:
+        The shared, read-only DataFrame for the file
+    """
+    return registry.get(filename, columns=columns, compact=compact, **read_options)
@@ -0,0 +1,157 @@
+import json
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .atomic import write_json_atomic
+from .sidecar import columnar_available
+
+# String columns with at most this share of distinct values become categoricals
+CATEGORY_RATIO = 0.5
+CATEGORY_MAX_VALUES = 10_000
+
+
+def _compact_numeric(series: pd.Series):
+    values = series.dropna()
+    if pd.api.types.is_integer_dtype(series.dtype):
+        downcast = pd.to_numeric(series, downcast="integer")
+        return str(downcast.dtype) if downcast.dtype != series.dtype else None
+
+    # Floats: integral values become (nullable) integers, others float32 if exact
+    numbers = values.to_numpy(dtype=np.float64)
+    if len(numbers) and np.all(np.mod(numbers, 1) == 0):
+        downcast = pd.to_numeric(values, downcast="integer")
+        if pd.api.types.is_integer_dtype(downcast.dtype):
+            if len(values) == len(series):
+                return str(downcast.dtype)
+            # Int8, Int16, ... keep the missing values as <NA>
+            return str(downcast.dtype).capitalize()
+    if series.dtype == np.float64 and np.array_equal(numbers.astype(np.float32), numbers):
+        return "float32"
+    return None
+
+
+def _compact_string(series: pd.Series):
+    values = series.dropna()
+    distinct = values.nunique()
+    if len(values) and distinct <= CATEGORY_MAX_VALUES and distinct <= CATEGORY_RATIO * len(values):
+        return "category"
+    if series.dtype == object and columnar_available():
+        if values.map(type).eq(str).all():
+            return "string[pyarrow]"
+    return None
+
+
+def infer_compact_dtypes(df: pd.DataFrame) -> dict:
+    """
+    Pick memory-saving dtypes for the columns of a DataFrame.
+
+    Integers are downcast, integral floats become (nullable) integers, and
+    other floats become float32 only where that changes no value. Strings
+    with few distinct values become categoricals; other object columns
+    holding only strings become Arrow-backed strings.
+
+    Args:
+        df: Frame parsed with the default dtypes
+
+    Returns:
+        Dict of column name to dtype string, for the columns that change
+    """
+    dtype_map = {}
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_bool_dtype(series.dtype):
+            continue
+        if pd.api.types.is_numeric_dtype(series.dtype):
+            dtype = _compact_numeric(series)
+        elif pd.api.types.is_string_dtype(series.dtype):
+            dtype = _compact_string(series)
+        else:
+            dtype = None
+        if dtype is not None:
+            dtype_map[column] = dtype
+    return dtype_map
+
+
+def apply_dtypes(df: pd.DataFrame, dtype_map: dict) -> pd.DataFrame:
+    """
+    Convert the columns of a frame to the dtypes of a map.
+
+    Columns missing from the frame or mapped to None are left as they are,
+    and a column that no longer converts keeps its dtype.
+
+    Returns:
+        New DataFrame with the converted columns
+    """
+    converted = None
+    for column, dtype in dtype_map.items():
+        if dtype is None or column not in df.columns or str(df[column].dtype) == dtype:
+            continue
+        try:
+            series = df[column].astype(dtype)
+        except (TypeError, ValueError):
+            continue
+        if converted is None:
+            converted = df.copy(deep=False)
+        converted[column] = series
+    return df if converted is None else converted
+
+
+class DtypeStore:
+    """
+    Compact dtype maps keyed by file fingerprint.
+
+    The map of a file version is inferred once, kept in memory and persisted
+    as JSON, so later loads and later processes convert the columns without
+    inferring again.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._maps = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, fingerprint):
+        """Return the stored dtype map of a file version, or None."""
+        with self._lock:
+            dtype_map = self._maps.get(fingerprint)
+        if dtype_map is not None:
+            return dtype_map
+        map_path = self.root / f"{fingerprint.digest}.json"
+        if not map_path.exists():
+            return None
+        try:
+            dtype_map = json.loads(map_path.read_text())
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            self._maps[fingerprint] = dtype_map
+        return dtype_map
+
+    def infer(self, fingerprint, df: pd.DataFrame) -> dict:
+        """
+        Infer the dtypes of more columns of a file version and store them.
+
+        Columns that keep their dtype are recorded as None, so a map also
+        tells which columns have been inferred.
+
+        Args:
+            fingerprint: DatasetFingerprint of the file
+            df: Columns parsed from that version with default dtypes, all rows
+
+        Returns:
+            The updated dtype map
+        """
+        inferred = infer_compact_dtypes(df)
+        with self._lock:
+            dtype_map = dict(self._maps.get(fingerprint) or {})
+            dtype_map.update({column: inferred.get(column) for column in df.columns})
+            self._maps[fingerprint] = dtype_map
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            write_json_atomic(self.root / f"{fingerprint.digest}.json", dtype_map)
+        except OSError:
+            # The in-memory map still serves this process
+            pass
+        return dtype_map
@@ -0,0 +1,314 @@
+import contextlib
+import contextvars
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import pandas as pd
+
+from .datasets import CACHE_DIR
+from .query_cache import frame_nbytes
+from .sidecar import columnar_available
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NAMESPACE = "default"
+
+_namespace = contextvars.ContextVar("dataexp_cache_namespace", default=DEFAULT_NAMESPACE)
+
+
+def current_namespace() -> str:
+    """Namespace used by the cache tools in the current context."""
+    return _namespace.get()
+
+
+@contextlib.contextmanager
+def cache_namespace(namespace: str):
+    """
+    Scope cache tool calls to a namespace, e.g. one per Streamlit session.
+
+    Args:
+        namespace: Name of the namespace to use inside the block
+    """
+    token = _namespace.set(namespace or DEFAULT_NAMESPACE)
+    try:
+        yield
+    finally:
+        _namespace.reset(token)
+
+
+def _process_running(pid: int) -> bool:
+    if os.name == "nt":
+        # os.kill would terminate the process there; assume it is alive
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class _Entry:
+    __slots__ = ("frame", "nbytes", "created", "spill_path", "spill_bytes", "spilling")
+
+    def __init__(self, frame, nbytes, created):
+        self.frame = frame
+        self.nbytes = nbytes
+        self.created = created
+        self.spill_path = None
+        self.spill_bytes = 0
+        # Being written to the spill directory; frame stays readable until then
+        self.spilling = False
+
+
+class FrameCache:
+    """
+    Memory-bounded, thread-safe cache of DataFrames grouped in namespaces.
+
+    Resident frames are accounted by their deep memory usage and evicted
+    least recently used first once max_bytes is exceeded. With a spill
+    directory, evicted frames are written there as Parquet and loaded back on
+    the next access instead of being dropped; spilled files are bounded by
+    max_spill_bytes. Entries older than ttl_seconds expire.
+
+    Spill files are written outside the cache lock and named after the
+    process that wrote them, so several processes can share a spill
+    directory. Files left behind by processes that are gone, or older than
+    ttl_seconds, are removed when a cache is created.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, ttl_seconds: float = 3600,
+                 spill_dir=None, max_spill_bytes: int = 2 * 1024 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.spill_dir = spill_dir if spill_dir and columnar_available() else None
+        self.max_spill_bytes = max_spill_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._spill_bytes = 0
+        self._lock = threading.RLock()
+        self._counters = dict.fromkeys(
+            ("hits", "misses", "evictions", "expirations", "spills", "spill_loads"), 0
+        )
+        if self.spill_dir is not None:
+            self._purge_stale_spills()
+
+    def put(self, key: str, df: pd.DataFrame, namespace: str = None) -> bool:
+        """
+        Cache a DataFrame under a key.
+
+        Args:
+            key: Cache key, unique within the namespace
+            df: The DataFrame to cache (stored as-is, treat as read-only)
+            namespace: Namespace of the key (default: current_namespace())
+
+        Returns:
+            True if the frame is cached (in memory or spilled), False if it
+            was evicted right away, e.g. because it alone exceeds the budget
+            and cannot be spilled; the key is then not cached at all
+        """
+        full_key = (namespace or current_namespace(), key)
+        nbytes = frame_nbytes(df)
+        with self._lock:
+            self._remove(full_key)
+            entry = _Entry(df, nbytes, time.monotonic())
+            self._entries[full_key] = entry
+            self._bytes += nbytes
+            self._expire()
+            spills = self._enforce_budget()
+        self._spill(spills)
+        with self._lock:
+            return full_key in self._entries
+
+    def get(self, key: str, namespace: str = None):
+        """
+        Return the cached DataFrame for a key, or None if it is not cached.
+
+        Args:
+            key: Cache key
+            namespace: Namespace of the key (default: current_namespace())
+        """
+        full_key = (namespace or current_namespace(), key)
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry is not None and self._is_expired(entry):
+                self._remove(full_key)
+                self._counters["expirations"] += 1
+                entry = None
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+
+            self._entries.move_to_end(full_key)
+            self._counters["hits"] += 1
+            spills = []
+            if entry.spilling:
+                # Read again while it is being written out: keep it resident
+                entry.spilling = False
+                self._bytes += entry.nbytes
+                spills = self._enforce_budget()
+            frame = entry.frame
+            if frame is None:
+                frame = self._load(entry)
+                spills = self._enforce_budget()
+        self._spill(spills)
+        return frame
+
+    def keys(self, namespace: str = None) -> list:
+        """List the live keys of a namespace."""
+        namespace = namespace or current_namespace()
+        with self._lock:
+            self._expire()
+            return [key for ns, key in self._entries if ns == namespace]
+
+    def delete(self, key: str, namespace: str = None) -> bool:
+        """Remove a key; returns True if it was cached."""
+        with self._lock:
+            return self._remove((namespace or current_namespace(), key))
+
+    def clear(self, namespace: str = None) -> None:
+        """Drop every entry of a namespace, or of all namespaces if none is given."""
+        with self._lock:
+            for full_key in list(self._entries):
+                if namespace is None or full_key[0] == namespace:
+                    self._remove(full_key)
+
+    def stats(self) -> dict:
+        """Counters, memory and disk usage, and entry counts per namespace."""
+        with self._lock:
+            namespaces = {}
+            for ns, _ in self._entries:
+                namespaces[ns] = namespaces.get(ns, 0) + 1
+            resident = sum(1 for entry in self._entries.values() if entry.frame is not None)
+            return {
+                **self._counters,
+                "entries": len(self._entries),
+                "resident_entries": resident,
+                "spilled_entries": len(self._entries) - resident,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "spill_bytes": self._spill_bytes,
+                "namespaces": namespaces,
+            }
+
+    def _is_expired(self, entry) -> bool:
+        return bool(self.ttl_seconds) and time.monotonic() - entry.created > self.ttl_seconds
+
+    def _expire(self) -> None:
+        for full_key in [k for k, entry in self._entries.items() if self._is_expired(entry)]:
+            self._remove(full_key)
+            self._counters["expirations"] += 1
+
+    def _enforce_budget(self) -> list:
+        # Evict resident frames, least recently used first. Frames to spill
+        # are only marked here; the caller writes them with _spill once the
+        # lock is released
+        spills = []
+        for full_key, entry in list(self._entries.items()):
+            if self._bytes <= self.max_bytes:
+                break
+            if entry.frame is None or entry.spilling:
+                continue
+            self._counters["evictions"] += 1
+            if self.spill_dir is None:
+                self._remove(full_key)
+                continue
+            entry.spilling = True
+            self._bytes -= entry.nbytes
+            spills.append((full_key, entry))
+
+        self._bound_spill()
+        return spills
+
+    def _bound_spill(self) -> None:
+        # Bound the spill directory, oldest files first
+        for full_key, entry in list(self._entries.items()):
+            if self._spill_bytes <= self.max_spill_bytes:
+                break
+            if entry.frame is None:
+                self._remove(full_key)
+
+    def _spill(self, spills) -> None:
+        for full_key, entry in spills:
+            path = self.spill_dir / f"{os.getpid()}-{uuid.uuid4().hex}.parquet"
+            try:
+                self.spill_dir.mkdir(parents=True, exist_ok=True)
+                entry.frame.to_parquet(path)
+                spill_bytes = path.stat().st_size
+            except Exception as e:
+                logger.warning("Could not spill cached frame %r: %s", full_key, e)
+                path.unlink(missing_ok=True)
+                path = None
+
+            with self._lock:
+                if self._entries.get(full_key) is not entry or not entry.spilling:
+                    # Removed, replaced or read again while it was written
+                    if path is not None:
+                        path.unlink(missing_ok=True)
+                    continue
+                entry.spilling = False
+                entry.frame = None
+                if path is None:
+                    self._remove(full_key)
+                    continue
+                entry.spill_path = path
+                entry.spill_bytes = spill_bytes
+                self._spill_bytes += spill_bytes
+                self._counters["spills"] += 1
+                self._bound_spill()
+
+    def _purge_stale_spills(self) -> None:
+        # Spill files are named "<pid>-<uuid>.parquet"; anything else predates that
+        if not self.spill_dir.is_dir():
+            return
+        now = time.time()
+        for path in self.spill_dir.glob("*.parquet"):
+            owner = path.name.split("-", 1)[0]
+            try:
+                expired = bool(self.ttl_seconds) and now - path.stat().st_mtime > self.ttl_seconds
+            except OSError:
+                continue
+            if owner.isdigit() and _process_running(int(owner)) and not expired:
+                continue
+            path.unlink(missing_ok=True)
+
+    def _load(self, entry) -> pd.DataFrame:
+        entry.frame = pd.read_parquet(entry.spill_path)
+        self._bytes += entry.nbytes
+        self._discard_spill(entry)
+        self._counters["spill_loads"] += 1
+        return entry.frame
+
+    def _discard_spill(self, entry) -> None:
+        if entry.spill_path is not None:
+            entry.spill_path.unlink(missing_ok=True)
+            self._spill_bytes -= entry.spill_bytes
+            entry.spill_path = None
+            entry.spill_bytes = 0
+
+    def _remove(self, full_key) -> bool:
+        entry = self._entries.pop(full_key, None)
+        if entry is None:
+            return False
+        if entry.frame is not None and not entry.spilling:
+            self._bytes -= entry.nbytes
+        self._discard_spill(entry)
+        return True
+
+
+def _default_spill_dir():
+    if os.environ.get("DATAEXP_FRAME_CACHE_SPILL", "1") == "0":
+        return None
+    return CACHE_DIR / "spill"
+
+
+frame_cache = FrameCache(
+    max_bytes=int(os.environ.get("DATAEXP_FRAME_CACHE_BYTES", str(256 * 1024 * 1024))),
+    ttl_seconds=float(os.environ.get("DATAEXP_FRAME_CACHE_TTL", "3600")),
+    spill_dir=_default_spill_dir(),
+)
@@ -0,0 +1,198 @@
+"""
+Per-call instrumentation for the data tools.
+
+Every tool function is wrapped with @instrumented, which records one entry
+per call: wall time, time spent in named phases (parse, sqlite_load, query,
+serialize, ...), input and output sizes, result row count and, when memory
+tracing is on, the tracemalloc peak. Entries are logged as JSON on the
+"dataexp.tools.calls" logger, optionally appended to the JSONL file named by
+DATAEXP_TOOL_LOG, and kept in a bounded in-memory buffer that the debug panel
+in app.py queries.
+"""
+import contextlib
+import contextvars
+import functools
+import json
+import logging
+import os
+import statistics
+import threading
+import time
+import tracemalloc
+from collections import deque
+from datetime import datetime
+
+logger = logging.getLogger("dataexp.tools.calls")
+
+ENABLED = os.environ.get("DATAEXP_INSTRUMENTATION", "1") != "0"
+LOG_PATH = os.environ.get("DATAEXP_TOOL_LOG")
+
+_current = contextvars.ContextVar("dataexp_tool_call", default=None)
+_records = deque(maxlen=int(os.environ.get("DATAEXP_TOOL_LOG_SIZE", "1000")))
+_lock = threading.Lock()
+_trace_memory = os.environ.get("DATAEXP_TRACE_MALLOC", "0") == "1"
+
+
+def set_memory_tracing(enabled: bool) -> None:
+    """
+    Turn tracemalloc peak measurement on or off.
+
+    Tracing slows allocation-heavy calls noticeably, so it is off by default
+    (DATAEXP_TRACE_MALLOC=1 turns it on at startup). The peak is process-wide,
+    so concurrent calls see each other's allocations.
+    """
+    global _trace_memory
+    _trace_memory = enabled
+    if enabled and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    elif not enabled and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def memory_tracing_enabled() -> bool:
+    return _trace_memory
+
+
+@contextlib.contextmanager
+def phase(name: str):
+    """
+    Attribute the time spent in a block to a named phase of the current call.
+
+    Does nothing outside an instrumented tool call.
+    """
+    record = _current.get()
+    if record is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        phases = record["phases"]
+        phases[name] = phases.get(name, 0.0) + time.perf_counter() - start
+
+
+def record_rows(rows: int) -> None:
+    """Record the number of result rows of the current call."""
+    record = _current.get()
+    if record is not None:
+        record["rows"] = int(rows)
+
+
+def _size(value) -> int:
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    return len(str(value).encode("utf-8"))
+
+
+def _emit(record: dict) -> None:
+    with _lock:
+        _records.append(record)
+        if LOG_PATH:
+            try:
+                with open(LOG_PATH, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+            except OSError:
+                pass
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps(record))
+
+
+def instrumented(tool_name: str):
+    """
+    Decorator recording timing and size information for each tool call.
+
+    Apply it below @tool so the tool wraps the instrumented function.
+
+    Args:
+        tool_name: Name under which calls are recorded
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+
+            record = {
+                "tool": tool_name,
+                "started_at": datetime.now().isoformat(timespec="milliseconds"),
+                "input_bytes": sum(_size(a) for a in args) + sum(_size(v) for v in kwargs.values()),
+                "phases": {},
+                "rows": None,
+            }
+            trace = _trace_memory and tracemalloc.is_tracing()
+            if trace:
+                tracemalloc.reset_peak()
+            token = _current.set(record)
+            start = time.perf_counter()
+            result = None
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as e:
+                record["error"] = True
+                record["exception"] = type(e).__name__
+                raise
+            finally:
+                record["duration_s"] = time.perf_counter() - start
+                if trace:
+                    record["tracemalloc_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+                _current.reset(token)
+                # Emitted here so calls that raise are recorded as well
+                if record.setdefault("error", False):
+                    record["output_bytes"] = 0
+                else:
+                    record["output_bytes"] = _size(result)
+                    if isinstance(result, str) and result.startswith(('{"error"', "Error")):
+                        record["error"] = True
+                _emit(record)
+            return result
+        return wrapper
+    return decorator
+
+
+def recent_calls(tool: str = None, limit: int = 100) -> list:
+    """
+    Return the most recent call records, newest first.
+
+    Args:
+        tool: Only return calls of this tool (default: all tools)
+        limit: Maximum number of records
+    """
+    with _lock:
+        records = list(_records)
+    if tool:
+        records = [r for r in records if r["tool"] == tool]
+    return records[::-1][:limit]
+
+
+def summarize_calls() -> list:
+    """Aggregate the buffered records per tool: counts, latency and phase totals."""
+    with _lock:
+        records = list(_records)
+    by_tool = {}
+    for record in records:
+        by_tool.setdefault(record["tool"], []).append(record)
+
+    summary = []
+    for tool, calls in sorted(by_tool.items()):
+        durations = sorted(r["duration_s"] for r in calls)
+        phases = {}
+        for r in calls:
+            for name, seconds in r["phases"].items():
+                phases[name] = phases.get(name, 0.0) + seconds
+        summary.append({
+            "tool": tool,
+            "calls": len(calls),
+            "errors": sum(1 for r in calls if r.get("error")),
+            "mean_s": statistics.fmean(durations),
+            "p95_s": durations[min(len(durations) - 1, int(0.95 * len(durations)))],
+            "total_s": sum(durations),
+            "output_bytes": sum(r.get("output_bytes", 0) for r in calls),
+            "phases_s": phases,
+        })
+    return summary
+
+
+def clear_calls() -> None:
+    with _lock:
+        _records.clear()
@@ -0,0 +1,178 @@
+from pathlib import Path
+
+import pandas as pd
+
+from .instrumentation import phase
+
+# File extension -> how the file is read
+READ_FORMATS = {
+    ".csv": "csv",
+    ".json": "json",
+    ".parquet": "parquet",
+    ".feather": "arrow",
+    ".arrow": "arrow",
+    ".pkl": "pickle",
+}
+
+
+def _spans(sizes, start: int, end):
+    """Yield (index, first row, end row) of the chunks overlapping rows [start, end)."""
+    offset = 0
+    for index, size in enumerate(sizes):
+        chunk_start, chunk_end = offset, offset + size
+        offset = chunk_end
+        if chunk_end <= start:
+            continue
+        if end is not None and chunk_start >= end:
+            break
+        lo = max(start - chunk_start, 0)
+        hi = size if end is None else min(end - chunk_start, size)
+        yield index, lo, hi
+
+
+def _filter_expression(filters):
+    if not filters:
+        return None, []
+    import pyarrow.parquet as pq
+
+    conditions = []
+    for condition in filters:
+        if not isinstance(condition, (list, tuple)) or len(condition) != 3:
+            raise ValueError(f"Each filter must be [column, operator, value], got: {condition!r}")
+        conditions.append(tuple(condition))
+    return pq.filters_to_expression(conditions), [condition[0] for condition in conditions]
+
+
+def _read_columns(columns, filter_columns):
+    # Filter columns are read too, and dropped again after filtering
+    if columns is None:
+        return None
+    return list(columns) + [c for c in dict.fromkeys(filter_columns) if c not in columns]
+
+
+def _finish(table, columns, expression):
+    if expression is not None:
+        table = table.filter(expression)
+    if columns is not None:
+        table = table.select(list(columns))
+    return table
+
+
+def _read_parquet(path, columns, start, end, expression, filter_columns):
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(path, memory_map=True)
+    metadata = parquet_file.metadata
+    sizes = [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)]
+
+    candidates = None
+    if expression is not None:
+        # Row groups whose min/max statistics rule out the filter are never read
+        fragment = next(iter(ds.dataset(path, format="parquet").get_fragments()))
+        candidates = {
+            piece.row_groups[0].id for piece in fragment.split_by_row_group(expression)
+        }
+
+    read_columns = _read_columns(columns, filter_columns)
+    tables = []
+    for index, lo, hi in _spans(sizes, start, end):
+        if candidates is not None and index not in candidates:
+            continue
+        table = parquet_file.read_row_group(index, columns=read_columns)
+        tables.append(_finish(table.slice(lo, hi - lo), columns, expression))
+    if tables:
+        table = pa.concat_tables(tables)
+    else:
+        table = _finish(parquet_file.schema_arrow.empty_table(), columns, None)
+    return table.to_pandas(), metadata.num_rows
+
+
+def _read_arrow(path, columns, start, end, expression, filter_columns):
+    import pyarrow as pa
+
+    # Memory-mapped: only the record batches in range are touched, and
+    # uncompressed columns are used in place without copying
+    reader = pa.ipc.open_file(pa.memory_map(str(path), "r"))
+    batches = [reader.get_batch(i) for i in range(reader.num_record_batches)]
+    read_columns = _read_columns(columns, filter_columns)
+    selected = []
+    for index, lo, hi in _spans([batch.num_rows for batch in batches], start, end):
+        batch = batches[index].slice(lo, hi - lo)
+        selected.append(batch.select(read_columns) if read_columns is not None else batch)
+    if selected:
+        table = pa.Table.from_batches(selected)
+    else:
+        schema = reader.schema
+        if read_columns is not None:
+            schema = pa.schema([schema.field(name) for name in read_columns])
+        table = schema.empty_table()
+    table = _finish(table, columns, expression)
+    # Arrow-backed columns keep pointing into the mapped file
+    return table.to_pandas(types_mapper=pd.ArrowDtype), sum(batch.num_rows for batch in batches)
+
+
+def _read_pandas(path, kind, columns, start, end, expression, filter_columns):
+    import pyarrow as pa
+
+    read_columns = _read_columns(columns, filter_columns)
+    total = None
+    if kind == "csv":
+        # Rows before the range are skipped while parsing, rows after it not parsed
+        df = pd.read_csv(
+            path,
+            usecols=read_columns,
+            skiprows=range(1, start + 1) if start else None,
+            nrows=None if end is None else max(end - start, 0),
+        )
+    else:
+        df = pd.read_json(path) if kind == "json" else pd.read_pickle(path)
+        total = len(df)
+        df = df.iloc[start:end]
+        if read_columns is not None:
+            df = df[read_columns]
+    if expression is None:
+        return (df[list(columns)] if columns is not None else df), total
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    return _finish(table, columns, expression).to_pandas(), total
+
+
+def read_frame(filename, columns=None, start_row: int = 0, end_row: int = None, filters=None):
+    """
+    Read part of a saved DataFrame file.
+
+    Only the requested columns and rows are read where the format allows:
+    Feather/Arrow files are memory-mapped and sliced by record batch, Parquet
+    files are read per row group, skipping row groups outside the row range
+    or ruled out by the filters' statistics, and CSV files are parsed only up
+    to the end of the range.
+
+    Args:
+        filename: Path to a .csv, .json, .parquet, .feather, .arrow or .pkl file
+        columns: Columns to load (default: all)
+        start_row: First row of the file to load
+        end_row: Row of the file to stop before (default: the end)
+        filters: Conditions [column, operator, value] that rows must all meet,
+            applied within the row range; operators are ==, !=, <, <=, >, >=,
+            in and not in
+
+    Returns:
+        Tuple of (DataFrame, total rows in the file or None if not known
+        without reading the whole file)
+    """
+    path = Path(filename)
+    kind = READ_FORMATS.get(path.suffix.lower())
+    if kind is None:
+        raise ValueError(f"Unsupported file format: {path.suffix}")
+    start_row = max(int(start_row or 0), 0)
+    if end_row is not None:
+        end_row = max(int(end_row), start_row)
+    expression, filter_columns = _filter_expression(filters)
+
+    with phase("parse"):
+        if kind == "parquet":
+            return _read_parquet(path, columns, start_row, end_row, expression, filter_columns)
+        if kind == "arrow":
+            return _read_arrow(path, columns, start_row, end_row, expression, filter_columns)
+        return _read_pandas(path, kind, columns, start_row, end_row, expression, filter_columns)
@@ -0,0 +1,275 @@
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .atomic import write_json_atomic
+from .chunked_sql import DEFAULT_CHUNK_ROWS, iter_chunks
+from .datasets import CACHE_DIR, dataset_fingerprint
+from .instrumentation import phase
+
+# Rows of the file kept in the profile as sample data
+PROFILE_HEAD_ROWS = 100
+# Values kept per column to estimate quantiles and distinct counts
+SKETCH_SIZE = int(os.environ.get("DATAEXP_PROFILE_SKETCH_SIZE", "65536"))
+# Candidate values tracked per column for the top values
+TOP_CANDIDATES = 10_000
+TOP_VALUES = 5
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+_HASH_SPACE = float(2 ** 64)
+
+
+def _json_value(value):
+    if value is None:
+        return None
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        return str(value)
+    return value
+
+
+class _ColumnAccumulator:
+    """Statistics of one column, merged chunk by chunk."""
+
+    def __init__(self, name, sketch_size: int, rng):
+        self.name = name
+        self.sketch_size = sketch_size
+        self.rng = rng
+        self.dtypes = []
+        self.nulls = 0
+        self.non_null = 0
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.counts = None
+        self.counts_truncated = False
+        self.numeric = None
+        # Count, mean and sum of squared deviations, merged per chunk (Chan et
+        # al.), of the values minus the first one so large offsets keep precision
+        self.shift = 0.0
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum = None
+        self.maximum = None
+        self.sample_keys = np.empty(0)
+        self.sample = np.empty(0)
+
+    def add(self, series: pd.Series) -> None:
+        values = series.dropna()
+        self.nulls += len(series) - len(values)
+        self.non_null += len(values)
+        if len(values) == 0:
+            if not self.dtypes:
+                self.dtypes.append(series.dtype)
+            return
+        self.dtypes.append(series.dtype)
+
+        # Distinct count: keep the smallest hashes (KMV sketch), exact below sketch_size
+        hashes = np.unique(pd.util.hash_pandas_object(values, index=False).to_numpy())
+        self.hashes = np.union1d(self.hashes, hashes)[:self.sketch_size]
+
+        counts = values.value_counts()
+        self.counts = counts if self.counts is None else self.counts.add(counts, fill_value=0)
+        if len(self.counts) > TOP_CANDIDATES:
+            self.counts = self.counts.nlargest(TOP_CANDIDATES)
+            self.counts_truncated = True
+
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            if self.numeric is None:
+                self.numeric = True
+            numbers = values.to_numpy(dtype=np.float64)
+            self._merge_moments(numbers)
+            low, high = numbers.min(), numbers.max()
+            self.minimum = low if self.minimum is None else min(self.minimum, low)
+            self.maximum = high if self.maximum is None else max(self.maximum, high)
+            # Uniform sample for the quantiles: keep the values with the smallest random keys
+            keys = np.concatenate([self.sample_keys, self.rng.random(len(numbers))])
+            sample = np.concatenate([self.sample, numbers])
+            if len(keys) > self.sketch_size:
+                keep = np.argpartition(keys, self.sketch_size)[:self.sketch_size]
+                keys, sample = keys[keep], sample[keep]
+            self.sample_keys, self.sample = keys, sample
+        else:
+            self.numeric = False
+
+    def _merge_moments(self, numbers) -> None:
+        if self.count == 0:
+            self.shift = numbers[0]
+        numbers = numbers - self.shift
+        count = len(numbers)
+        mean = numbers.mean()
+        m2 = np.square(numbers - mean).sum()
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+
+    def dtype(self) -> str:
+        dtypes = list(dict.fromkeys(self.dtypes))
+        if len(dtypes) == 1:
+            return str(dtypes[0])
+        if all(pd.api.types.is_numeric_dtype(d) and not pd.api.types.is_bool_dtype(d) for d in dtypes):
+            return str(np.result_type(*[np.dtype(d) for d in dtypes]))
+        return "object"
+
+    def result(self) -> dict:
+        stats = {
+            "dtype": self.dtype(),
+            "nulls": int(self.nulls),
+            "distinct": self._distinct(),
+            "distinct_approx": len(self.hashes) >= self.sketch_size,
+        }
+        if self.counts is not None:
+            top = self.counts.nlargest(TOP_VALUES)
+            stats["top_values"] = [
+                {"value": _json_value(value), "count": int(count)} for value, count in top.items()
+            ]
+            stats["top_values_approx"] = self.counts_truncated
+        if self.numeric and self.count:
+            variance = self.m2 / (self.count - 1) if self.count > 1 else 0.0
+            stats.update({
+                "min": _json_value(self.minimum),
+                "max": _json_value(self.maximum),
+                "mean": _json_value(self.shift + self.mean),
+                "std": _json_value(np.sqrt(variance)),
+                "quantiles": {
+                    str(q): _json_value(v)
+                    for q, v in zip(QUANTILES, np.quantile(self.sample, QUANTILES))
+                },
+                "quantiles_approx": self.non_null > self.sketch_size,
+            })
+        return stats
+
+    def _distinct(self) -> int:
+        if len(self.hashes) < self.sketch_size:
+            return int(len(self.hashes))
+        # K minimum values estimate from the k-th smallest hash
+        return int((self.sketch_size - 1) / (float(self.hashes[-1]) / _HASH_SPACE))
+
+
+def build_profile(filename, chunk_rows: int = DEFAULT_CHUNK_ROWS, sketch_size: int = SKETCH_SIZE) -> dict:
+    """
+    Profile a dataset in a single chunked pass.
+
+    Null counts, min/max, mean and std are exact. Distinct counts, quantiles
+    and top values are exact for columns below sketch_size values and
+    estimated from bounded sketches above, flagged by the *_approx fields.
+
+    Args:
+        filename: Path to the CSV file
+        chunk_rows: Rows processed at a time
+        sketch_size: Values kept per column for the estimates
+
+    Returns:
+        JSON-serializable profile dict
+    """
+    rng = np.random.default_rng(0)
+    accumulators = None
+    head = None
+    rows = 0
+    for chunk in iter_chunks(filename, chunk_rows):
+        if accumulators is None:
+            accumulators = [_ColumnAccumulator(col, sketch_size, rng) for col in chunk.columns]
+            head = chunk.head(PROFILE_HEAD_ROWS)
+        rows += len(chunk)
+        for accumulator in accumulators:
+            accumulator.add(chunk[accumulator.name])
+
+    if accumulators is None:
+        header = pd.read_csv(filename, nrows=0)
+        accumulators = [_ColumnAccumulator(col, sketch_size, rng) for col in header.columns]
+        head = header
+
+    stats = {accumulator.name: accumulator.result() for accumulator in accumulators}
+    return {
+        "shape": [rows, len(accumulators)],
+        "columns": [{"name": name, "dtype": s["dtype"]} for name, s in stats.items()],
+        "null_counts": {name: s["nulls"] for name, s in stats.items()},
+        "column_stats": stats,
+        "head": json.loads(head.to_json(orient='records', date_format='iso')),
+    }
+
+
+class ProfileStore:
+    """
+    Dataset profiles keyed by file fingerprint.
+
+    A profile is built once per version of a file, kept in memory and
+    persisted as JSON, so later calls and later processes read the stored
+    result instead of scanning the data again.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._records = {}
+        self._lock = threading.Lock()
+        self._build_locks = {}
+
+    def get(self, filename) -> dict:
+        """
+        Return the profile of the current version of a file, building it if needed.
+
+        Args:
+            filename: Path to the CSV file
+
+        Returns:
+            Profile dict (see build_profile)
+        """
+        fingerprint = dataset_fingerprint(filename)
+        with self._lock:
+            record = self._records.get(fingerprint)
+            build_lock = self._build_locks.setdefault(fingerprint.digest, threading.Lock())
+        if record is not None:
+            return record
+
+        # One build per file version, even with concurrent callers
+        with build_lock:
+            with self._lock:
+                record = self._records.get(fingerprint)
+            if record is not None:
+                return record
+
+            record_path = self.root / f"{fingerprint.digest}.json"
+            if record_path.exists():
+                try:
+                    record = json.loads(record_path.read_text())
+                except (OSError, ValueError):
+                    record = None
+            if record is None:
+                with phase("profile"):
+                    record = build_profile(fingerprint.path)
+                self._persist(record_path, record)
+
+            with self._lock:
+                self._records[fingerprint] = record
+            return record
+
+    def _persist(self, record_path, record: dict) -> None:
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            write_json_atomic(record_path, record)
+        except OSError:
+            # The in-memory record still serves this process
+            pass
+
+
+profiles = ProfileStore(CACHE_DIR / "profiles")
+
+
+def get_profile(filename) -> dict:
+    """
+    Look up the stored profile of a dataset.
+
+    Args:
+        filename: Path to the CSV file
+
+    Returns:
+        Dict with 'shape', 'columns', 'null_counts', 'column_stats' and 'head'
+    """
+    return profiles.get(filename)
@@ -0,0 +1,162 @@
+import re
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+# Words normalized to upper case; identifiers, literals and function names keep
+# their case because SQLite echoes unaliased expressions as result column names
+SQL_KEYWORDS = frozenset("""
+    ALL AND AS ASC BETWEEN BY CASE CROSS DESC DISTINCT ELSE END EXCEPT EXISTS
+    FROM FULL GLOB GROUP HAVING IN INNER INTERSECT IS JOIN LEFT LIKE LIMIT NOT
+    NULL OFFSET ON OR ORDER OUTER RIGHT SELECT THEN UNION USING WHEN WHERE WITH
+""".split())
+
+_TOKEN_RE = re.compile(
+    r"""
+    (?P<string>'(?:[^']|'')*')           # string literal
+    | (?P<quoted>"(?:[^"]|"")*"|`[^`]*`|\[[^\]]*\])  # quoted identifier
+    | (?P<word>[A-Za-z_][A-Za-z0-9_]*)
+    | (?P<space>\s+)
+    | (?P<other>.)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+
+def tokenize_sql(sql_query: str):
+    """
+    Split SQL text into (kind, token) pairs.
+
+    Kinds are 'string', 'quoted', 'word', 'space' and 'other' (single
+    punctuation characters).
+    """
+    for match in _TOKEN_RE.finditer(sql_query):
+        yield match.lastgroup, match.group()
+
+
+def normalize_sql(sql_query: str) -> str:
+    """
+    Normalize a SQL statement for use as a cache key.
+
+    Collapses whitespace outside literals, upper-cases keywords and strips
+    trailing semicolons, so trivially different spellings of the same query
+    share one cache entry.
+
+    Args:
+        sql_query: The SQL statement to normalize
+
+    Returns:
+        Normalized SQL text
+    """
+    parts = []
+    pending_space = False
+    for kind, token in tokenize_sql(sql_query.strip()):
+        if kind == "space":
+            pending_space = True
+            continue
+        if pending_space and parts:
+            parts.append(" ")
+        pending_space = False
+        if kind == "word" and token.upper() in SQL_KEYWORDS:
+            token = token.upper()
+        parts.append(token)
+
+    normalized = "".join(parts)
+    while normalized.endswith(";"):
+        normalized = normalized[:-1].rstrip()
+    return normalized
+
+
+def _copy_on_write() -> bool:
+    # Always on from pandas 3; opt-in on pandas 2
+    if int(pd.__version__.split(".")[0]) >= 3:
+        return True
+    return pd.options.mode.copy_on_write is True
+
+
+def detached(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Copy of a frame that can be modified without affecting the original.
+
+    Under Copy-on-Write this is a cheap shallow copy; data is only copied
+    once either side is modified.
+    """
+    return df.copy(deep=not _copy_on_write())
+
+
+def frame_nbytes(df: pd.DataFrame) -> int:
+    """Deep memory footprint of a DataFrame in bytes."""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class QueryResultCache:
+    """
+    LRU cache of query results bounded by their total size in bytes.
+
+    Keys combine the dataset fingerprint with the normalized SQL text, so a
+    changed file never serves results computed from its previous version.
+    Frames are detached on the way in and out, so a caller modifying its
+    result never changes what later callers get.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(fingerprint, sql_query: str, engine: str = "") -> tuple:
+        return (tuple(fingerprint), engine, normalize_sql(sql_query))
+
+    def get(self, key):
+        """Return the cached frame for a key, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            df = entry[0]
+        return detached(df)
+
+    def put(self, key, df: pd.DataFrame) -> None:
+        """Store a result, evicting least recently used entries to fit the budget."""
+        nbytes = frame_nbytes(df)
+        if nbytes > self.max_bytes:
+            return
+        df = detached(df)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (df, nbytes)
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self._bytes -= evicted_bytes
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size of the cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
@@ -0,0 +1,245 @@
+import contextlib
+import contextvars
+import hashlib
+import json
+import os
+import re
+import threading
+import uuid
+import weakref
+from collections import OrderedDict
+
+import pandas as pd
+
+from .query_cache import frame_nbytes
+
+# Rows returned inline with a query result and per fetched page
+DEFAULT_PAGE_ROWS = int(os.environ.get("DATAEXP_RESULT_PAGE_ROWS", "50"))
+MAX_PAGE_ROWS = 1000
+
+_HANDLE_RE = re.compile(r"^res_[0-9a-f]{12}$")
+
+_captured_sources = contextvars.ContextVar("dataexp_captured_sources", default=None)
+
+
+@contextlib.contextmanager
+def capture_sources():
+    """
+    Collect the source descriptions of results stored inside the block.
+
+    Yields:
+        List that receives the source dict of every result put in the store
+    """
+    sources = []
+    token = _captured_sources.set(sources)
+    try:
+        yield sources
+    finally:
+        _captured_sources.reset(token)
+
+
+def content_handle(df: pd.DataFrame) -> str:
+    """
+    Derive a handle ID from the content of a result.
+
+    Equal results get equal handles, across calls and processes, so tool
+    outputs (and the LLM prompts that quote them) repeat exactly when a run
+    is repeated. Frames whose values cannot be hashed get a random handle.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps([[str(col), str(df[col].dtype)] for col in df.columns]).encode())
+    try:
+        digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    except TypeError:
+        return f"res_{uuid.uuid4().hex[:12]}"
+    return f"res_{digest.hexdigest()[:12]}"
+
+
+def key_handle(key) -> str:
+    """Derive a handle ID from a key that identifies the content of a result."""
+    return f"res_{hashlib.sha256(repr(key).encode()).hexdigest()[:12]}"
+
+
+class ResultStore:
+    """
+    Server-side store of query results addressed by handle IDs.
+
+    Tools hand out a handle plus a bounded first page instead of serializing
+    whole results, and later pages are fetched by cursor. The store keeps the
+    most recently used results within an entry count and byte budget; older
+    handles expire.
+
+    Hashing a frame's content costs a full pass over it, so callers that know
+    what the result is (a query on a file version, a slice of a file) pass
+    that as the key instead, and a frame object stored again reuses the
+    handle computed the first time.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 512 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # id(frame) -> (weak reference, content handle)
+        self._known_frames = {}
+
+    def put(self, df: pd.DataFrame, source: dict = None, key=None) -> str:
+        """
+        Store a result and return its handle ID.
+
+        Args:
+            df: The result DataFrame (stored as-is, treat as read-only)
+            source: Optional description of where the result came from
+            key: Optional identity of the content, e.g. the query-cache key;
+                 equal keys must mean equal results. Without it the handle
+                 is derived from the content
+
+        Returns:
+            Handle ID for the stored result
+        """
+        handle = key_handle(key) if key is not None else self._content_handle(df)
+        nbytes = frame_nbytes(df)
+        captured = _captured_sources.get()
+        if captured is not None:
+            captured.append(dict(source or {}))
+        with self._lock:
+            # An equal result stored again replaces the earlier entry
+            previous = self._entries.pop(handle, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[handle] = (df, nbytes, source or {})
+            self._bytes += nbytes
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                _, (_, evicted_bytes, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_bytes
+        return handle
+
+    def _content_handle(self, df: pd.DataFrame) -> str:
+        known = self._known_frames.get(id(df))
+        if known is not None and known[0]() is df:
+            return known[1]
+        handle = content_handle(df)
+        frame_id = id(df)
+
+        def forget(ref):
+            # Runs when the frame is collected; plain dict operations need no lock
+            if self._known_frames.get(frame_id, (None,))[0] is ref:
+                self._known_frames.pop(frame_id, None)
+
+        self._known_frames[frame_id] = (weakref.ref(df, forget), handle)
+        return handle
+
+    def get(self, handle: str):
+        """Return the DataFrame stored under a handle, or None if it expired."""
+        with self._lock:
+            entry = self._entries.get(handle)
+            if entry is None:
+                return None
+            self._entries.move_to_end(handle)
+            return entry[0]
+
+    def source(self, handle: str) -> dict:
+        """Return the source description stored with a handle."""
+        with self._lock:
+            entry = self._entries.get(handle)
+            return dict(entry[2]) if entry is not None else {}
+
+    def __contains__(self, handle) -> bool:
+        with self._lock:
+            return handle in self._entries
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes}
+
+
+results = ResultStore()
+
+
+def _rows(df: pd.DataFrame) -> list:
+    return json.loads(df.to_json(orient='records', date_format='iso'))
+
+
+def _clamp_page_size(page_size) -> int:
+    if page_size is None or page_size <= 0:
+        return DEFAULT_PAGE_ROWS
+    return min(int(page_size), MAX_PAGE_ROWS)
+
+
+def describe_result(df: pd.DataFrame, handle: str, page_size: int = None) -> dict:
+    """
+    Summarize a stored result: row count, schema, first page and cursor.
+
+    Args:
+        df: The stored result DataFrame
+        handle: Handle ID the result is stored under
+        page_size: Rows to include inline (default: DATAEXP_RESULT_PAGE_ROWS)
+
+    Returns:
+        JSON-serializable dict describing the result
+    """
+    page_size = _clamp_page_size(page_size)
+    row_count = len(df)
+    return {
+        "handle": handle,
+        "row_count": row_count,
+        "columns": [{"name": col, "dtype": str(df[col].dtype)} for col in df.columns],
+        "rows": _rows(df.iloc[:page_size]),
+        "next_cursor": page_size if row_count > page_size else None,
+    }
+
+
+def fetch_page(handle: str, cursor: int = 0, page_size: int = None) -> dict:
+    """
+    Fetch one page of a stored result.
+
+    Args:
+        handle: Handle ID returned by a query
+        cursor: Index of the first row of the page
+        page_size: Number of rows in the page
+
+    Returns:
+        JSON-serializable dict with the rows and the cursor of the next page
+
+    Raises:
+        KeyError: If the handle is unknown or has expired
+    """
+    df = results.get(handle)
+    if df is None:
+        raise KeyError(handle)
+    page_size = _clamp_page_size(page_size)
+    cursor = max(int(cursor or 0), 0)
+    end = cursor + page_size
+    return {
+        "handle": handle,
+        "row_count": len(df),
+        "cursor": cursor,
+        "rows": _rows(df.iloc[cursor:end]),
+        "next_cursor": end if end < len(df) else None,
+    }
+
+
+def is_result_handle(value) -> bool:
+    """True if a value looks like a result handle ID."""
+    return isinstance(value, str) and _HANDLE_RE.match(value.strip()) is not None
+
+
+def get_result(handle: str):
+    """
+    Return the DataFrame behind a result handle, or None if it expired.
+
+    Args:
+        handle: Handle ID returned by a query
+
+    Returns:
+        The stored DataFrame (shared, treat as read-only) or None
+    """
+    return results.get(handle)
@@ -0,0 +1,93 @@
+import json
+import os
+import threading
+
+import pandas as pd
+
+from .atomic import write_json_atomic
+from .datasets import CACHE_DIR, dataset_fingerprint
+
+# Rows read to infer column dtypes
+DEFAULT_SAMPLE_ROWS = int(os.environ.get("DATAEXP_SCHEMA_SAMPLE_ROWS", "10000"))
+
+
+class SchemaStore:
+    """
+    Column names and dtypes of CSV files, inferred from a bounded sample.
+
+    Only the header and the first sample_rows rows are parsed, so the cost of
+    a lookup does not grow with the file. Records are keyed by the file
+    fingerprint, kept in memory and persisted as JSON so later processes skip
+    inference entirely.
+    """
+
+    def __init__(self, root, sample_rows: int = DEFAULT_SAMPLE_ROWS):
+        self.root = root
+        self.sample_rows = sample_rows
+        self._records = {}
+        self._lock = threading.Lock()
+
+    def get(self, filename) -> dict:
+        """
+        Return the schema record for the current version of a file.
+
+        Args:
+            filename: Path to the CSV file
+
+        Returns:
+            Dict with 'columns' (list of name/dtype dicts) and 'sample_rows'
+        """
+        fingerprint = dataset_fingerprint(filename)
+        with self._lock:
+            record = self._records.get(fingerprint)
+        if record is not None:
+            return record
+
+        record_path = self.root / f"{fingerprint.digest}.json"
+        record = None
+        if record_path.exists():
+            try:
+                record = json.loads(record_path.read_text())
+            except (OSError, ValueError):
+                record = None
+        if record is None:
+            record = self._infer(fingerprint.path)
+            self._persist(record_path, record)
+
+        with self._lock:
+            self._records[fingerprint] = record
+        return record
+
+    def _infer(self, path: str) -> dict:
+        sample = pd.read_csv(path, nrows=self.sample_rows)
+        return {
+            "columns": [
+                {"name": col, "dtype": str(sample[col].dtype)}
+                for col in sample.columns
+            ],
+            "sample_rows": len(sample),
+        }
+
+    def _persist(self, record_path, record: dict) -> None:
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            write_json_atomic(record_path, record)
+        except OSError:
+            # The in-memory record still serves this process
+            pass
+
+
+schemas = SchemaStore(CACHE_DIR / "schemas")
+
+
+def get_schema(filename) -> dict:
+    """
+    Look up the sampled schema of a CSV file.
+
+    Args:
+        filename: Path to the CSV file
+
+    Returns:
+        Dict with 'columns' (list of name/dtype dicts) and 'sample_rows'
+    """
+    return schemas.get(filename)
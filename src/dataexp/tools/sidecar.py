@@ -0,0 +1,132 @@
+import hashlib
+import json
+import logging
+from pathlib import Path
+
+import pandas as pd
+
+from .atomic import atomic_path, write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+
+def columnar_available() -> bool:
+    """True if pyarrow is installed, so Parquet sidecars can be used."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def file_sha256(path, block_size: int = 1024 * 1024) -> str:
+    """Hash the contents of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class SidecarStore:
+    """
+    Parquet copies of CSV files kept in a cache directory.
+
+    A sidecar is written the first time a CSV file is parsed and serves later
+    reads, with column projection, until the source changes. The source is
+    considered changed when its mtime or size differs from the recorded
+    values; with validate="hash", a file whose mtime changed but whose content
+    hash did not keeps its sidecar.
+    """
+
+    def __init__(self, root, validate: str = "mtime"):
+        self.root = Path(root)
+        self.validate = validate
+
+    def _base(self, source_path: str) -> Path:
+        name = hashlib.sha1(source_path.encode("utf-8")).hexdigest()[:16]
+        return self.root / f"{Path(source_path).stem}-{name}"
+
+    def _meta_path(self, source_path: str) -> Path:
+        return self._base(source_path).with_suffix(".json")
+
+    def sidecar_path(self, source_path: str) -> Path:
+        return self._base(source_path).with_suffix(".parquet")
+
+    def lookup(self, fingerprint):
+        """
+        Find a valid sidecar for a file version.
+
+        Args:
+            fingerprint: DatasetFingerprint of the source CSV
+
+        Returns:
+            Path to the sidecar, or None if there is no valid sidecar
+        """
+        sidecar = self.sidecar_path(fingerprint.path)
+        meta_path = self._meta_path(fingerprint.path)
+        if not sidecar.exists() or not meta_path.exists():
+            return None
+        try:
+            meta = json.loads(meta_path.read_text())
+        except (OSError, ValueError):
+            return None
+
+        if meta.get("mtime_ns") == fingerprint.mtime_ns and meta.get("size") == fingerprint.size:
+            return sidecar
+        if self.validate == "hash" and meta.get("size") == fingerprint.size:
+            if meta.get("sha256") == file_sha256(fingerprint.path):
+                # Same content under a new mtime: record it and keep the sidecar
+                meta["mtime_ns"] = fingerprint.mtime_ns
+                write_json_atomic(meta_path, meta)
+                return sidecar
+        return None
+
+    def read(self, fingerprint, columns=None):
+        """
+        Read a file version from its sidecar.
+
+        Args:
+            fingerprint: DatasetFingerprint of the source CSV
+            columns: Columns to load (default: all)
+
+        Returns:
+            DataFrame, or None if no valid sidecar exists
+        """
+        if not columnar_available():
+            return None
+        sidecar = self.lookup(fingerprint)
+        if sidecar is None:
+            return None
+        return pd.read_parquet(sidecar, columns=list(columns) if columns else None)
+
+    def write(self, fingerprint, df: pd.DataFrame) -> None:
+        """
+        Store a parsed file version as a sidecar, replacing any older one.
+
+        Frames that cannot be stored as Parquet (e.g. mixed-type object
+        columns) are skipped and keep being read from the CSV.
+
+        Args:
+            fingerprint: DatasetFingerprint of the source CSV
+            df: The DataFrame parsed from that file version
+        """
+        if not columnar_available():
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        sidecar = self.sidecar_path(fingerprint.path)
+        try:
+            with atomic_path(sidecar) as tmp_path:
+                df.to_parquet(tmp_path, index=False)
+        except Exception as e:
+            logger.warning("Could not write sidecar for %s: %s", fingerprint.path, e)
+            return
+
+        meta = {
+            "source": fingerprint.path,
+            "mtime_ns": fingerprint.mtime_ns,
+            "size": fingerprint.size,
+        }
+        if self.validate == "hash":
+            meta["sha256"] = file_sha256(fingerprint.path)
+        write_json_atomic(self._meta_path(fingerprint.path), meta)
@@ -0,0 +1,471 @@
+import itertools
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import pandas as pd
+
+from .atomic import atomic_path
+from .chunked_sql import UnsupportedQueryError, plan_chunked_query, run_chunked_query
+from .datasets import dataset_fingerprint, load_dataset, registry
+from .instrumentation import phase
+from .query_cache import QueryResultCache
+from .sidecar import columnar_available
+
+logger = logging.getLogger(__name__)
+
+# Table name the SQL tools expose the dataset under
+TABLE_NAME = "df"
+
+# "memory" loads the whole file into SQLite, "chunked" streams it, and "auto"
+# streams files above the size threshold when the query allows it
+SQL_MODES = ("auto", "memory", "chunked")
+SQL_MODE = os.environ.get("DATAEXP_SQL_MODE", "auto")
+CHUNKED_THRESHOLD_BYTES = int(os.environ.get("DATAEXP_CHUNKED_THRESHOLD_BYTES", str(512 * 1024 * 1024)))
+CHUNK_ROWS = int(os.environ.get("DATAEXP_CHUNK_ROWS", "200000"))
+
+# "sqlite" runs on the persistent SQLite copies; "duckdb" scans the files with
+# DuckDB's vectorized, multi-threaded engine and falls back to SQLite when
+# duckdb is not installed
+SQL_ENGINES = ("sqlite", "duckdb")
+SQL_ENGINE = os.environ.get("DATAEXP_SQL_ENGINE", "sqlite")
+
+
+# Names of the in-memory databases; each load gets a fresh one
+_memory_names = itertools.count()
+
+
+class _Database:
+    """One database holding a single version of a dataset."""
+
+    def __init__(self, fingerprint, connection, uri: str = None):
+        self.fingerprint = fingerprint
+        self.connection = connection
+        # SQLite URI further connections to the same database can open
+        self.uri = uri
+        self.lock = threading.Lock()
+
+    def close(self) -> None:
+        with self.lock:
+            self.connection.close()
+
+
+class SQLiteEngine:
+    """
+    Runs SQL against datasets kept in persistent SQLite databases.
+
+    Each file version is copied into SQLite once and the database is reused by
+    every later query until the file changes. Databases live in memory unless
+    a storage directory is given, in which case they are written to disk and
+    reused across processes as well.
+    """
+
+    def __init__(self, storage_dir=None, max_databases: int = 8, cached_statements: int = 256):
+        self.storage_dir = Path(storage_dir) if storage_dir else None
+        self.max_databases = max_databases
+        self.cached_statements = cached_statements
+        self._databases = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks = {}
+
+    def query(self, filename, sql_query: str) -> pd.DataFrame:
+        """
+        Execute a SQL query against the dataset stored in a file.
+
+        Args:
+            filename: Path to the CSV file
+            sql_query: SQL statement to execute, using 'df' as the table name
+
+        Returns:
+            DataFrame with the query results
+        """
+        database = self._database_for(filename)
+        with database.lock, phase("query"):
+            # sqlite3 keeps prepared statements per connection, keyed by SQL text
+            cursor = database.connection.execute(sql_query)
+            try:
+                if cursor.description is None:
+                    return pd.DataFrame()
+                columns = [column[0] for column in cursor.description]
+                return pd.DataFrame.from_records(cursor.fetchall(), columns=columns)
+            finally:
+                cursor.close()
+
+    def iter_query(self, filename, sql_query: str, batch_rows: int):
+        """
+        Execute a SQL query and yield its result in batches.
+
+        The query runs on a read-only connection of its own, so queries on
+        the same database are not blocked while the result is consumed.
+
+        Yields:
+            DataFrames of at most batch_rows rows
+        """
+        database = self._database_for(filename)
+        connection = self._connect(database.uri)
+        try:
+            connection.execute("PRAGMA query_only = ON")
+            cursor = connection.execute(sql_query)
+            if cursor.description is None:
+                return
+            columns = [column[0] for column in cursor.description]
+            rows = cursor.fetchmany(batch_rows)
+            # An empty result still yields one frame carrying the columns
+            yield pd.DataFrame.from_records(rows, columns=columns)
+            while rows:
+                rows = cursor.fetchmany(batch_rows)
+                if rows:
+                    yield pd.DataFrame.from_records(rows, columns=columns)
+        finally:
+            connection.close()
+
+    def _database_for(self, filename) -> _Database:
+        fingerprint = dataset_fingerprint(filename)
+        database = self._lookup(fingerprint)
+        if database is not None:
+            return database
+
+        # Load per file, so a slow load does not block queries on other files
+        with self._lock:
+            load_lock = self._load_locks.setdefault(fingerprint.path, threading.Lock())
+        with load_lock:
+            database = self._lookup(fingerprint)
+            if database is not None:
+                return database
+            database = _Database(fingerprint, *self._open(fingerprint))
+            with self._lock:
+                closing = [self._databases.pop(fingerprint.path, None)]
+                self._databases[fingerprint.path] = database
+                while len(self._databases) > self.max_databases:
+                    path, evicted = self._databases.popitem(last=False)
+                    self._load_locks.pop(path, None)
+                    closing.append(evicted)
+            # Closing waits for running queries, so it happens outside the lock
+            for stale in closing:
+                if stale is not None:
+                    stale.close()
+            return database
+
+    def _lookup(self, fingerprint):
+        with self._lock:
+            database = self._databases.get(fingerprint.path)
+            if database is None or database.fingerprint != fingerprint:
+                return None
+            self._databases.move_to_end(fingerprint.path)
+            return database
+
+    def _open(self, fingerprint):
+        if self.storage_dir is None:
+            # A named shared-cache database, so iter_query can open a second connection
+            uri = f"file:dataexp-{next(_memory_names)}?mode=memory&cache=shared"
+            connection = self._connect(uri)
+            self._load(connection, fingerprint.path)
+        else:
+            self.storage_dir.mkdir(parents=True, exist_ok=True)
+            db_path = self.storage_dir / f"{fingerprint.digest}.sqlite"
+            if not db_path.exists():
+                # Build next to the final path and rename so readers never see a partial file
+                with atomic_path(db_path) as tmp_path:
+                    connection = self._connect(str(tmp_path))
+                    try:
+                        self._load(connection, fingerprint.path)
+                    finally:
+                        connection.close()
+            uri = db_path.resolve().as_uri() + "?mode=ro"
+            connection = self._connect(uri)
+
+        # Queries must not modify the shared copy of the dataset
+        connection.execute("PRAGMA query_only = ON")
+        return connection, uri
+
+    def _connect(self, database: str) -> sqlite3.Connection:
+        return sqlite3.connect(
+            database,
+            uri=True,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+        )
+
+    def _load(self, connection: sqlite3.Connection, path: str) -> None:
+        df = load_dataset(path)
+        with phase("sqlite_load"):
+            df.to_sql(TABLE_NAME, connection, index=False, chunksize=10_000)
+            connection.commit()
+
+    def invalidate(self, filename=None) -> None:
+        """
+        Close the databases for one file, or for every file if none is given.
+
+        Args:
+            filename: Path of the file to forget (default: all files)
+        """
+        with self._lock:
+            if filename is None:
+                paths = list(self._databases)
+            else:
+                paths = [str(Path(filename).resolve())]
+            for path in paths:
+                database = self._databases.pop(path, None)
+                if database is not None:
+                    database.close()
+
+
+class DuckDBEngine:
+    """
+    Runs SQL with DuckDB directly over the files.
+
+    Each file version gets its own DuckDB connection exposing the data as
+    'df': a view over the Parquet sidecar when one exists, otherwise a table
+    loaded once from the CSV by DuckDB's parallel reader. The data is never
+    materialized as a pandas frame; only query results are. Queries run
+    inside a transaction that is always rolled back, so they cannot modify
+    the shared data.
+    """
+
+    def __init__(self, threads: int = None, max_databases: int = 8):
+        self.threads = threads or os.cpu_count() or 1
+        self.max_databases = max_databases
+        self._databases = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks = {}
+
+    def query(self, filename, sql_query: str) -> pd.DataFrame:
+        """
+        Execute a SQL query against the dataset stored in a file.
+
+        Args:
+            filename: Path to the CSV file
+            sql_query: SQL statement to execute, using 'df' as the table name
+
+        Returns:
+            DataFrame with the query results
+        """
+        database = self._database_for(filename)
+        # Cursors share the connection's catalog and can run concurrently
+        cursor = database.connection.cursor()
+        try:
+            cursor.execute("BEGIN TRANSACTION")
+            try:
+                with phase("query"):
+                    return cursor.execute(sql_query).df()
+            finally:
+                cursor.execute("ROLLBACK")
+        finally:
+            cursor.close()
+
+    def iter_query(self, filename, sql_query: str, batch_rows: int):
+        """
+        Execute a SQL query and yield its result in batches.
+
+        Yields:
+            DataFrames of at most batch_rows rows
+        """
+        database = self._database_for(filename)
+        cursor = database.connection.cursor()
+        try:
+            cursor.execute("BEGIN TRANSACTION")
+            try:
+                reader = cursor.execute(sql_query).fetch_record_batch(batch_rows)
+                empty = True
+                for batch in reader:
+                    empty = False
+                    yield batch.to_pandas()
+                if empty:
+                    yield reader.schema.empty_table().to_pandas()
+            finally:
+                cursor.execute("ROLLBACK")
+        finally:
+            cursor.close()
+
+    def _database_for(self, filename) -> _Database:
+        fingerprint = dataset_fingerprint(filename)
+        database = self._lookup(fingerprint)
+        if database is not None:
+            return database
+
+        # Load per file, so a slow load does not block queries on other files
+        with self._lock:
+            load_lock = self._load_locks.setdefault(fingerprint.path, threading.Lock())
+        with load_lock:
+            database = self._lookup(fingerprint)
+            if database is not None:
+                return database
+            database = _Database(fingerprint, self._open(fingerprint))
+            with self._lock:
+                closing = [self._databases.pop(fingerprint.path, None)]
+                self._databases[fingerprint.path] = database
+                while len(self._databases) > self.max_databases:
+                    path, evicted = self._databases.popitem(last=False)
+                    self._load_locks.pop(path, None)
+                    closing.append(evicted)
+            # Closed outside the lock, which only guards the map of databases
+            for stale in closing:
+                if stale is not None:
+                    stale.close()
+            return database
+
+    def _lookup(self, fingerprint):
+        with self._lock:
+            database = self._databases.get(fingerprint.path)
+            if database is None or database.fingerprint != fingerprint:
+                return None
+            self._databases.move_to_end(fingerprint.path)
+            return database
+
+    def _open(self, fingerprint):
+        import duckdb
+
+        connection = duckdb.connect(":memory:")
+        connection.execute(f"SET threads TO {int(self.threads)}")
+
+        sidecar = None
+        if registry.sidecars is not None and columnar_available():
+            sidecar = registry.sidecars.lookup(fingerprint)
+        # DDL cannot take bound parameters, so quote the path as a literal
+        if sidecar is not None:
+            source = "'" + str(sidecar).replace("'", "''") + "'"
+            connection.execute(f"CREATE VIEW {TABLE_NAME} AS SELECT * FROM read_parquet({source})")
+        else:
+            source = "'" + fingerprint.path.replace("'", "''") + "'"
+            with phase("duckdb_load"):
+                connection.execute(f"CREATE TABLE {TABLE_NAME} AS SELECT * FROM read_csv_auto({source})")
+        return connection
+
+    def invalidate(self, filename=None) -> None:
+        """
+        Close the connections for one file, or for every file if none is given.
+
+        Args:
+            filename: Path of the file to forget (default: all files)
+        """
+        with self._lock:
+            if filename is None:
+                paths = list(self._databases)
+            else:
+                paths = [str(Path(filename).resolve())]
+            for path in paths:
+                database = self._databases.pop(path, None)
+                if database is not None:
+                    database.close()
+
+
+engine = SQLiteEngine(storage_dir=os.environ.get("DATAEXP_SQLITE_DIR") or None)
+
+_engines = {"sqlite": engine}
+_engines_lock = threading.Lock()
+
+
+def get_engine(name: str = None):
+    """
+    Return the shared engine for a name, creating it on first use.
+
+    Args:
+        name: "sqlite" or "duckdb" (default: DATAEXP_SQL_ENGINE)
+
+    Returns:
+        Tuple of (engine name actually used, engine)
+    """
+    name = name or SQL_ENGINE
+    if name not in SQL_ENGINES:
+        raise ValueError(f"Unknown SQL engine: {name}")
+    with _engines_lock:
+        if name not in _engines and name == "duckdb":
+            try:
+                import duckdb  # noqa: F401
+            except ImportError:
+                logger.warning("duckdb is not installed; using the SQLite engine")
+                return "sqlite", engine
+            _engines[name] = DuckDBEngine()
+        return name, _engines[name]
+
+result_cache = QueryResultCache(
+    max_bytes=int(os.environ.get("DATAEXP_QUERY_CACHE_BYTES", str(64 * 1024 * 1024)))
+)
+
+
+def run_query(filename, sql_query: str, mode: str = None, engine_name: str = None) -> pd.DataFrame:
+    """
+    Execute a SQL query against a CSV file using the shared SQL engine.
+
+    See run_keyed_query for the caching and execution strategy.
+
+    Returns:
+        DataFrame with the query results
+    """
+    return run_keyed_query(filename, sql_query, mode, engine_name)[0]
+
+
+def run_keyed_query(filename, sql_query: str, mode: str = None, engine_name: str = None) -> tuple:
+    """
+    Execute a SQL query against a CSV file using the shared SQL engine.
+
+    Results are cached by dataset fingerprint, engine and normalized SQL, so
+    repeated queries against an unchanged file are answered without running
+    them again. With the SQLite engine, files above
+    DATAEXP_CHUNKED_THRESHOLD_BYTES are streamed in chunks when the query
+    decomposes into per-chunk filters and aggregates; DuckDB handles large
+    files itself.
+
+    Args:
+        filename: Path to the CSV file
+        sql_query: SQL statement to execute, using 'df' as the table name
+        mode: "auto", "memory" or "chunked" (default: DATAEXP_SQL_MODE)
+        engine_name: "sqlite" or "duckdb" (default: DATAEXP_SQL_ENGINE)
+
+    Returns:
+        (DataFrame with the query results, result-cache key identifying them)
+    """
+    mode = mode or SQL_MODE
+    if mode not in SQL_MODES:
+        raise ValueError(f"Unknown SQL mode: {mode}")
+    engine_name, sql_engine = get_engine(engine_name)
+
+    fingerprint = dataset_fingerprint(filename)
+    key = result_cache.make_key(fingerprint, sql_query, engine_name)
+    result = result_cache.get(key)
+    if result is not None:
+        return result, key
+
+    if engine_name == "duckdb":
+        result = sql_engine.query(filename, sql_query)
+        result_cache.put(key, result)
+        return result, key
+
+    plan = None
+    if mode == "chunked" or (mode == "auto" and fingerprint.size >= CHUNKED_THRESHOLD_BYTES):
+        try:
+            plan = plan_chunked_query(fingerprint.path, sql_query)
+        except UnsupportedQueryError:
+            if mode == "chunked":
+                raise
+
+    if plan is not None:
+        with phase("chunked_query"):
+            result = run_chunked_query(fingerprint.path, sql_query, chunk_rows=CHUNK_ROWS, plan=plan)
+    else:
+        result = sql_engine.query(filename, sql_query)
+    result_cache.put(key, result)
+    return result, key
+
+
+def iter_query(filename, sql_query: str, batch_rows: int = CHUNK_ROWS, engine_name: str = None):
+    """
+    Execute a SQL query against a CSV file and stream the result in batches.
+
+    Unlike run_query, the result is never held in memory as a whole and is
+    not cached, which suits exports of large results.
+
+    Args:
+        filename: Path to the CSV file
+        sql_query: SQL statement to execute, using 'df' as the table name
+        batch_rows: Rows per yielded batch
+        engine_name: "sqlite" or "duckdb" (default: DATAEXP_SQL_ENGINE)
+
+    Yields:
+        DataFrames of at most batch_rows rows
+    """
+    _, sql_engine = get_engine(engine_name)
+    yield from sql_engine.iter_query(filename, sql_query, batch_rows)
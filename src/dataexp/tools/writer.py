@@ -0,0 +1,297 @@
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from ..jobs import JobManager
+from .atomic import temp_path_for
+from .instrumentation import phase
+
+# Directory save_dataframe writes to unless given another one
+OUTPUT_DIR = Path(os.environ.get("DATAEXP_OUTPUT_DIR", "output"))
+# Rows per Parquet row group / Arrow record batch
+ROW_GROUP_ROWS = int(os.environ.get("DATAEXP_ROW_GROUP_ROWS", "100000"))
+PARQUET_COMPRESSION = os.environ.get("DATAEXP_PARQUET_COMPRESSION", "zstd")
+
+# Format name -> file extension
+WRITE_FORMATS = {
+    "csv": ".csv",
+    "json": ".json",
+    "parquet": ".parquet",
+    "feather": ".feather",
+    "arrow": ".arrow",
+    "pickle": ".pkl",
+}
+# Parquet and Arrow IPC support these codecs; Arrow files are left
+# uncompressed by default so they can be memory-mapped
+COMPRESSIONS = {
+    "parquet": ("zstd", "snappy", "gzip", "lz4", "none"),
+    "feather": ("zstd", "lz4", "none"),
+    "arrow": ("zstd", "lz4", "none"),
+}
+
+
+def iter_batches(source, batch_rows: int = ROW_GROUP_ROWS):
+    """
+    Split a DataFrame, or regroup an iterable of DataFrames, into batches.
+
+    Small input frames (e.g. from a query cursor) are combined so every batch
+    but the last has batch_rows rows.
+
+    Args:
+        source: DataFrame or iterable of DataFrames with the same columns
+        batch_rows: Rows per batch
+
+    Yields:
+        DataFrames of batch_rows rows
+    """
+    batch_rows = max(int(batch_rows), 1)
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), batch_rows):
+            yield source.iloc[start:start + batch_rows]
+        if len(source) == 0:
+            yield source
+        return
+
+    pending, pending_rows, empty = [], 0, None
+    for frame in source:
+        if len(frame) == 0:
+            empty = frame
+            continue
+        pending.append(frame)
+        pending_rows += len(frame)
+        while pending_rows >= batch_rows:
+            combined = pd.concat(pending, ignore_index=True) if len(pending) > 1 else pending[0]
+            yield combined.iloc[:batch_rows]
+            rest = combined.iloc[batch_rows:]
+            pending, pending_rows = ([rest], len(rest)) if len(rest) else ([], 0)
+    if pending:
+        yield pd.concat(pending, ignore_index=True) if len(pending) > 1 else pending[0]
+    elif empty is not None:
+        yield empty
+
+
+def _arrow_schema(first: pd.DataFrame, source):
+    import pyarrow as pa
+
+    # A whole frame is inferred at once; a stream only has its first batch to go
+    # by, so columns that are all null there are widened to strings
+    frame = source if isinstance(source, pd.DataFrame) else first
+    schema = pa.Schema.from_pandas(frame, preserve_index=False)
+    for i, field in enumerate(schema):
+        if pa.types.is_null(field.type):
+            schema = schema.set(i, field.with_type(pa.string()))
+    return schema
+
+
+def _to_table(batch: pd.DataFrame, schema):
+    """
+    Convert a batch to the file's schema.
+
+    Later batches may infer other types than the first one: an integer column
+    with nulls arrives as float, a column that was all null holds values. Such
+    batches are cast to the file's schema (integers stay integers, with nulls);
+    a batch whose values do not fit, e.g. fractions in an integer column,
+    raises ValueError.
+    """
+    import pyarrow as pa
+
+    conversion_errors = (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError)
+    try:
+        return pa.Table.from_pandas(batch, schema=schema, preserve_index=False)
+    except conversion_errors:
+        pass
+    table = pa.Table.from_pandas(batch, preserve_index=False)
+    try:
+        return table.cast(schema)
+    except conversion_errors as e:
+        raise ValueError(
+            f"Rows after the first row group do not fit the column types it set: {e}"
+        ) from e
+
+
+def _write_csv(batches, tmp_path, report):
+    with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+        for i, batch in enumerate(batches):
+            batch.to_csv(f, header=i == 0, index=False)
+            report(batch)
+
+
+def _write_json(batches, tmp_path, report):
+    # One JSON array of records, written batch by batch
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("[")
+        first = True
+        for batch in batches:
+            records = batch.to_json(orient="records", date_format="iso")[1:-1]
+            if records:
+                f.write(records if first else "," + records)
+                first = False
+            report(batch)
+        f.write("]")
+
+
+def _write_parquet(batches, tmp_path, stats, report, source, compression, row_group_rows):
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for batch in batches:
+            if writer is None:
+                schema = _arrow_schema(batch, source)
+                writer = pq.ParquetWriter(tmp_path, schema, compression=compression)
+            writer.write_table(_to_table(batch, schema), row_group_size=row_group_rows)
+            stats["row_groups"] += 1
+            report(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        raise ValueError("The source produced no data to write")
+
+
+def _write_arrow(batches, tmp_path, stats, report, source, compression, row_group_rows):
+    import pyarrow as pa
+
+    writer = None
+    try:
+        for batch in batches:
+            if writer is None:
+                schema = _arrow_schema(batch, source)
+                options = pa.ipc.IpcWriteOptions(compression=compression)
+                writer = pa.ipc.new_file(str(tmp_path), schema, options=options)
+            writer.write_table(_to_table(batch, schema), max_chunksize=row_group_rows)
+            stats["row_groups"] += 1
+            report(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        raise ValueError("The source produced no data to write")
+
+
+def write_frames(source, path, format: str = "csv", compression: str = None,
+                 row_group_rows: int = ROW_GROUP_ROWS, job=None) -> dict:
+    """
+    Write a DataFrame or a stream of DataFrames to a file, atomically.
+
+    Rows are written in batches of row_group_rows, so a streamed source is
+    never held in memory as a whole (pickle is the exception: it needs the
+    whole frame). The data goes to a temporary file in the target directory
+    that replaces the target only once it is complete; a failed or cancelled
+    write leaves no partial file behind.
+
+    Args:
+        source: DataFrame or iterable of DataFrames (e.g. from iter_query)
+        path: Target file path
+        format: One of WRITE_FORMATS
+        compression: Parquet/Arrow codec (default: DATAEXP_PARQUET_COMPRESSION
+            for Parquet, none for Arrow)
+        row_group_rows: Rows per Parquet row group / Arrow record batch
+        job: Optional Job to report progress to (and to stop when cancelled)
+
+    Returns:
+        Dict with 'file_path', 'format', 'rows', 'columns', 'bytes' and,
+        for Parquet and Arrow, 'row_groups'
+    """
+    format = format.lower()
+    if format not in WRITE_FORMATS:
+        raise ValueError(f"Unsupported format: {format}")
+    if format in COMPRESSIONS:
+        if compression is None:
+            compression = PARQUET_COMPRESSION if format == "parquet" else "none"
+        compression = compression.lower()
+        if compression not in COMPRESSIONS[format]:
+            raise ValueError(f"Unsupported compression for {format}: {compression}")
+        compression = None if compression == "none" else compression
+    elif compression:
+        raise ValueError(f"Compression is not supported for {format}")
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = temp_path_for(path)
+    stats = {"rows": 0, "columns": None, "row_groups": 0}
+
+    def report(batch):
+        stats["rows"] += len(batch)
+        stats["columns"] = len(batch.columns)
+        if job is not None:
+            job.report(0.0, f"{stats['rows']} rows written")
+
+    try:
+        with phase("write"):
+            if format == "pickle":
+                frame = source if isinstance(source, pd.DataFrame) else pd.concat(list(source), ignore_index=True)
+                frame.to_pickle(tmp_path)
+                report(frame)
+            else:
+                batches = iter_batches(source, row_group_rows)
+                if format == "csv":
+                    _write_csv(batches, tmp_path, report)
+                elif format == "json":
+                    _write_json(batches, tmp_path, report)
+                elif format == "parquet":
+                    _write_parquet(batches, tmp_path, stats, report, source, compression, row_group_rows)
+                else:
+                    _write_arrow(batches, tmp_path, stats, report, source, compression, row_group_rows)
+            os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    summary = {
+        "file_path": str(path),
+        "format": format,
+        "rows": stats["rows"],
+        "columns": stats["columns"] or 0,
+        "bytes": path.stat().st_size,
+    }
+    if format in COMPRESSIONS:
+        summary["row_groups"] = stats["row_groups"]
+        summary["compression"] = compression or "none"
+    return summary
+
+
+def output_path(filename: str, format: str, output_dir=None) -> Path:
+    """Path a save writes to: output_dir / filename + the format's extension."""
+    extension = WRITE_FORMATS.get(format.lower())
+    if extension is None:
+        raise ValueError(f"Unsupported format: {format}")
+    return Path(output_dir or OUTPUT_DIR) / f"{filename}{extension}"
+
+
+# Background writes run one at a time, so exports do not compete for disk
+writes = JobManager(
+    max_workers=int(os.environ.get("DATAEXP_WRITER_THREADS", "1")),
+    result_ttl=float(os.environ.get("DATAEXP_JOB_RESULT_TTL", "3600")),
+    abandon_after=0,
+)
+
+
+def submit_write(source, path, format: str = "csv", compression: str = None,
+                 row_group_rows: int = ROW_GROUP_ROWS) -> str:
+    """
+    Run write_frames on the background writer thread.
+
+    Returns:
+        Write ID to pass to write_status
+    """
+    return writes.submit(write_frames, source, path, format=format,
+                         compression=compression, row_group_rows=row_group_rows)
+
+
+def write_status(write_id: str):
+    """
+    Status of a background write.
+
+    Returns:
+        Job snapshot dict, plus the write summary once it has succeeded, or
+        None if the write ID is unknown or expired
+    """
+    job = writes.get(write_id)
+    if job is None:
+        return None
+    status = job.snapshot()
+    if job.result is not None:
+        status["result"] = job.result
+    return status
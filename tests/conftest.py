@@ -0,0 +1,24 @@
+import os
+import tempfile
+from pathlib import Path
+
+# Module-level caches read their locations when first imported, so point them
+# at a scratch directory before any dataexp module is loaded
+_SCRATCH = Path(tempfile.mkdtemp(prefix="dataexp-tests-"))
+os.environ.setdefault("DATAEXP_CACHE_DIR", str(_SCRATCH / "cache"))
+os.environ.setdefault("DATAEXP_OUTPUT_DIR", str(_SCRATCH / "output"))
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("CREWAI_TRACING_ENABLED", "false")
+
+import pytest  # noqa: E402
+
+TITANIC_CSV = Path(__file__).resolve().parents[1] / "src" / "dataexp" / "data" / "titanic.csv"
+
+
+@pytest.fixture
+def titanic_csv(tmp_path):
+    """A private copy of the Titanic CSV, free to modify."""
+    path = tmp_path / "titanic.csv"
+    path.write_bytes(TITANIC_CSV.read_bytes())
+    return path
@@ -0,0 +1,45 @@
+import json
+import threading
+
+import pytest
+
+from dataexp.tools.atomic import atomic_path, temp_path_for, write_json_atomic
+
+
+def test_scratch_paths_are_unique_per_call(tmp_path):
+    target = tmp_path / "record.json"
+    paths = []
+    threads = [threading.Thread(target=lambda: paths.append(temp_path_for(target))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(paths)) == 4
+    assert all(path.parent == tmp_path and path.name.startswith(".") for path in paths)
+
+
+def test_concurrent_writers_leave_one_complete_file(tmp_path):
+    target = tmp_path / "record.json"
+    payloads = [{"writer": i, "rows": list(range(10_000))} for i in range(8)]
+    threads = [threading.Thread(target=write_json_atomic, args=(target, p)) for p in payloads]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert json.loads(target.read_text()) in payloads
+    assert list(tmp_path.iterdir()) == [target]
+
+
+def test_failed_write_keeps_the_old_file(tmp_path):
+    target = tmp_path / "record.json"
+    target.write_text("old")
+
+    with pytest.raises(RuntimeError):
+        with atomic_path(target) as scratch:
+            scratch.write_text("partial")
+            raise RuntimeError("boom")
+
+    assert target.read_text() == "old"
+    assert list(tmp_path.iterdir()) == [target]
@@ -0,0 +1,51 @@
+import json
+import sys
+
+from dataexp import main
+
+
+def test_records_spread_the_item_for_every_outcome(tmp_path, titanic_csv, monkeypatch):
+    questions = tmp_path / "questions.jsonl"
+    lines = [
+        json.dumps({"filename": str(titanic_csv), "user_request": "What is the survival rate?", "id": "a"}),
+        "not json",
+        json.dumps({"filename": str(titanic_csv), "id": "b"}),
+        json.dumps({"filename": str(tmp_path / "missing.csv"), "user_request": "Hi", "id": "c"}),
+    ]
+    questions.write_text("\n".join(lines) + "\n")
+    output = tmp_path / "results.jsonl"
+    monkeypatch.setattr(sys, "argv", ["batch", str(questions), "--output", str(output)])
+
+    main.batch()
+
+    records = {r["index"]: r for r in map(json.loads, output.read_text().splitlines())}
+    assert records[0]["status"] == "ok"
+    assert records[0]["template"] == "overall_survival_rate"
+    assert records[1] == {"index": 1, "item": None, "status": "error",
+                          "error": records[1]["error"]}
+    for index, item_id in ((0, "a"), (2, "b"), (3, "c")):
+        assert records[index]["id"] == item_id
+        assert records[index]["filename"]
+        assert "item" not in records[index]
+    assert records[2]["status"] == records[3]["status"] == "error"
+
+
+def test_questions_without_template_go_to_the_crew(tmp_path, titanic_csv, monkeypatch):
+    from types import SimpleNamespace
+
+    from dataexp.crew import Dataexp
+
+    asked = []
+    stub = SimpleNamespace(kickoff=lambda inputs: asked.append(inputs) or SimpleNamespace(raw="stub answer"))
+    monkeypatch.setattr(Dataexp, "shared", classmethod(lambda cls: stub))
+    questions = tmp_path / "questions.jsonl"
+    questions.write_text(json.dumps({"filename": str(titanic_csv), "user_request": "Tell me a story"}) + "\n")
+    output = tmp_path / "results.jsonl"
+    monkeypatch.setattr(sys, "argv", ["batch", str(questions), "--output", str(output)])
+
+    main.batch()
+
+    [record] = map(json.loads, output.read_text().splitlines())
+    assert record["status"] == "ok"
+    assert record["result"] == "stub answer"
+    assert asked == [{"filename": str(titanic_csv), "user_request": "Tell me a story"}]
@@ -0,0 +1,83 @@
+import pandas as pd
+import pytest
+
+from dataexp.tools import sql_engine
+from dataexp.tools.chunked_sql import UnsupportedQueryError, plan_chunked_query, run_chunked_query
+from dataexp.tools.sql_engine import SQLiteEngine, result_cache, run_query
+
+CHUNK_ROWS = 50
+
+DECOMPOSABLE = [
+    "SELECT COUNT(*) AS n FROM df",
+    "SELECT Sex, COUNT(*) AS n, AVG(Age) AS avg_age FROM df GROUP BY Sex",
+    "SELECT Pclass, Sex, SUM(Fare) AS fare, MIN(Age), MAX(Age) FROM df GROUP BY Pclass, Sex",
+    "SELECT Pclass, AVG(Survived) AS rate FROM df WHERE Age > 30 GROUP BY Pclass ORDER BY rate DESC",
+    "SELECT Embarked, COUNT(Cabin) AS cabins FROM df GROUP BY Embarked HAVING COUNT(*) > 10",
+    "SELECT Name, Age FROM df WHERE Fare > 100",
+    "SELECT * FROM df WHERE Sex = 'female' AND Pclass = 1",
+    "SELECT PassengerId, Name FROM df LIMIT 7 OFFSET 120",
+    "SELECT COUNT(*) AS n, SUM(Survived) AS survived FROM df WHERE Embarked IS NULL",
+]
+
+UNSUPPORTED = [
+    "SELECT DISTINCT Pclass FROM df",
+    "SELECT COUNT(DISTINCT Cabin) AS cabins FROM df",
+    "SELECT Name FROM df ORDER BY Fare DESC LIMIT 5",
+    "SELECT Name FROM df WHERE Age > (SELECT AVG(Age) FROM df)",
+    "SELECT Pclass, COUNT(*) FROM df GROUP BY 1",
+]
+
+
+def _canonical(df: pd.DataFrame, ordered: bool) -> pd.DataFrame:
+    df = df.reset_index(drop=True)
+    if not ordered:
+        df = df.sort_values(list(df.columns), na_position="first").reset_index(drop=True)
+    return df
+
+
+def _assert_same_result(actual, expected, sql_query):
+    ordered = "ORDER BY" in sql_query.upper()
+    pd.testing.assert_frame_equal(
+        _canonical(actual, ordered), _canonical(expected, ordered),
+        check_dtype=False, rtol=1e-9,
+    )
+
+
+@pytest.fixture
+def single_shot():
+    engine = SQLiteEngine()
+    return lambda filename, sql_query: engine.query(filename, sql_query)
+
+
+@pytest.mark.parametrize("sql_query", DECOMPOSABLE)
+def test_chunked_matches_single_shot(single_shot, titanic_csv, sql_query):
+    expected = single_shot(titanic_csv, sql_query)
+
+    actual = run_chunked_query(titanic_csv, sql_query, chunk_rows=CHUNK_ROWS)
+
+    _assert_same_result(actual, expected, sql_query)
+
+
+@pytest.mark.parametrize("sql_query", UNSUPPORTED)
+def test_unsupported_shapes_are_rejected(titanic_csv, sql_query):
+    with pytest.raises(UnsupportedQueryError):
+        plan_chunked_query(titanic_csv, sql_query)
+
+
+@pytest.mark.parametrize("sql_query", DECOMPOSABLE + UNSUPPORTED)
+def test_auto_mode_streams_or_falls_back(single_shot, titanic_csv, sql_query, monkeypatch):
+    # Every file counts as large, so auto mode streams what it can
+    monkeypatch.setattr(sql_engine, "CHUNKED_THRESHOLD_BYTES", 0)
+    monkeypatch.setattr(sql_engine, "CHUNK_ROWS", CHUNK_ROWS)
+    result_cache.clear()
+    expected = single_shot(titanic_csv, sql_query)
+
+    actual = run_query(titanic_csv, sql_query, mode="auto", engine_name="sqlite")
+
+    _assert_same_result(actual, expected, sql_query)
+
+
+def test_chunked_mode_raises_for_unsupported_shapes(titanic_csv):
+    result_cache.clear()
+    with pytest.raises(UnsupportedQueryError):
+        run_query(titanic_csv, UNSUPPORTED[0], mode="chunked", engine_name="sqlite")
@@ -0,0 +1,84 @@
+import json
+import re
+
+import pandas as pd
+import pytest
+from crewai.llms.base_llm import BaseLLM
+
+from dataexp import crew as crew_module
+from dataexp.sql_memo import sql_memo
+from dataexp.tools import instrumentation
+from dataexp.tools.instrumentation import clear_calls, recent_calls
+
+QUESTION = "How many passengers are in the file?"
+SQL = "SELECT COUNT(*) AS n FROM df"
+
+
+class ScriptedLLM(BaseLLM):
+    """Stub model that runs the SQL tool once per task, then reports its count."""
+
+    def __init__(self, filename):
+        super().__init__(model="scripted-stub")
+        self.filename = filename
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None):
+        prompt = messages if isinstance(messages, str) else json.dumps(messages)
+        counts = re.findall(r'\\\\?"n\\\\?": (\d+)', prompt)
+        if counts:
+            return f"Thought: I know the answer\nFinal Answer: n={counts[-1]}"
+        action_input = json.dumps({"filename": self.filename, "sql_query": SQL})
+        return (
+            "Thought: I run the remembered query\n"
+            "Action: Execute SQL query on CSV file\n"
+            f"Action Input: {action_input}"
+        )
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+    def supports_stop_words(self) -> bool:
+        return True
+
+    def get_context_window_size(self) -> int:
+        return 8192
+
+
+@pytest.fixture
+def dataexp(titanic_csv, monkeypatch):
+    monkeypatch.setattr(crew_module, "cached_llm", lambda llm=None: ScriptedLLM(str(titanic_csv)))
+    # Every question here is memoized; falling back to the full crew is a failure
+    run = crew_module.Dataexp._run
+
+    def memo_only(self, crew_name, inputs, progress_callback=None):
+        assert crew_name == "memo", "the memoized SQL was dropped and the full crew ran"
+        return run(self, crew_name, inputs, progress_callback)
+
+    monkeypatch.setattr(crew_module.Dataexp, "_run", memo_only)
+    monkeypatch.setattr(instrumentation, "ENABLED", True)
+    clear_calls()
+    sql_memo.clear()
+    sql_memo.remember(QUESTION, titanic_csv, SQL)
+    yield crew_module.Dataexp()
+    sql_memo.clear()
+    clear_calls()
+
+
+def _ask(dataexp, filename):
+    return dataexp.kickoff({"user_request": QUESTION, "filename": str(filename)}).raw
+
+
+def test_pooled_crews_do_not_cache_tool_results(dataexp, titanic_csv):
+    assert _ask(dataexp, titanic_csv) == "n=891"
+
+    pd.read_csv(titanic_csv).iloc[:100].to_csv(titanic_csv, index=False)
+
+    assert _ask(dataexp, titanic_csv) == "n=100"
+    assert len(recent_calls("execute_sql_on_csv")) == 2
+
+
+def test_memoized_question_keeps_its_entry_when_asked_again(dataexp, titanic_csv):
+    for _ in range(3):
+        assert _ask(dataexp, titanic_csv) == "n=891"
+        assert sql_memo.lookup(QUESTION, titanic_csv) == SQL
+    assert len(recent_calls("execute_sql_on_csv")) == 3
@@ -0,0 +1,165 @@
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from dataexp.tools import data_tool
+from dataexp.tools.frame_cache import FrameCache, cache_namespace, frame_cache
+from dataexp.tools.query_cache import frame_nbytes
+from dataexp.tools.results import results
+
+
+def _frame(n=1000):
+    return pd.DataFrame({"x": range(n), "label": [f"row {i}" for i in range(n)]})
+
+
+def test_entries_expire_after_ttl():
+    cache = FrameCache(ttl_seconds=0.05)
+    assert cache.put("a", _frame())
+    time.sleep(0.1)
+
+    assert cache.get("a") is None
+    assert cache.keys() == []
+    assert cache.stats()["expirations"] == 1
+
+
+def test_namespaces_are_isolated():
+    cache = FrameCache()
+    first, second = _frame(10), _frame(20)
+    with cache_namespace("session-1"):
+        cache.put("result", first)
+    with cache_namespace("session-2"):
+        cache.put("result", second)
+        assert len(cache.get("result")) == 20
+        cache.clear("session-2")
+
+    with cache_namespace("session-1"):
+        assert len(cache.get("result")) == 10
+        assert cache.keys() == ["result"]
+    assert cache.get("result", namespace="session-2") is None
+
+
+def test_evicted_frames_spill_and_load_back(tmp_path):
+    frame = _frame()
+    cache = FrameCache(max_bytes=int(frame_nbytes(frame) * 1.5), spill_dir=tmp_path / "spill")
+    assert cache.put("a", frame)
+    assert cache.put("b", _frame(500))
+
+    stats = cache.stats()
+    assert stats["spills"] == 1
+    assert stats["spilled_entries"] == 1
+    assert stats["spill_bytes"] > 0
+    pd.testing.assert_frame_equal(cache.get("a"), frame)
+    assert cache.stats()["spill_loads"] == 1
+
+
+def test_caches_sharing_a_spill_dir_do_not_collide(tmp_path):
+    first, second = _frame(), _frame().assign(x=lambda df: df["x"] + 1)
+    budget = int(frame_nbytes(first) * 1.5)
+    caches = [FrameCache(max_bytes=budget, spill_dir=tmp_path) for _ in range(2)]
+    for cache, frame in zip(caches, (first, second)):
+        cache.put("a", frame)
+        cache.put("b", _frame(500))
+
+    assert len(list(tmp_path.glob(f"{os.getpid()}-*.parquet"))) == 2
+    pd.testing.assert_frame_equal(caches[0].get("a"), first)
+    pd.testing.assert_frame_equal(caches[1].get("a"), second)
+
+
+def test_stale_spill_files_are_purged_at_startup(tmp_path):
+    legacy = tmp_path / ("0" * 40 + ".parquet")
+    dead = tmp_path / "999999999-abc.parquet"
+    live = tmp_path / f"{os.getpid()}-abc.parquet"
+    old = tmp_path / f"{os.getpid()}-old.parquet"
+    for path in (legacy, dead, live, old):
+        _frame(10).to_parquet(path)
+    os.utime(old, (time.time() - 7200, time.time() - 7200))
+
+    FrameCache(ttl_seconds=3600, spill_dir=tmp_path)
+
+    assert sorted(tmp_path.iterdir()) == [live]
+
+
+def test_spilling_does_not_hold_the_cache_lock(tmp_path, monkeypatch):
+    frame = _frame()
+    cache = FrameCache(max_bytes=int(frame_nbytes(frame) * 1.5), spill_dir=tmp_path)
+    cache.put("a", frame)
+    started, release = threading.Event(), threading.Event()
+    to_parquet = pd.DataFrame.to_parquet
+
+    def slow_to_parquet(self, *args, **kwargs):
+        started.set()
+        release.wait(5)
+        return to_parquet(self, *args, **kwargs)
+
+    monkeypatch.setattr(pd.DataFrame, "to_parquet", slow_to_parquet)
+    writer = threading.Thread(target=cache.put, args=("b", _frame(500)))
+    writer.start()
+    assert started.wait(5)
+
+    reader = threading.Thread(target=cache.stats)
+    reader.start()
+    reader.join(1)
+    blocked = reader.is_alive()
+    release.set()
+    writer.join()
+    reader.join()
+
+    assert not blocked
+    assert cache.stats()["spilled_entries"] == 1
+
+
+def test_frame_read_while_spilling_stays_resident(tmp_path, monkeypatch):
+    frame = _frame()
+    cache = FrameCache(max_bytes=int(frame_nbytes(frame) * 1.5), spill_dir=tmp_path)
+    cache.put("a", frame)
+    to_parquet = pd.DataFrame.to_parquet
+
+    def read_during_spill(self, *args, **kwargs):
+        monkeypatch.setattr(pd.DataFrame, "to_parquet", to_parquet)
+        assert cache.get("a") is frame
+        return to_parquet(self, *args, **kwargs)
+
+    monkeypatch.setattr(pd.DataFrame, "to_parquet", read_during_spill)
+    cache.put("b", _frame(500))
+
+    # "a" stays resident, "b" is spilled in its place and the stale file is dropped
+    assert cache.get("a") is frame
+    assert cache.stats()["spilled_entries"] == 1
+    assert len(list(tmp_path.glob("*.parquet"))) == 1
+
+
+def test_oversize_frame_is_not_cached_without_spill():
+    frame = _frame()
+    cache = FrameCache(max_bytes=frame_nbytes(frame) - 1)
+
+    assert cache.put("a", frame) is False
+    assert cache.get("a") is None
+
+
+def test_tool_reports_frames_that_were_not_cached(titanic_csv, monkeypatch):
+    monkeypatch.setattr(frame_cache, "max_bytes", 1)
+    monkeypatch.setattr(frame_cache, "spill_dir", None)
+    handle = results.put(pd.read_csv(titanic_csv))
+
+    with cache_namespace("test-not-cached"):
+        response = json.loads(data_tool.cache_dataframe.func(handle, "titanic"))
+
+    assert response["status"] == "not_cached"
+    assert response["cache_key"] == "titanic"
+    assert frame_cache.keys("test-not-cached") == []
+
+
+def test_tool_caches_frames_that_fit(titanic_csv):
+    handle = results.put(pd.read_csv(titanic_csv))
+
+    with cache_namespace("test-cached"):
+        response = json.loads(data_tool.cache_dataframe.func(handle, "titanic"))
+        fetched = json.loads(data_tool.get_cached_dataframe.func("titanic"))
+
+    assert response["status"] == "cached"
+    assert fetched["row_count"] == 891
+    frame_cache.clear("test-cached")
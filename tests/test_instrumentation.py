@@ -0,0 +1,57 @@
+import pytest
+
+from dataexp.tools import instrumentation
+from dataexp.tools.instrumentation import clear_calls, instrumented, phase, recent_calls, summarize_calls
+
+
+@pytest.fixture(autouse=True)
+def enabled(monkeypatch):
+    monkeypatch.setattr(instrumentation, "ENABLED", True)
+    clear_calls()
+    yield
+    clear_calls()
+
+
+@instrumented("ok_tool")
+def ok_tool(value):
+    with phase("work"):
+        return f"echo {value}"
+
+
+@instrumented("failing_tool")
+def failing_tool(value):
+    with phase("work"):
+        raise RuntimeError("boom")
+
+
+@instrumented("error_result_tool")
+def error_result_tool(value):
+    return '{"error": "bad input"}'
+
+
+def test_successful_call_is_recorded():
+    assert ok_tool("x") == "echo x"
+
+    [record] = recent_calls("ok_tool")
+    assert record["error"] is False
+    assert record["output_bytes"] == len("echo x")
+    assert "work" in record["phases"]
+
+
+def test_raising_call_is_recorded():
+    with pytest.raises(RuntimeError):
+        failing_tool("x")
+
+    [record] = recent_calls("failing_tool")
+    assert record["error"] is True
+    assert record["exception"] == "RuntimeError"
+    assert record["output_bytes"] == 0
+    assert "work" in record["phases"]
+    assert summarize_calls()[0]["errors"] == 1
+
+
+def test_error_result_counts_as_error():
+    error_result_tool("x")
+
+    [record] = recent_calls("error_result_tool")
+    assert record["error"] is True
@@ -0,0 +1,136 @@
+import contextvars
+import threading
+import time
+
+import pytest
+
+from dataexp.jobs import CANCELLED, FAILED, SUCCEEDED, JobManager
+
+_request = contextvars.ContextVar("test_request", default=None)
+
+
+@pytest.fixture
+def manager():
+    manager = JobManager(max_workers=1, result_ttl=0, abandon_after=0)
+    yield manager
+    manager._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _wait(manager, job_id):
+    job = manager.get(job_id)
+    job.future.result(timeout=10)
+    return job
+
+
+def _report_until_cancelled(started, job):
+    started.set()
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        job.report(0.5, "working")
+        time.sleep(0.01)
+    return "not cancelled"
+
+
+def test_submitted_job_returns_its_result(manager):
+    def work(x, job, y=0):
+        job.report(0.5, "halfway")
+        return x + y, _request.get()
+
+    token = _request.set("request-1")
+    try:
+        job_id = manager.submit(work, 2, y=3)
+    finally:
+        _request.reset(token)
+    _wait(manager, job_id)
+
+    assert manager.result(job_id) == (5, "request-1")
+    status = manager.status(job_id)
+    assert status["status"] == SUCCEEDED
+    assert status["progress"] == 1.0
+
+
+def test_running_job_stops_at_its_next_progress_report(manager):
+    started = threading.Event()
+    job_id = manager.submit(_report_until_cancelled, started)
+    assert started.wait(5)
+
+    assert manager.cancel(job_id)
+    job = _wait(manager, job_id)
+
+    assert job.status == CANCELLED
+    assert job.result is None
+    assert manager.cancel(job_id) is False
+    with pytest.raises(RuntimeError):
+        manager.result(job_id)
+
+
+def test_queued_job_is_cancelled_before_it_starts(manager):
+    release = threading.Event()
+    ran = []
+    manager.submit(lambda job: release.wait(5))
+    job_id = manager.submit(lambda job: ran.append(job.id))
+
+    assert manager.cancel(job_id)
+    release.set()
+
+    assert manager.status(job_id)["status"] == CANCELLED
+    manager._executor.shutdown(wait=True)
+    assert ran == []
+
+
+def test_failed_job_reports_its_error(manager):
+    def fail(job):
+        raise ValueError("bad input")
+
+    job_id = manager.submit(fail)
+    _wait(manager, job_id)
+
+    status = manager.status(job_id)
+    assert status["status"] == FAILED
+    assert status["error"] == "bad input"
+    with pytest.raises(RuntimeError, match=FAILED):
+        manager.result(job_id)
+
+
+def test_unpolled_job_is_abandoned():
+    manager = JobManager(max_workers=1, abandon_after=0.05)
+    started = threading.Event()
+    job_id = manager.submit(_report_until_cancelled, started)
+    assert started.wait(5)
+    job = manager.get(job_id)
+
+    time.sleep(0.1)
+    manager.reap()
+    job.future.result(timeout=10)
+
+    assert job.status == CANCELLED
+    manager._executor.shutdown(wait=True)
+
+
+def test_finished_jobs_are_dropped_after_their_ttl():
+    manager = JobManager(max_workers=1, result_ttl=0.05, abandon_after=0)
+    job_id = manager.submit(lambda job: "done")
+    _wait(manager, job_id)
+    assert manager.result(job_id) == "done"
+
+    time.sleep(0.1)
+
+    assert manager.status(job_id) is None
+    with pytest.raises(KeyError):
+        manager.result(job_id)
+    manager._executor.shutdown(wait=True)
+
+
+def test_cancel_owner_only_cancels_that_owners_jobs(manager):
+    release = threading.Event()
+    first = manager.submit(lambda job: release.wait(5), owner="session-1")
+    second = manager.submit(lambda job: "kept", owner="session-2")
+    third = manager.submit(lambda job: "dropped", owner="session-1")
+
+    assert manager.cancel_owner("session-1") == 2
+    release.set()
+    _wait(manager, second)
+
+    assert manager.status(first)["status"] in (CANCELLED, SUCCEEDED)
+    assert manager.result(second) == "kept"
+    assert manager.status(third)["status"] == CANCELLED
@@ -0,0 +1,60 @@
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from dataexp import knowledge as knowledge_module
+from dataexp.knowledge import LazyKnowledge
+
+
+class _Collection:
+    def __init__(self, count):
+        self._count = count
+
+    def count(self):
+        return self._count
+
+
+def _knowledge(get_client):
+    storage = SimpleNamespace(_get_client=get_client)
+    return SimpleNamespace(storage=storage, collection_name="dataexp_test")
+
+
+def _client(count):
+    return SimpleNamespace(get_or_create_collection=lambda collection_name: _Collection(count))
+
+
+@pytest.mark.parametrize("count, complete", [(10, True), (12, True), (3, False)])
+def test_collection_is_complete_when_it_holds_every_chunk(count, complete):
+    knowledge = _knowledge(lambda: _client(count))
+
+    assert LazyKnowledge._collection_complete(knowledge, 10) is complete
+
+
+def test_unreadable_store_is_reindexed():
+    def broken_client():
+        raise RuntimeError("vector store unavailable")
+
+    assert LazyKnowledge._collection_complete(_knowledge(broken_client), 10) is False
+
+
+@pytest.mark.parametrize("marker", [{}, {"chunks": None}, {"chunks": "10"}, {"chunks": True}, [10]])
+def test_marker_without_a_chunk_count_is_reindexed(marker, tmp_path, monkeypatch):
+    monkeypatch.setattr(knowledge_module, "KNOWLEDGE_CACHE_DIR", tmp_path)
+    (tmp_path / "dataexp_test.json").write_text(json.dumps(marker))
+    resets = []
+    knowledge = SimpleNamespace(
+        _ready=False,
+        _lock=threading.Lock(),
+        collection_name="dataexp_test",
+        storage=SimpleNamespace(reset=lambda: resets.append(True)),
+        sources=[],
+        _collection_complete=lambda chunks: pytest.fail("checked a marker without a chunk count"),
+    )
+
+    LazyKnowledge.ensure_embedded(knowledge)
+
+    assert resets == [True]
+    assert knowledge._ready
+    assert json.loads((tmp_path / "dataexp_test.json").read_text()) == {"chunks": 0}
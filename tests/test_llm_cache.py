@@ -0,0 +1,74 @@
+import json
+
+import pytest
+from crewai import Agent, Crew, Task
+from crewai.llms.base_llm import BaseLLM
+
+from dataexp.llm_cache import CachedLLM, LLMResponseCache
+from dataexp.tools.data_tool import execute_sql_on_csv
+from dataexp.tools.results import results
+from dataexp.tools.sql_engine import result_cache
+
+
+class ScriptedLLM(BaseLLM):
+    """Stub model that first calls the SQL tool, then answers from its output."""
+
+    def __init__(self, filename):
+        super().__init__(model="scripted-stub")
+        self.filename = filename
+        self.calls = 0
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None):
+        self.calls += 1
+        prompt = json.dumps(messages) if not isinstance(messages, str) else messages
+        if "res_" not in prompt:
+            action_input = json.dumps({
+                "filename": self.filename,
+                "sql_query": "SELECT Sex, COUNT(*) AS n FROM df GROUP BY Sex",
+            })
+            return (
+                "Thought: I need the counts\n"
+                "Action: Execute SQL query on CSV file\n"
+                f"Action Input: {action_input}"
+            )
+        return "Thought: I know the answer\nFinal Answer: 577 male, 314 female"
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+    def supports_stop_words(self) -> bool:
+        return True
+
+    def get_context_window_size(self) -> int:
+        return 8192
+
+
+def _kickoff(llm, filename):
+    agent = Agent(role="Analyst", goal="Count passengers", backstory="Data analyst",
+                  llm=llm, tools=[execute_sql_on_csv], verbose=False)
+    task = Task(description=f"How many passengers of each sex are in {filename}?",
+                expected_output="The counts", agent=agent)
+    return Crew(agents=[agent], tasks=[task], cache=False, verbose=False).kickoff()
+
+
+@pytest.fixture
+def response_cache(tmp_path):
+    cache = LLMResponseCache(tmp_path / "responses.sqlite")
+    yield cache
+    cache.clear()
+
+
+def test_repeated_run_with_sql_step_makes_no_provider_call(response_cache, titanic_csv):
+    first = ScriptedLLM(str(titanic_csv))
+    first_answer = _kickoff(CachedLLM(first, response_cache), str(titanic_csv))
+    assert first.calls == 2
+
+    # A fresh process would start with empty result stores
+    results.clear()
+    result_cache.clear()
+
+    second = ScriptedLLM(str(titanic_csv))
+    second_answer = _kickoff(CachedLLM(second, response_cache), str(titanic_csv))
+    assert second.calls == 0
+    assert second_answer.raw == first_answer.raw
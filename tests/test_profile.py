@@ -0,0 +1,40 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataexp.tools import data_tool
+from dataexp.tools.profile import build_profile, get_profile
+
+
+def test_std_is_exact_for_large_offsets_across_chunks(tmp_path):
+    # Sum-of-squares variance cancels catastrophically around 1e9
+    values = 1e9 + np.random.default_rng(1).normal(0, 1, 5_000)
+    path = tmp_path / "offset.csv"
+    pd.DataFrame({"x": values}).to_csv(path, index=False)
+
+    stats = build_profile(path, chunk_rows=700)["column_stats"]["x"]
+
+    expected = pd.read_csv(path)["x"]
+    assert stats["mean"] == pytest.approx(expected.mean(), rel=1e-15)
+    assert stats["std"] == pytest.approx(expected.std(), rel=1e-9)
+
+
+def test_single_value_has_zero_std(tmp_path):
+    path = tmp_path / "one.csv"
+    pd.DataFrame({"x": [3.5]}).to_csv(path, index=False)
+
+    stats = build_profile(path)["column_stats"]["x"]
+
+    assert stats["mean"] == 3.5
+    assert stats["std"] == 0.0
+
+
+def test_samples_beyond_the_profile_head_use_the_profile_reader(titanic_csv):
+    head = get_profile(titanic_csv)["head"]
+
+    info = json.loads(data_tool.get_dataframe_info.func(str(titanic_csv), sample_rows=len(head) + 20))
+
+    assert len(info["sample_data"]) == len(head) + 20
+    assert info["sample_data"][:len(head)] == head
@@ -0,0 +1,85 @@
+import pandas as pd
+import pytest
+
+from dataexp.tools import sql_engine
+from dataexp.tools.query_cache import QueryResultCache, frame_nbytes, normalize_sql
+from dataexp.tools.sql_engine import result_cache, run_query
+
+
+@pytest.fixture
+def engine_calls(monkeypatch):
+    result_cache.clear()
+    calls = []
+    query = sql_engine.engine.query
+    monkeypatch.setattr(sql_engine.engine, "query",
+                        lambda filename, sql_query: (calls.append(sql_query), query(filename, sql_query))[1])
+    yield calls
+    result_cache.clear()
+
+
+@pytest.mark.parametrize("spelling", [
+    "select Sex, count(*) as n from df group by Sex",
+    "SELECT   Sex,\n  count(*) AS n\nFROM df\nGROUP BY Sex;",
+    "Select Sex, count(*) As n From df Group By Sex ;;",
+])
+def test_equivalent_sql_hits(engine_calls, titanic_csv, spelling):
+    first = run_query(titanic_csv, "SELECT Sex, count(*) AS n FROM df GROUP BY Sex")
+
+    second = run_query(titanic_csv, spelling)
+
+    assert len(engine_calls) == 1
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_literals_keep_their_case():
+    assert normalize_sql("select * from df where Sex = 'Male'") == "SELECT * FROM df WHERE Sex = 'Male'"
+    assert normalize_sql("select 'a  b'") != normalize_sql("select 'a b'")
+
+
+def test_changed_file_misses(engine_calls, titanic_csv):
+    sql = "SELECT COUNT(*) AS n FROM df"
+    assert run_query(titanic_csv, sql)["n"][0] == 891
+
+    df = pd.read_csv(titanic_csv)
+    df.iloc[:100].to_csv(titanic_csv, index=False)
+
+    assert run_query(titanic_csv, sql)["n"][0] == 100
+    assert len(engine_calls) == 2
+
+
+def test_byte_budget_evicts_least_recently_used():
+    frame = pd.DataFrame({"x": range(100)})
+    cache = QueryResultCache(max_bytes=2 * frame_nbytes(frame))
+    cache.put("a", frame)
+    cache.put("b", frame)
+    cache.get("a")
+
+    cache.put("c", frame)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_oversize_result_is_not_cached():
+    frame = pd.DataFrame({"x": range(100)})
+    cache = QueryResultCache(max_bytes=frame_nbytes(frame) - 1)
+    cache.put("a", frame)
+
+    assert cache.get("a") is None
+
+
+def test_cached_frame_is_not_corrupted_by_a_caller(engine_calls, titanic_csv):
+    sql = "SELECT Sex, COUNT(*) AS n FROM df GROUP BY Sex ORDER BY Sex"
+    result = run_query(titanic_csv, sql)
+    result.loc[0, "n"] = -1
+    result["extra"] = 1
+
+    hit = run_query(titanic_csv, sql)
+    hit.loc[1, "n"] = -2
+
+    again = run_query(titanic_csv, sql)
+    assert again["n"].tolist() == [314, 577]
+    assert list(again.columns) == ["Sex", "n"]
+    assert len(engine_calls) == 1
@@ -0,0 +1,68 @@
+import gc
+import json
+
+import pandas as pd
+import pytest
+
+from dataexp.tools import data_tool
+from dataexp.tools import results as results_module
+from dataexp.tools.results import ResultStore, results
+
+
+@pytest.fixture
+def hashed(monkeypatch):
+    """Frames whose content was hashed to derive a handle."""
+    frames = []
+    content_handle = results_module.content_handle
+
+    def counting(df):
+        frames.append(df)
+        return content_handle(df)
+
+    monkeypatch.setattr(results_module, "content_handle", counting)
+    return frames
+
+
+def test_query_results_take_their_handle_from_the_cache_key(titanic_csv, hashed):
+    sql = "SELECT Sex, count(*) AS n FROM df GROUP BY Sex"
+    first = json.loads(data_tool.execute_sql_on_csv.func(str(titanic_csv), sql))
+    again = json.loads(data_tool.execute_sql_on_csv.func(str(titanic_csv), sql))
+
+    assert first["handle"] == again["handle"]
+    assert hashed == []
+
+    pd.read_csv(titanic_csv).iloc[:100].to_csv(titanic_csv, index=False)
+    changed = json.loads(data_tool.execute_sql_on_csv.func(str(titanic_csv), sql))
+    assert changed["handle"] != first["handle"]
+    assert results.get(changed["handle"])["n"].sum() == 100
+
+
+def test_loaded_files_take_their_handle_from_the_file_version(tmp_path, hashed):
+    path = tmp_path / "saved.csv"
+    pd.DataFrame({"x": range(10)}).to_csv(path, index=False)
+
+    first = json.loads(data_tool.load_dataframe.func(str(path)))
+    again = json.loads(data_tool.load_dataframe.func(str(path)))
+    head = json.loads(data_tool.load_dataframe.func(str(path), end_row=5))
+
+    assert first["handle"] == again["handle"] != head["handle"]
+    assert hashed == []
+
+
+def test_a_frame_is_hashed_once(hashed):
+    store = ResultStore()
+    df = pd.DataFrame({"x": range(10)})
+
+    handle = store.put(df)
+    assert store.put(df) == handle
+    assert store.put(df.copy()) == handle
+    assert len(hashed) == 2
+
+
+def test_collected_frames_are_forgotten():
+    store = ResultStore()
+    store.put(pd.DataFrame({"x": range(10)}))
+    store.clear()
+    gc.collect()
+
+    assert store._known_frames == {}
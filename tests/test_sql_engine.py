@@ -0,0 +1,83 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from dataexp.tools.sql_engine import DuckDBEngine, SQLiteEngine
+
+COUNT_SQL = "SELECT COUNT(*) AS n FROM df"
+
+
+def _engines():
+    engines = [pytest.param(SQLiteEngine, id="sqlite")]
+    try:
+        import duckdb  # noqa: F401
+        engines.append(pytest.param(DuckDBEngine, id="duckdb"))
+    except ImportError:
+        pass
+    return engines
+
+
+@pytest.fixture
+def other_csv(tmp_path, titanic_csv):
+    path = tmp_path / "other.csv"
+    path.write_bytes(titanic_csv.read_bytes())
+    return path
+
+
+@pytest.mark.parametrize("engine_class", _engines())
+def test_concurrent_queries_load_a_file_once(engine_class, titanic_csv, monkeypatch):
+    engine = engine_class()
+    loads = []
+    open_database = engine._open
+    monkeypatch.setattr(engine, "_open", lambda fingerprint: (loads.append(fingerprint), open_database(fingerprint))[1])
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        counts = list(pool.map(lambda _: int(engine.query(titanic_csv, COUNT_SQL)["n"][0]), range(8)))
+
+    assert counts == [891] * 8
+    assert len(loads) == 1
+
+
+@pytest.mark.parametrize("engine_class", _engines())
+def test_slow_load_does_not_block_other_files(engine_class, titanic_csv, other_csv, monkeypatch):
+    engine = engine_class()
+    engine.query(other_csv, COUNT_SQL)
+    started, release = threading.Event(), threading.Event()
+    open_database = engine._open
+
+    def slow_open(fingerprint):
+        started.set()
+        assert release.wait(10)
+        return open_database(fingerprint)
+
+    monkeypatch.setattr(engine, "_open", slow_open)
+    loading = threading.Thread(target=engine.query, args=(titanic_csv, COUNT_SQL))
+    loading.start()
+    counts = []
+    try:
+        assert started.wait(10)
+        querying = threading.Thread(target=lambda: counts.append(int(engine.query(other_csv, COUNT_SQL)["n"][0])))
+        querying.start()
+        querying.join(5)
+    finally:
+        release.set()
+        loading.join()
+    # Served while the other file was still loading
+    assert counts == [891]
+
+
+@pytest.mark.parametrize("storage", ["memory", "disk"])
+def test_open_export_does_not_block_queries(storage, titanic_csv, tmp_path):
+    engine = SQLiteEngine(storage_dir=tmp_path / "sqlite" if storage == "disk" else None)
+    batches = engine.iter_query(titanic_csv, "SELECT * FROM df", batch_rows=100)
+    first = next(batches)
+
+    counts = []
+    querying = threading.Thread(target=lambda: counts.append(int(engine.query(titanic_csv, COUNT_SQL)["n"][0])))
+    querying.start()
+    querying.join(5)
+
+    rest = sum(len(batch) for batch in batches)
+    assert counts == [891]
+    assert len(first) + rest == 891
@@ -0,0 +1,76 @@
+import time
+
+import pandas as pd
+import pytest
+
+from dataexp.sql_memo import SQLMemo
+
+QUESTION = "How many passengers survived?"
+SQL = "SELECT SUM(Survived) FROM df"
+
+
+@pytest.fixture
+def memo(tmp_path):
+    return SQLMemo(tmp_path / "memo.sqlite")
+
+
+def test_hit_for_same_question_and_schema(memo, titanic_csv):
+    memo.remember(QUESTION, titanic_csv, SQL)
+
+    assert memo.lookup("  how many passengers   SURVIVED ", titanic_csv) == SQL
+    assert memo.stats()["hits"] == 1
+
+
+def test_miss_after_schema_change(memo, titanic_csv):
+    memo.remember(QUESTION, titanic_csv, SQL)
+
+    df = pd.read_csv(titanic_csv).rename(columns={"Survived": "Alive"})
+    df.to_csv(titanic_csv, index=False)
+
+    assert memo.lookup(QUESTION, titanic_csv) is None
+    assert memo.stats()["misses"] == 1
+
+
+def test_alternating_datasets_keep_their_entries(memo, titanic_csv, tmp_path):
+    other = tmp_path / "subset.csv"
+    pd.read_csv(titanic_csv)[["PassengerId", "Survived"]].to_csv(other, index=False)
+    other_sql = "SELECT COUNT(*) FROM df WHERE Survived = 1"
+    memo.remember(QUESTION, titanic_csv, SQL)
+    memo.remember(QUESTION, other, other_sql)
+
+    for _ in range(3):
+        assert memo.lookup(QUESTION, titanic_csv) == SQL
+        assert memo.lookup(QUESTION, other) == other_sql
+    assert memo.stats()["entries"] == 2
+
+
+def test_forget_is_scoped_to_a_dataset(memo, titanic_csv, tmp_path):
+    other = tmp_path / "copy.csv"
+    other.write_bytes(titanic_csv.read_bytes())
+    memo.remember(QUESTION, titanic_csv, SQL)
+    memo.remember(QUESTION, other, SQL)
+
+    memo.forget(QUESTION, other)
+
+    assert memo.lookup(QUESTION, titanic_csv) == SQL
+    assert memo.lookup(QUESTION, other) is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, titanic_csv):
+    memo = SQLMemo(tmp_path / "memo.sqlite", max_entries=2)
+    memo.remember("first question", titanic_csv, "SELECT 1")
+    memo.remember("second question", titanic_csv, "SELECT 2")
+    memo.lookup("first question", titanic_csv)
+    memo.remember("third question", titanic_csv, "SELECT 3")
+
+    assert memo.lookup("second question", titanic_csv) is None
+    assert memo.lookup("first question", titanic_csv) == "SELECT 1"
+    assert memo.lookup("third question", titanic_csv) == "SELECT 3"
+
+
+def test_entries_expire(tmp_path, titanic_csv):
+    memo = SQLMemo(tmp_path / "memo.sqlite", max_age_seconds=0.05)
+    memo.remember(QUESTION, titanic_csv, SQL)
+    time.sleep(0.1)
+
+    assert memo.lookup(QUESTION, titanic_csv) is None
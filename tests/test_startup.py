@@ -0,0 +1,43 @@
+import json
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+
+def _loads_crewai(code: str, cwd) -> bool:
+    script = textwrap.dedent(code) + "\nimport sys\nprint('crewai' in sys.modules)\n"
+    completed = subprocess.run(
+        [sys.executable, "-c", script], cwd=cwd, capture_output=True, text=True,
+        env={"PYTHONPATH": str(SRC), "PATH": "", "DATAEXP_CACHE_DIR": str(Path(cwd) / "cache")},
+    )
+    assert completed.returncode == 0, completed.stderr
+    return completed.stdout.strip().splitlines()[-1] == "True"
+
+
+def test_template_answers_do_not_import_crewai(tmp_path, titanic_csv):
+    assert not _loads_crewai(f"""
+        from dataexp.templates import answer_from_template
+        assert answer_from_template("What is the survival rate?", {str(titanic_csv)!r}) is not None
+    """, tmp_path)
+
+
+def test_templated_batch_does_not_import_crewai(tmp_path, titanic_csv):
+    questions = tmp_path / "questions.jsonl"
+    questions.write_text(json.dumps({"filename": str(titanic_csv), "user_request": "What is the survival rate?"}))
+
+    assert not _loads_crewai(f"""
+        import sys
+        sys.argv = ["batch", {str(questions)!r}]
+        from dataexp.main import batch
+        batch()
+    """, tmp_path)
+
+
+@pytest.mark.parametrize("module", ["dataexp.main", "dataexp.templates"])
+def test_entry_modules_do_not_import_crewai(tmp_path, module):
+    assert not _loads_crewai(f"import {module}", tmp_path)
@@ -0,0 +1,29 @@
+import pytest
+
+from dataexp import templates
+from dataexp.templates import QuestionTemplate, answer_from_template
+
+
+def test_known_question_is_answered(titanic_csv):
+    answered = answer_from_template("What is the survival rate?", titanic_csv)
+
+    assert answered["template"] == "overall_survival_rate"
+    assert "38.4%" in answered["answer"]
+
+
+def test_unknown_question_goes_to_the_crew(titanic_csv):
+    assert answer_from_template("Write me a poem about icebergs", titanic_csv) is None
+
+
+@pytest.mark.parametrize("answer", [
+    "{unknown_column} passengers",  # placeholder the result does not have
+    "{passengers:%Y} passengers",   # format spec the value does not support
+])
+def test_answer_formatting_errors_fall_back_to_the_crew(titanic_csv, monkeypatch, answer):
+    broken = QuestionTemplate(
+        "broken", patterns=[r"^how many passengers are there$"],
+        sql="SELECT COUNT(*) AS passengers FROM df", answer=answer,
+    )
+    monkeypatch.setattr(templates, "templates", [broken])
+
+    assert answer_from_template("How many passengers are there?", titanic_csv) is None
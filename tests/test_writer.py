@@ -0,0 +1,91 @@
+import json
+import time
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from dataexp.tools import data_tool
+from dataexp.tools.results import results
+from dataexp.tools.writer import write_frames
+
+
+def _stream():
+    # The first row group has no value in 'label' and no null in 'count'
+    yield pd.DataFrame({"count": [1, 2], "label": [None, None]})
+    yield pd.DataFrame({"count": [3.0, float("nan")], "label": ["c", None]})
+    yield pd.DataFrame({"count": [5, 6], "label": ["e", "f"]})
+
+
+@pytest.mark.parametrize("format", ["parquet", "feather"])
+def test_streamed_nulls_spanning_the_first_row_group(tmp_path, format):
+    path = tmp_path / f"out.{format}"
+
+    summary = write_frames(_stream(), path, format=format, row_group_rows=2)
+
+    assert summary["rows"] == 6
+    assert summary["row_groups"] == 3
+    df = pd.read_parquet(path) if format == "parquet" else pd.read_feather(path)
+    assert df["label"].isna().tolist() == [True, True, False, True, False, False]
+    assert df["label"].dropna().tolist() == ["c", "e", "f"]
+    assert df["count"].isna().tolist() == [False, False, False, True, False, False]
+    assert df["count"].dropna().tolist() == [1, 2, 3, 5, 6]
+
+
+def test_parquet_schema_keeps_integers_nullable(tmp_path):
+    path = tmp_path / "out.parquet"
+    write_frames(_stream(), path, format="parquet", row_group_rows=2)
+
+    schema = pq.read_schema(path)
+    assert str(schema.field("count").type) == "int64"
+    assert str(schema.field("label").type) == "string"
+
+
+def test_values_not_fitting_the_first_row_group_fail_cleanly(tmp_path):
+    path = tmp_path / "out.parquet"
+    stream = iter([pd.DataFrame({"x": [1, 2]}), pd.DataFrame({"x": [2.5, 3.5]})])
+
+    with pytest.raises(ValueError, match="first row group"):
+        write_frames(stream, path, format="parquet", row_group_rows=2)
+    assert not path.exists()
+    assert list(tmp_path.iterdir()) == []
+
+
+def _wait_for_write(write_id):
+    deadline = time.monotonic() + 10
+    while True:
+        status = json.loads(data_tool.get_write_status.func(write_id))
+        if status["status"] not in ("queued", "running") or time.monotonic() > deadline:
+            return status
+        time.sleep(0.01)
+
+
+def test_background_saves_report_their_status(tmp_path):
+    handle = results.put(pd.DataFrame({"x": range(10)}))
+
+    queued = json.loads(data_tool.save_dataframe.func(
+        handle, "out", format="parquet", output_dir=str(tmp_path), background=True
+    ))
+    status = _wait_for_write(queued["write_id"])
+
+    assert status["status"] == "succeeded"
+    assert status["rows"] == 10
+    assert status["file_path"] == queued["file_path"]
+    assert len(pd.read_parquet(status["file_path"])) == 10
+
+
+def test_failed_background_saves_report_the_error(tmp_path):
+    handle = results.put(pd.DataFrame({"x": range(10)}))
+
+    queued = json.loads(data_tool.save_dataframe.func(
+        handle, "out", format="parquet", compression="bogus", output_dir=str(tmp_path), background=True
+    ))
+    status = _wait_for_write(queued["write_id"])
+
+    assert status["status"] == "failed"
+    assert "bogus" in status["error"]
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_unknown_write_ids_are_reported():
+    assert "error" in json.loads(data_tool.get_write_status.func("missing"))